@@ -1,52 +1,67 @@
 """
 This module sets up and runs a Flask web application, integrating with a MongoDB database to manage note-related operations.
-It configures the application to use a blueprint for organizing routes and establishes a connection to the database using a specified URI.
+It configures the application to use a blueprint for organizing routes; the database connection itself is opened lazily by the repository layer.
 
 Key Responsibilities:
-- **Flask Application Initialization**: Initializes a Flask application instance, setting up the necessary configurations for running the web server.
-- **MongoDB Connection**: Establishes a connection to a MongoDB database using the `MongoClient` from the `pymongo` library, and assigns the default database to the Flask app context for easy access.
-- **Blueprint Registration**: Registers a blueprint (`note_bp`) that encapsulates all note-related routes, promoting modularity and separation of concerns within the application.
-- **Application Execution**: Runs the Flask application in debug mode, allowing for real-time code changes and detailed error messages during development.
+- **Flask Application Initialization**: Provides the `create_app()` factory, which builds a configured Flask application instance, and the module-level `app` built with it. Responses are encoded by `FastJSONProvider`, which serializes `ObjectId` and datetimes natively.
+- **Blueprint Registration**: Registers the blueprints that encapsulate the note-related routes (`note_bp`), the runtime metrics routes (`metrics_bp`), the health routes (`health_bp`) and the operator routes (`admin_bp`), promoting modularity and separation of concerns within the application.
+- **Startup Instrumentation**: Times the module imports and, when `WARMUP_ON_BOOT` is set, warms up the model, NLP resources and database connection before serving, printing a breakdown of the startup phases.
+- **Application Execution**: Runs the Flask application in debug mode, allowing for real-time code changes and detailed error messages during development. In production the application is served by Gunicorn with the settings in `gunicorn.conf.py`.
 
 The module assumes that the MongoDB server is running and accessible via the provided URI, and that the `note_controller` module is correctly implemented with the necessary routes.
 
 """
 
+import time
+_import_started = time.perf_counter()
+
 from flask import Flask
 from controllers.note_controller import note_bp
-from pymongo import MongoClient
-from config.config import MONGO_URI
-from bson import ObjectId
-import json
+from controllers.metrics_controller import metrics_bp
+from controllers.health_controller import health_bp
+from controllers.admin_controller import admin_bp
+from config.config import WARMUP_ON_BOOT
+from service.warmup_service import warmup, start_background_tasks
+from utils.json_provider import FastJSONProvider
+from utils.startup import record_phase, format_startup_report
 import os
 
-# Initialize the Flask application
-app = Flask(__name__)
+record_phase('import', time.perf_counter() - _import_started)
 
-# Set up MongoDB client and database
-client = MongoClient(MONGO_URI)
-app.db = client.get_default_database()
+def create_app():
+    """
+    Create and configure a Flask application instance.
 
+    Returns:
+        Flask: The application with every blueprint registered.
+    """
+    # Initialize the Flask application
+    flask_app = Flask(__name__)
 
-# Custom JSON Encoder to handle ObjectId
-class JSONEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, ObjectId):
-            return str(obj)
-        return super(JSONEncoder, self).default(obj)
+    # Serialize ObjectId and datetimes natively, with orjson when available
+    flask_app.json = FastJSONProvider(flask_app)
 
-# Use the custom JSON encoder
-app.json_encoder = JSONEncoder
+    # Register the blueprints for note-related, metrics, health and admin routes
+    flask_app.register_blueprint(note_bp)
+    flask_app.register_blueprint(metrics_bp)
+    flask_app.register_blueprint(health_bp)
+    flask_app.register_blueprint(admin_bp)
+    return flask_app
 
+app = create_app()
 
-# Register the blueprint for note-related routes
-app.register_blueprint(note_bp)
+if WARMUP_ON_BOOT:
+    warmup()
+    print(format_startup_report())
 
 if __name__ == '__main__':
     # Run the Flask application in debug mode
     # Retrieve the port number from the environment variable 'PORT'
     # Default to 5000 if 'PORT' is not set
     port = int(os.environ.get('PORT', 5000))
+
+    # Under Gunicorn, every worker starts its background tasks in `post_fork` instead
+    start_background_tasks()
     
     # Run the Flask application, binding to all network interfaces
     app.run(host='0.0.0.0', port=port, debug=True)
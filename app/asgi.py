@@ -0,0 +1,59 @@
+"""
+This module sets up the asyncio (ASGI) variant of the application, for workloads with many concurrent, mostly waiting connections.
+The Flask application in `app.py` holds a thread for the whole of every request, so its concurrency is capped by `WEB_WORKERS` x `WEB_THREADS`. Here every request is a coroutine: database calls are awaited through PyMongo's asynchronous client, and sentiment analysis and categorization run in a bounded thread pool, so thousands of connections can wait on I/O at once.
+
+Key Responsibilities:
+- **Quart Application Initialization**: Provides the `create_asgi_app()` factory and the module-level `app` built with it. Quart mirrors Flask's API, so the handlers read like their synchronous counterparts, and both applications encode responses with `FastJSONProvider`.
+- **Blueprint Registration**: Registers the note routes (`async_note_bp`) and the health routes (`async_health_bp`), with the same paths and JSON contract as the Flask application. The metrics and admin routes are only served by the Flask application.
+- **Lifecycle**: Warms up models and NLP resources before serving when `WARMUP_ON_BOOT` is set, and starts the background tasks of the worker. On shutdown, drains the background enrichment queue, snapshots the search index, stops the CPU thread pool and closes the asynchronous database client.
+
+Usage (from the `app` directory):
+    hypercorn -c file:hypercorn.conf.py asgi:app
+"""
+
+import time
+_import_started = time.perf_counter()
+
+from quart import Quart
+from controllers.async_note_controller import async_note_bp
+from controllers.async_health_controller import async_health_bp
+from config.config import WARMUP_ON_BOOT
+from repository.backends.async_mongo import close_async_mongo_client
+from service.async_note_service import run_blocking, shutdown_executor
+from service.enrichment_service import shutdown_enrichment
+from service.search_service import save_search_index
+from service.warmup_service import warmup, start_background_tasks
+from utils.json_provider import FastJSONProvider
+from utils.startup import record_phase, format_startup_report
+
+record_phase('import', time.perf_counter() - _import_started)
+
+def create_asgi_app():
+    """
+    Create and configure a Quart application instance.
+
+    Returns:
+        Quart: The application with the note and health blueprints registered.
+    """
+    asgi_app = Quart(__name__)
+    asgi_app.json = FastJSONProvider(asgi_app)
+    asgi_app.register_blueprint(async_note_bp)
+    asgi_app.register_blueprint(async_health_bp)
+
+    @asgi_app.before_serving
+    async def start():
+        if WARMUP_ON_BOOT:
+            await run_blocking(warmup)
+            print(format_startup_report())
+        start_background_tasks()
+
+    @asgi_app.after_serving
+    async def stop():
+        await run_blocking(shutdown_enrichment, True)
+        await run_blocking(save_search_index)
+        shutdown_executor(wait=True)
+        await close_async_mongo_client()
+
+    return asgi_app
+
+app = create_asgi_app()
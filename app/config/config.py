@@ -8,9 +8,117 @@ password = os.environ.get('MONGO_PASS')
 host = os.environ.get('MONGO_HOST', 'cluster0.blesiqx.mongodb.net')
 dbname = os.environ.get('MONGO_DBNAME', 'SmartNoteAppDb')
 
-# Encode the username and password
-encoded_username = quote_plus(username)
-encoded_password = quote_plus(password)
+if os.environ.get('MONGO_URI'):
+    MONGO_URI = os.environ['MONGO_URI']
+elif username and password:
+    # Encode the username and password
+    encoded_username = quote_plus(username)
+    encoded_password = quote_plus(password)
 
-# Construct the MongoDB URI
-MONGO_URI = f"mongodb+srv://{encoded_username}:{encoded_password}@{host}/{dbname}?retryWrites=true&w=majority"
+    # Construct the MongoDB URI
+    MONGO_URI = f"mongodb+srv://{encoded_username}:{encoded_password}@{host}/{dbname}?retryWrites=true&w=majority"
+else:
+    # Without credentials only a local server can be reached; the memory storage backend needs none
+    MONGO_URI = 'mongodb://localhost:27017/'
+
+# Database holding the notes collection, shared by the application and init_db.py
+MONGO_DB_NAME = os.environ.get('MONGO_DB_NAME', 'notes_db')
+
+# Connection pool of the shared MongoDB client
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', 100))
+MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', 0))
+MONGO_CONNECT_TIMEOUT_MS = int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', 5000))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000))
+MONGO_SOCKET_TIMEOUT_MS = int(os.environ['MONGO_SOCKET_TIMEOUT_MS']) if os.environ.get('MONGO_SOCKET_TIMEOUT_MS') else None
+
+# Note storage backend ('mongo' or 'memory', an embedded store for tests, benchmarks and single-node setups)
+STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'mongo').lower()
+
+# Pagination limits for the list endpoints
+DEFAULT_PAGE_LIMIT = int(os.environ.get('DEFAULT_PAGE_LIMIT', 50))
+MAX_PAGE_LIMIT = int(os.environ.get('MAX_PAGE_LIMIT', 1000))
+
+# Cursor batch sizes for the streaming export endpoint
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 1000))
+MAX_EXPORT_BATCH_SIZE = int(os.environ.get('MAX_EXPORT_BATCH_SIZE', 10000))
+
+# Limits for bulk note creation
+BULK_MAX_NOTES = int(os.environ.get('BULK_MAX_NOTES', 50000))
+BULK_INSERT_CHUNK_SIZE = int(os.environ.get('BULK_INSERT_CHUNK_SIZE', 1000))
+
+# Micro-batching of category predictions across concurrent requests
+CATEGORY_BATCHING_ENABLED = os.environ.get('CATEGORY_BATCHING_ENABLED', 'false').lower() == 'true'
+CATEGORY_BATCH_MAX_SIZE = int(os.environ.get('CATEGORY_BATCH_MAX_SIZE', 64))
+CATEGORY_BATCH_MAX_WAIT_MS = float(os.environ.get('CATEGORY_BATCH_MAX_WAIT_MS', 5))
+CATEGORY_BATCH_WITH_PROBA = os.environ.get('CATEGORY_BATCH_WITH_PROBA', 'false').lower() == 'true'
+
+# Sizes of the content-hash memoization caches for note enrichment
+SENTIMENT_CACHE_SIZE = int(os.environ.get('SENTIMENT_CACHE_SIZE', 10000))
+CATEGORY_CACHE_SIZE = int(os.environ.get('CATEGORY_CACHE_SIZE', 10000))
+
+# Background enrichment of note writes ('sync' enriches on the request thread, 'async' in a worker pool)
+ENRICHMENT_MODE = os.environ.get('ENRICHMENT_MODE', 'sync').lower()
+ENRICHMENT_WORKERS = int(os.environ.get('ENRICHMENT_WORKERS', 4))
+ENRICHMENT_QUEUE_SIZE = int(os.environ.get('ENRICHMENT_QUEUE_SIZE', 1000))
+ENRICHMENT_MAX_RETRIES = int(os.environ.get('ENRICHMENT_MAX_RETRIES', 3))
+ENRICHMENT_RETRY_BACKOFF_SECONDS = float(os.environ.get('ENRICHMENT_RETRY_BACKOFF_SECONDS', 0.5))
+
+# Load models and connect to the database at boot instead of on the first request
+WARMUP_ON_BOOT = os.environ.get('WARMUP_ON_BOOT', 'false').lower() == 'true'
+
+# Full-text search backend ('mongo' uses the $text index, 'memory' the in-process BM25 index)
+SEARCH_BACKEND = os.environ.get('SEARCH_BACKEND', 'mongo').lower()
+SEARCH_INDEX_PATH = os.environ.get('SEARCH_INDEX_PATH', os.path.join('data', 'search_index.pkl'))
+SEARCH_SNAPSHOT_INTERVAL = int(os.environ.get('SEARCH_SNAPSHOT_INTERVAL', 1000))
+SEARCH_DEFAULT_LIMIT = int(os.environ.get('SEARCH_DEFAULT_LIMIT', 20))
+SEARCH_SNIPPET_LENGTH = int(os.environ.get('SEARCH_SNIPPET_LENGTH', 160))
+
+# Read-through cache for single-note lookups
+NOTE_CACHE_BACKEND = os.environ.get('NOTE_CACHE_BACKEND', 'memory').lower()
+NOTE_CACHE_SIZE = int(os.environ.get('NOTE_CACHE_SIZE', 10000))
+NOTE_CACHE_TTL_SECONDS = float(os.environ.get('NOTE_CACHE_TTL_SECONDS', 60))
+
+# Latency histograms, Server-Timing headers and sampled cProfile profiles of requests
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+SERVER_TIMING_ENABLED = os.environ.get('SERVER_TIMING_ENABLED', 'true').lower() == 'true'
+PROFILE_SAMPLE_PERCENT = float(os.environ.get('PROFILE_SAMPLE_PERCENT', 0))
+PROFILE_OUTPUT_DIR = os.environ.get('PROFILE_OUTPUT_DIR', os.path.join('data', 'profiles'))
+
+# Versioned categorizer artifacts; the serving process polls the registry for newly activated versions (0 disables the watch)
+MODEL_REGISTRY_DIR = os.environ.get('MODEL_REGISTRY_DIR', os.path.join('ml', 'registry'))
+MODEL_WATCH_INTERVAL_SECONDS = float(os.environ.get('MODEL_WATCH_INTERVAL_SECONDS', 10))
+
+# Token required in the X-Admin-Token header of admin endpoints; they are disabled while it is unset
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN', '')
+
+# Production server (see gunicorn.conf.py): worker processes, threads per worker and timeouts in seconds
+WEB_WORKERS = int(os.environ.get('WEB_WORKERS', os.cpu_count() or 1))
+WEB_THREADS = int(os.environ.get('WEB_THREADS', 4))
+WEB_TIMEOUT = int(os.environ.get('WEB_TIMEOUT', 30))
+WEB_GRACEFUL_TIMEOUT = int(os.environ.get('WEB_GRACEFUL_TIMEOUT', 30))
+
+# Asynchronous server (see asgi.py): threads running sentiment analysis and categorization off the event loop
+ASYNC_EXECUTOR_WORKERS = int(os.environ.get('ASYNC_EXECUTOR_WORKERS', os.cpu_count() or 1))
+
+# "Similar notes" over the categorizer's TF-IDF vectors, and duplicate detection when a note is created ('off', 'warn' or 'reject')
+SIMILAR_DEFAULT_K = int(os.environ.get('SIMILAR_DEFAULT_K', 10))
+SIMILAR_MAX_K = int(os.environ.get('SIMILAR_MAX_K', 100))
+DUPLICATE_DETECTION = os.environ.get('DUPLICATE_DETECTION', 'off').lower()
+DUPLICATE_THRESHOLD = float(os.environ.get('DUPLICATE_THRESHOLD', 0.9))
+DUPLICATE_MAX_RESULTS = int(os.environ.get('DUPLICATE_MAX_RESULTS', 5))
+
+# Note statistics: days of daily trend returned by default, and at most
+STATS_DEFAULT_DAYS = int(os.environ.get('STATS_DEFAULT_DAYS', 30))
+STATS_MAX_DAYS = int(os.environ.get('STATS_MAX_DAYS', 3660))
+
+# Bulk re-categorization after a model update (see service/recategorization_service.py): notes per batch, prediction processes (0 predicts in-process) and a rate limit in notes per second (0 disables it)
+RECATEGORIZE_BATCH_SIZE = int(os.environ.get('RECATEGORIZE_BATCH_SIZE', 1000))
+RECATEGORIZE_WORKERS = int(os.environ.get('RECATEGORIZE_WORKERS', 2))
+RECATEGORIZE_MAX_RATE = float(os.environ.get('RECATEGORIZE_MAX_RATE', 2000))
+RECATEGORIZE_CHECKPOINT_PATH = os.environ.get('RECATEGORIZE_CHECKPOINT_PATH', os.path.join('data', 'recategorize.ckpt'))
+
+# Sentiment engine: 'textblob' analyzes one note at a time with TextBlob, 'lexicon' scores batches with TextBlob's lexicon compiled to numpy arrays (see utils/lexicon_sentiment.py)
+SENTIMENT_ENGINE = os.environ.get('SENTIMENT_ENGINE', 'textblob').lower()
+
+# Index test mode: every MongoDB query checks its plan with explain() and fails on a collection scan (for test runs; it doubles the round trips)
+MONGO_ASSERT_INDEXED = os.environ.get('MONGO_ASSERT_INDEXED', 'false').lower() == 'true'
@@ -0,0 +1,29 @@
+"""
+This module checks and adjusts the configuration for serving with several worker processes (see `gunicorn.conf.py` and `hypercorn.conf.py`).
+
+Key Responsibilities:
+- **Per-Process Backends**: Refuses to start several workers on the `memory` storage or search backend, since each process would keep its own notes or search index and never see the writes handled by the others.
+- **Note Cache**: Replaces the `memory` note cache with no cache, because a worker cannot invalidate the cached copy of a note that another worker updated, and would keep serving the stale note and its ETag until the entry expires. A backend shared by all workers can still be registered and configured.
+
+It must run before the application is imported, since the note cache is created at import time.
+"""
+
+import os
+from config import config
+
+def apply_worker_settings(workers):
+    """
+    Make the configuration safe for `workers` server processes.
+
+    Raises:
+        ValueError: If a configured backend keeps state that cannot be shared between processes.
+    """
+    if workers <= 1:
+        return
+    for name in ('STORAGE_BACKEND', 'SEARCH_BACKEND'):
+        if getattr(config, name) == 'memory':
+            raise ValueError(f"{name}=memory keeps its state in one process; serve it with WEB_WORKERS=1 (currently {workers})")
+    if config.NOTE_CACHE_BACKEND == 'memory':
+        print(f"Warning: the memory note cache cannot be kept consistent across {workers} workers; serving without a note cache.")
+        # The environment too, for worker processes that import the configuration afresh
+        config.NOTE_CACHE_BACKEND = os.environ['NOTE_CACHE_BACKEND'] = 'none'
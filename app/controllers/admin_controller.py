@@ -0,0 +1,65 @@
+"""
+The admin_controller module exposes operator endpoints that change the running application.
+
+Key Responsibilities:
+- **Access Control**: Requires the configured `ADMIN_TOKEN` in the `X-Admin-Token` header of every admin request. While no token is configured, the endpoints are disabled.
+- **Model Status**: Reports the categorizer version serving predictions, the registry's active version and every registered version with its metadata.
+- **Model Reload**: Activates a registered version, or reloads the registry's current one, and swaps it in without restarting the process or dropping predictions in flight.
+- **Re-categorization**: Starts the bulk re-categorization of stored notes with the serving model on a background thread (see `service/recategorization_service.py`), optionally resuming from its checkpoint or including notes stored before model versions were recorded, and reports the progress of the latest run.
+- **Statistics Rebuild**: Recomputes the materialized note statistics from the notes, like `python -m service.stats_service --rebuild`.
+"""
+
+import hmac
+from flask import Blueprint, jsonify, request
+from config.config import ADMIN_TOKEN
+from ml.model_registry import active_version, get_metadata, list_models
+from service.recategorization_service import start_recategorization, recategorization_status
+from service.stats_service import rebuild_note_statistics
+from utils.categorisation import model_version, reload_model
+
+admin_bp = Blueprint('admin_bp', __name__)
+
+@admin_bp.before_request
+def require_admin_token():
+    if not ADMIN_TOKEN:
+        return jsonify({"error": "Admin endpoints are disabled"}), 403
+    if not hmac.compare_digest(request.headers.get('X-Admin-Token', ''), ADMIN_TOKEN):
+        return jsonify({"error": "Invalid admin token"}), 401
+
+@admin_bp.route('/admin/model', methods=['GET'])
+def get_model_status():
+    serving = model_version()
+    return jsonify({
+        "serving_version": serving,
+        "active_version": active_version(),
+        "metadata": get_metadata(serving) if serving else None,
+        "registered": list_models()
+    }), 200
+
+@admin_bp.route('/admin/model/reload', methods=['POST'])
+def reload_categorizer():
+    data = request.get_json(silent=True) or {}
+    try:
+        version = reload_model(data.get('version'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"serving_version": version}), 200
+
+@admin_bp.route('/admin/stats/rebuild', methods=['POST'])
+def rebuild_statistics():
+    return jsonify({"buckets": rebuild_note_statistics()}), 200
+
+@admin_bp.route('/admin/recategorize', methods=['POST'])
+def recategorize():
+    data = request.get_json(silent=True) or {}
+    try:
+        status = start_recategorization(resume=bool(data.get('resume', False)), include_legacy=bool(data.get('include_legacy', False)))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if status is None:
+        return jsonify({"error": "A re-categorization is already running", "status": recategorization_status()}), 409
+    return jsonify(status), 202
+
+@admin_bp.route('/admin/recategorize', methods=['GET'])
+def get_recategorization_status():
+    return jsonify(recategorization_status()), 200
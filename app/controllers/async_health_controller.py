@@ -0,0 +1,29 @@
+"""
+The async_health_controller module exposes the health endpoints on the asyncio server (see `asgi.py`), with the same responses as `health_controller`.
+
+Key Responsibilities:
+- **Liveness**: Answers 200 with the process ID without touching models or the database.
+- **Readiness**: Runs the shared warmup in the CPU thread pool, since loading models and pinging the database block, and answers 200 once the application can serve traffic or 503 otherwise.
+- **Startup Report**: Reports how long each startup phase took.
+"""
+
+import os
+from quart import Blueprint, jsonify
+from service.async_note_service import run_blocking
+from service.warmup_service import warmup
+from utils.startup import startup_report
+
+async_health_bp = Blueprint('async_health_bp', __name__)
+
+@async_health_bp.route('/health', methods=['GET'])
+async def health():
+    return jsonify({"status": "ok", "pid": os.getpid()}), 200
+
+@async_health_bp.route('/ready', methods=['GET'])
+async def ready():
+    result = await run_blocking(warmup)
+    return jsonify(result), 200 if result["ready"] else 503
+
+@async_health_bp.route('/startup', methods=['GET'])
+async def get_startup_report():
+    return jsonify(startup_report()), 200
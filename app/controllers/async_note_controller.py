@@ -0,0 +1,232 @@
+"""
+The async_note_controller module serves the note endpoints on the asyncio server (see `asgi.py`).
+It exposes exactly the routes of `note_controller` with the same request parameters, status codes and response bodies, so clients cannot tell which server they are talking to.
+
+Key Responsibilities:
+- **Note Routes**: Implements create (with duplicate detection), bulk create, list (complete or keyset-paginated), filtered listing, export, changes, statistics, get by ID, similar notes, enrichment status, update, delete and search with Quart, whose blueprint and request API mirror Flask's.
+- **Non-Blocking Handlers**: Every handler is a coroutine awaiting `service.async_note_service`, so a request waiting on the database or on an offloaded model call does not hold a thread.
+- **Shared Validation**: Parses query parameters with the same `controllers.params` functions as the synchronous controller.
+- **Streaming Export**: Streams NDJSON, gzip-compressed when accepted, straight from an asynchronous cursor.
+- **Conditional Reads**: Answers `If-None-Match` on a note's version ETag with 304 Not Modified, like the synchronous controller.
+"""
+
+from quart import Blueprint, Response, request, jsonify
+from bson import ObjectId
+from config.config import (DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT, EXPORT_BATCH_SIZE, MAX_EXPORT_BATCH_SIZE, BULK_MAX_NOTES,
+                           SIMILAR_DEFAULT_K, SIMILAR_MAX_K, STATS_DEFAULT_DAYS, STATS_MAX_DAYS)
+from controllers.params import (parse_flag, parse_wait, parse_duplicates, parse_change_token, parse_fields, parse_bounded_int, parse_offset,
+                                parse_sentiment, parse_sort, parse_listing_cursor)
+from service.async_note_service import (create_note, create_notes_bulk, list_notes, list_notes_page, filter_notes, export_notes, note_by_id,
+                                        enrichment_status, modify_note, remove_note, find_notes, similar_notes, find_duplicates,
+                                        note_statistics, changes_since)
+from utils.ndjson import aiter_ndjson, agzip_stream
+
+async_note_bp = Blueprint('async_note_bp', __name__)
+
+@async_note_bp.route('/notes', methods=['POST'])
+async def add_note():
+    data = await request.get_json()
+    title, content = data.get('title'), data.get('content')
+    try:
+        duplicate_mode = parse_duplicates(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    duplicates = []
+    if duplicate_mode != 'off' and title and content and isinstance(title, str) and isinstance(content, str):
+        duplicates = await find_duplicates(title, content)
+        if duplicates and duplicate_mode == 'reject':
+            return jsonify({"error": "A similar note already exists", "duplicates": duplicates}), 409
+    try:
+        result = await create_note(title, content, data.get('category'), wait=parse_wait(request.args))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if result is None:
+        return jsonify({"error": "Title and content are required"}), 400
+    body = {"inserted_id": str(result.inserted_id)}
+    if duplicates:
+        body["duplicates"] = duplicates
+    return jsonify(body), 201
+
+@async_note_bp.route('/notes/bulk', methods=['POST'])
+async def add_notes_bulk():
+    data = await request.get_json()
+    items = data.get('notes') if isinstance(data, dict) else data
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "Expected a non-empty array of notes"}), 400
+    if len(items) > BULK_MAX_NOTES:
+        return jsonify({"error": f"At most {BULK_MAX_NOTES} notes can be created per request"}), 400
+
+    results = await create_notes_bulk(items)
+    error_count = sum(1 for result in results if 'error' in result)
+    body = {
+        "results": results,
+        "inserted_count": len(results) - error_count,
+        "error_count": error_count
+    }
+    return jsonify(body), 201 if error_count == 0 else 207
+
+@async_note_bp.route('/notes', methods=['GET'])
+async def get_filtered_notes():
+    try:
+        fields = parse_fields(request.args.get('fields'))
+        limit = parse_bounded_int(request.args.get('limit'), 'limit', DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT)
+        min_sentiment = parse_sentiment(request.args, 'min_sentiment')
+        max_sentiment = parse_sentiment(request.args, 'max_sentiment')
+        sort = parse_sort(request.args)
+        after = parse_listing_cursor(request.args, sort)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    notes, next_cursor = await filter_notes(limit, request.args.get('category') or None, min_sentiment, max_sentiment, sort, after, fields)
+    return jsonify({"notes": notes, "next": next_cursor}), 200
+
+@async_note_bp.route('/notes/all', methods=['GET'])
+async def get_notes():
+    try:
+        fields = parse_fields(request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if 'limit' in request.args or 'after' in request.args:
+        try:
+            limit = parse_bounded_int(request.args.get('limit'), 'limit', DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        after = request.args.get('after') or None
+        if after:
+            try:
+                after = ObjectId(after)
+            except Exception:
+                return jsonify({"error": "Invalid cursor format"}), 400
+        notes, next_cursor = await list_notes_page(limit, after, fields)
+        return jsonify({"notes": notes, "next": next_cursor}), 200
+
+    notes = await list_notes(fields)
+    return jsonify(notes), 200
+
+@async_note_bp.route('/notes/stats', methods=['GET'])
+async def get_note_statistics():
+    try:
+        days = parse_bounded_int(request.args.get('days'), 'days', STATS_DEFAULT_DAYS, STATS_MAX_DAYS)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(await note_statistics(days)), 200
+
+@async_note_bp.route('/notes/changes', methods=['GET'])
+async def get_note_changes():
+    try:
+        since = parse_change_token(request.args)
+        limit = parse_bounded_int(request.args.get('limit'), 'limit', DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    changes, token, has_more = await changes_since(since, limit)
+    return jsonify({"changes": changes, "next": token, "has_more": has_more}), 200
+
+@async_note_bp.route('/notes/export', methods=['GET'])
+async def export_all_notes():
+    try:
+        fields = parse_fields(request.args.get('fields'))
+        batch_size = parse_bounded_int(request.args.get('batch_size'), 'batch_size', EXPORT_BATCH_SIZE, MAX_EXPORT_BATCH_SIZE)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    body = aiter_ndjson(export_notes(batch_size, fields))
+    headers = {"Vary": "Accept-Encoding"}
+    if request.accept_encodings['gzip']:
+        body = agzip_stream(body)
+        headers["Content-Encoding"] = "gzip"
+    return Response(body, mimetype='application/x-ndjson', headers=headers), 200
+
+@async_note_bp.route('/notes/<note_id>', methods=['GET'])
+async def get_notes_by_id(note_id):
+    try:
+        note_id = ObjectId(note_id)
+    except Exception:
+        return jsonify({"error": "Invalid note ID format"}), 400
+    note = await note_by_id(note_id)
+    if note:
+        etag = f"v{note.get('version', 0)}"
+        if request.if_none_match.contains_weak(etag):
+            response = Response('', status=304)
+        else:
+            response = jsonify(note)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    else:
+        return jsonify({"error": "Note not found"}), 404
+
+@async_note_bp.route('/notes/<note_id>/similar', methods=['GET'])
+async def get_similar_notes(note_id):
+    try:
+        note_id = ObjectId(note_id)
+    except Exception:
+        return jsonify({"error": "Invalid note ID format"}), 400
+    try:
+        k = parse_bounded_int(request.args.get('k'), 'k', SIMILAR_DEFAULT_K, SIMILAR_MAX_K)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if not await note_by_id(note_id):
+        return jsonify({"error": "Note not found"}), 404
+    notes = await similar_notes(note_id, k)
+    if notes is None:
+        return jsonify({"error": "Similar notes are unavailable until a categorizer model is loaded and the similarity index is built; retry shortly"}), 503
+    return jsonify(notes), 200
+
+@async_note_bp.route('/notes/<note_id>/enrichment', methods=['GET'])
+async def get_enrichment_status(note_id):
+    try:
+        note_id = ObjectId(note_id)
+    except Exception:
+        return jsonify({"error": "Invalid note ID format"}), 400
+    status = await enrichment_status(note_id)
+    if status is None:
+        return jsonify({"error": "Note not found"}), 404
+    return jsonify(status), 200
+
+@async_note_bp.route('/notes/update/<note_id>', methods=['PUT'])
+async def update_note(note_id):
+    data = await request.get_json()
+    try:
+        note_id = ObjectId(note_id)
+    except Exception:
+        return jsonify({"error": "Invalid note ID format"}), 400
+
+    result = await modify_note(note_id, data['title'], data['content'], data['category'], wait=parse_wait(request.args))
+    return jsonify({"modified_count": result.modified_count}), 200
+
+@async_note_bp.route('/notes/remove/<note_id>', methods=['DELETE'])
+async def delete_note(note_id):
+    try:
+        note_id = ObjectId(note_id)
+    except Exception:
+        return jsonify({"error": "Invalid note ID format"}), 400
+    result = await remove_note(note_id)
+    return jsonify({"deleted_count": result.deleted_count}), 200
+
+@async_note_bp.route('/notes/search', methods=['GET'])
+async def search_notes():
+    keyword = request.args.get('keyword')
+    if not keyword:
+        return jsonify({"error": "keyword is required"}), 400
+    try:
+        limit = parse_bounded_int(request.args.get('limit'), 'limit', None, MAX_PAGE_LIMIT)
+        offset = parse_offset(request.args)
+        min_sentiment = parse_sentiment(request.args, 'min_sentiment')
+        max_sentiment = parse_sentiment(request.args, 'max_sentiment')
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    notes, next_offset = await find_notes(
+        keyword,
+        limit=limit,
+        offset=offset,
+        prefix=parse_flag(request.args, 'prefix'),
+        category=request.args.get('category') or None,
+        min_sentiment=min_sentiment,
+        max_sentiment=max_sentiment,
+        snippet=parse_flag(request.args, 'snippet')
+    )
+    if 'limit' in request.args or 'offset' in request.args:
+        return jsonify({"notes": notes, "next_offset": next_offset}), 200
+    return jsonify(notes), 200
@@ -0,0 +1,28 @@
+"""
+The health_controller module exposes the endpoints used by load balancers and operators to check the application's state.
+
+Key Responsibilities:
+- **Liveness**: Answers 200 as long as the process can serve requests, without touching models or the database, and reports the process ID so responses from different workers can be told apart.
+- **Readiness**: Triggers the warmup of models, NLP resources and the database connection if it has not happened yet, and answers 200 once the application can serve traffic or 503 otherwise.
+- **Startup Report**: Reports how long each startup phase took (imports, model load, NLP load, database connect).
+"""
+
+import os
+from flask import Blueprint, jsonify
+from service.warmup_service import warmup
+from utils.startup import startup_report
+
+health_bp = Blueprint('health_bp', __name__)
+
+@health_bp.route('/health', methods=['GET'])
+def health():
+    return jsonify({"status": "ok", "pid": os.getpid()}), 200
+
+@health_bp.route('/ready', methods=['GET'])
+def ready():
+    result = warmup()
+    return jsonify(result), 200 if result["ready"] else 503
+
+@health_bp.route('/startup', methods=['GET'])
+def get_startup_report():
+    return jsonify(startup_report()), 200
@@ -0,0 +1,70 @@
+"""
+The metrics_controller module exposes runtime metrics about the application's internals over HTTP.
+
+Key Responsibilities:
+- **Batching Metrics**: Reports the category micro-batcher's batch-size histogram and queue-wait times, so batching limits can be tuned against real traffic.
+- **Enrichment Metrics**: Reports the background enrichment pool's queue depth and its completed, retried, failed and rejected job counts.
+- **Cache Metrics**: Reports size, hit, miss and eviction counters of the sentiment and category memoization caches and of the note lookup cache.
+- **Request Timing**: Times every request of the application, records it per endpoint and, with `SERVER_TIMING_ENABLED`, returns the request's breakdown by operation in a `Server-Timing` header. A sampled share of requests is also profiled (see `utils.profiling`).
+- **Prometheus Metrics**: Serves every latency histogram at `/metrics` in the Prometheus text format.
+"""
+
+import time
+from flask import Blueprint, Response, g, jsonify, request
+from config.config import SERVER_TIMING_ENABLED
+from repository.note_repository import note_cache_stats
+from service.enrichment_service import enrichment_pool_stats
+from utils.categorisation import batching_stats, category_cache_stats
+from utils.metrics import (start_request_timing, finish_request_timing, format_server_timing, observe_request,
+                           render_prometheus)
+from utils.profiling import start_profile, finish_profile
+from utils.sentiment_analysis import sentiment_cache_stats
+
+metrics_bp = Blueprint('metrics_bp', __name__)
+
+@metrics_bp.before_app_request
+def start_request_metrics():
+    g.request_started = time.perf_counter()
+    g.request_timing_token = start_request_timing()
+    g.request_profiler = start_profile()
+
+@metrics_bp.after_app_request
+def finish_request_metrics(response):
+    if 'request_started' not in g:
+        return response
+    elapsed = time.perf_counter() - g.request_started
+    timings = finish_request_timing(g.pop('request_timing_token'))
+    endpoint = request.endpoint or 'unmatched'
+    observe_request(request.method, endpoint, response.status_code, elapsed)
+    if SERVER_TIMING_ENABLED:
+        response.headers['Server-Timing'] = format_server_timing(timings, total=elapsed)
+    profiler = g.pop('request_profiler', None)
+    if profiler is not None:
+        finish_profile(profiler, f"{request.method}-{endpoint}")
+    return response
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def get_prometheus_metrics():
+    return Response(render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+@metrics_bp.route('/metrics/batching', methods=['GET'])
+def get_batching_metrics():
+    stats = batching_stats()
+    if stats is None:
+        return jsonify({"enabled": False}), 200
+    return jsonify(dict(stats, enabled=True)), 200
+
+@metrics_bp.route('/metrics/cache', methods=['GET'])
+def get_cache_metrics():
+    return jsonify({
+        "sentiment": sentiment_cache_stats(),
+        "category": category_cache_stats(),
+        "note": note_cache_stats()
+    }), 200
+
+@metrics_bp.route('/metrics/enrichment', methods=['GET'])
+def get_enrichment_metrics():
+    stats = enrichment_pool_stats()
+    if stats is None:
+        return jsonify({"started": False}), 200
+    return jsonify(dict(stats, started=True)), 200
@@ -5,19 +5,37 @@ It defines a set of RESTful API endpoints for creating, retrieving, updating, an
 This module uses Flask's Blueprint to organize routes related to note management, promoting modularity and separation of concerns.
 
 Key Responsibilities:
-- **Add Note**: Provides an endpoint to create a new note with a title, content, and category. It returns the ID of the newly created note.
-- **Get All Notes**: Offers an endpoint to retrieve all existing notes, returning them in JSON format.
+- **Add Note**: Provides an endpoint to create a new note with a title, content, and category. It returns the ID of the newly created note, or 400 when the title or content is missing or a field has the wrong type.
+- **Duplicate Detection**: With `?duplicates=warn` (or `DUPLICATE_DETECTION=warn`), the response of a created note lists the stored notes it nearly duplicates; with `reject` such a note is not created and 409 Conflict is returned with those notes instead.
+- **Similar Notes**: Returns up to `k` notes most similar to a note, by cosine similarity of their TF-IDF vectors, each with its `similarity`. Answers 503 while no categorizer model is loaded or the similarity index is still being built in the background.
+- **Enrichment Status**: Reports whether a note's sentiment and category have been computed yet. Write endpoints accept `?wait=true` to enrich synchronously, or `?wait=false` to enrich in the background.
+- **Add Notes in Bulk**: Accepts an array of notes, creates them with batched enrichment and chunked inserts, and reports the ID or error for every item.
+- **Get All Notes**: Offers an endpoint to retrieve existing notes in JSON format. Passing `limit` and/or `after` switches to keyset pagination with a `next` cursor, and `fields` restricts which note fields are returned.
+- **Filter Notes**: Lists notes with an optional `category` and `min_sentiment`/`max_sentiment` range, newest first by default or in the `sort` order `created`, `-sentiment` or `sentiment`, one keyset page of `limit` notes at a time with a `next` cursor. Every combination is served by a compound index (see `init_db.py`); sentiment orders leave out notes still awaiting analysis.
+- **Note Statistics**: Returns the number of notes and their average sentiment in total, per category and per day over the last `days` days (30 by default), from statistics maintained incrementally on every write.
+- **Note Changes**: Returns what changed after a `since` token, for clients that keep a local copy: created or updated notes and `deleted` tombstones in the order they happened, paginated with `limit`, with the `next` token and whether more changes are available. Sync traffic grows with the number of changes, not with the collection.
+- **Export Notes**: Streams every note as newline-delimited JSON straight from a database cursor, gzip-compressed when the client accepts it, so memory stays flat regardless of collection size.
+- **Get Note by ID**: Returns a single note with an ETag derived from its version, and answers a matching `If-None-Match` with 304 Not Modified without serializing the note.
 - **Update Note**: Allows updating an existing note's title, content, and category by its ID. It returns the count of modified documents.
 - **Delete Note**: Facilitates the deletion of a note by its ID, returning the count of deleted documents.
-- **Search Notes**: Enables searching for notes based on a keyword, returning a list of matching notes.
+- **Search Notes**: Enables searching for notes based on a keyword, returning the most relevant matches first. Supports `limit`/`offset` pagination (returning a `next_offset`), `category` and `min_sentiment`/`max_sentiment` filters, `snippet=true` for short content snippets instead of full bodies, and, with the in-process search backend, `prefix=true` to treat the last term as a prefix.
 
 The module interacts with the service layer to perform CRUD operations and utilizes utility functions for additional features like category suggestion.
 Error handling is implemented to manage invalid input formats, ensuring robust API behavior.
+Documents are returned as the repository produced them; the application's JSON provider encodes `ObjectId` values, so no per-note conversion is needed.
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify
 from bson import ObjectId
-from service.note_service import create_note, list_notes, note_by_id, modify_note, remove_note, find_notes
+from config.config import (DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT, EXPORT_BATCH_SIZE, MAX_EXPORT_BATCH_SIZE, BULK_MAX_NOTES,
+                           SIMILAR_DEFAULT_K, SIMILAR_MAX_K, STATS_DEFAULT_DAYS, STATS_MAX_DAYS)
+from controllers.params import (parse_flag, parse_wait, parse_duplicates, parse_change_token, parse_fields, parse_bounded_int, parse_offset,
+                                parse_sentiment, parse_sort, parse_listing_cursor)
+from service.enrichment_service import enrichment_status
+from service.similarity_service import similar_notes, find_duplicates
+from service.stats_service import note_statistics
+from service.note_service import create_note, create_notes_bulk, list_notes, list_notes_page, filter_notes, export_notes, note_by_id, modify_note, remove_note, find_notes, changes_since
+from utils.ndjson import iter_ndjson, gzip_stream
 
 # Create a Blueprint for the notes, which allows us to organize the routes related to notes
 note_bp = Blueprint('note_bp', __name__)
@@ -25,17 +43,118 @@ note_bp = Blueprint('note_bp', __name__)
 @note_bp.route('/notes', methods=['POST'])
 def add_note():
     data = request.json
-    result = create_note(data['title'], data['content'], data['category'])
-    return jsonify({"inserted_id": str(result.inserted_id)}), 201
+    title, content = data.get('title'), data.get('content')
+    try:
+        duplicate_mode = parse_duplicates(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    duplicates = []
+    if duplicate_mode != 'off' and title and content and isinstance(title, str) and isinstance(content, str):
+        duplicates = find_duplicates(title, content)
+        if duplicates and duplicate_mode == 'reject':
+            return jsonify({"error": "A similar note already exists", "duplicates": duplicates}), 409
+    try:
+        result = create_note(title, content, data.get('category'), wait=parse_wait(request.args))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if result is None:
+        return jsonify({"error": "Title and content are required"}), 400
+    body = {"inserted_id": str(result.inserted_id)}
+    if duplicates:
+        body["duplicates"] = duplicates
+    return jsonify(body), 201
+
+@note_bp.route('/notes/bulk', methods=['POST'])
+def add_notes_bulk():
+    data = request.json
+    items = data.get('notes') if isinstance(data, dict) else data
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "Expected a non-empty array of notes"}), 400
+    if len(items) > BULK_MAX_NOTES:
+        return jsonify({"error": f"At most {BULK_MAX_NOTES} notes can be created per request"}), 400
+
+    results = create_notes_bulk(items)
+    error_count = sum(1 for result in results if 'error' in result)
+    body = {
+        "results": results,
+        "inserted_count": len(results) - error_count,
+        "error_count": error_count
+    }
+    # 207 Multi-Status signals that some items were rejected while others were created
+    return jsonify(body), 201 if error_count == 0 else 207
+
+@note_bp.route('/notes', methods=['GET'])
+def get_filtered_notes():
+    try:
+        fields = parse_fields(request.args.get('fields'))
+        limit = parse_bounded_int(request.args.get('limit'), 'limit', DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT)
+        min_sentiment = parse_sentiment(request.args, 'min_sentiment')
+        max_sentiment = parse_sentiment(request.args, 'max_sentiment')
+        sort = parse_sort(request.args)
+        after = parse_listing_cursor(request.args, sort)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    notes, next_cursor = filter_notes(limit, request.args.get('category') or None, min_sentiment, max_sentiment, sort, after, fields)
+    return jsonify({"notes": notes, "next": next_cursor}), 200
 
 @note_bp.route('/notes/all', methods=['GET'])
 def get_notes():
-    notes = list_notes()
-    # Convert ObjectId to string for JSON serialization
-    for note in notes:
-        note['_id'] = str(note['_id'])
+    try:
+        fields = parse_fields(request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if 'limit' in request.args or 'after' in request.args:
+        try:
+            limit = parse_bounded_int(request.args.get('limit'), 'limit', DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        after = request.args.get('after') or None
+        if after:
+            try:
+                after = ObjectId(after)
+            except Exception:
+                return jsonify({"error": "Invalid cursor format"}), 400
+        notes, next_cursor = list_notes_page(limit, after, fields)
+        return jsonify({"notes": notes, "next": next_cursor}), 200
+
+    notes = list_notes(fields)
     return jsonify(notes), 200
 
+@note_bp.route('/notes/stats', methods=['GET'])
+def get_note_statistics():
+    try:
+        days = parse_bounded_int(request.args.get('days'), 'days', STATS_DEFAULT_DAYS, STATS_MAX_DAYS)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(note_statistics(days)), 200
+
+@note_bp.route('/notes/changes', methods=['GET'])
+def get_note_changes():
+    try:
+        since = parse_change_token(request.args)
+        limit = parse_bounded_int(request.args.get('limit'), 'limit', DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    changes, token, has_more = changes_since(since, limit)
+    return jsonify({"changes": changes, "next": token, "has_more": has_more}), 200
+
+@note_bp.route('/notes/export', methods=['GET'])
+def export_all_notes():
+    try:
+        fields = parse_fields(request.args.get('fields'))
+        batch_size = parse_bounded_int(request.args.get('batch_size'), 'batch_size', EXPORT_BATCH_SIZE, MAX_EXPORT_BATCH_SIZE)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    body = iter_ndjson(export_notes(batch_size, fields))
+    headers = {"Vary": "Accept-Encoding"}
+    if request.accept_encodings['gzip']:
+        body = gzip_stream(body)
+        headers["Content-Encoding"] = "gzip"
+    return Response(body, mimetype='application/x-ndjson', headers=headers), 200
+
 @note_bp.route('/notes/<note_id>', methods=['GET'])
 def get_notes_by_id(note_id):
     try:
@@ -44,11 +163,46 @@ def get_notes_by_id(note_id):
         return jsonify({"error": "Invalid note ID format"}), 400
     note = note_by_id(note_id)
     if note:
-        note['_id'] = str(note['_id'])
-        return jsonify(note), 200
+        # Notes written before versioning have no version field and count as version 0
+        etag = f"v{note.get('version', 0)}"
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+        else:
+            response = jsonify(note)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
     else:
         return jsonify({"error": "Note not found"}), 404
 
+@note_bp.route('/notes/<note_id>/similar', methods=['GET'])
+def get_similar_notes(note_id):
+    try:
+        note_id = ObjectId(note_id)
+    except Exception:
+        return jsonify({"error": "Invalid note ID format"}), 400
+    try:
+        k = parse_bounded_int(request.args.get('k'), 'k', SIMILAR_DEFAULT_K, SIMILAR_MAX_K)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if not note_by_id(note_id):
+        return jsonify({"error": "Note not found"}), 404
+    notes = similar_notes(note_id, k)
+    if notes is None:
+        return jsonify({"error": "Similar notes are unavailable until a categorizer model is loaded and the similarity index is built; retry shortly"}), 503
+    return jsonify(notes), 200
+
+@note_bp.route('/notes/<note_id>/enrichment', methods=['GET'])
+def get_enrichment_status(note_id):
+    try:
+        note_id = ObjectId(note_id)
+    except Exception:
+        return jsonify({"error": "Invalid note ID format"}), 400
+    status = enrichment_status(note_id)
+    if status is None:
+        return jsonify({"error": "Note not found"}), 404
+    return jsonify(status), 200
+
 @note_bp.route('/notes/update/<note_id>', methods=['PUT'])
 def update_note(note_id):
     data = request.json
@@ -57,7 +211,7 @@ def update_note(note_id):
     except Exception:
         return jsonify({"error": "Invalid note ID format"}), 400
 
-    result = modify_note(note_id, data['title'], data['content'], data['category'])
+    result = modify_note(note_id, data['title'], data['content'], data['category'], wait=parse_wait(request.args))
     return jsonify({"modified_count": result.modified_count}), 200
 
 @note_bp.route('/notes/remove/<note_id>', methods=['DELETE'])
@@ -72,8 +226,28 @@ def delete_note(note_id):
 @note_bp.route('/notes/search', methods=['GET'])
 def search_notes():
     keyword = request.args.get('keyword')
-    notes = find_notes(keyword)
-    # Convert ObjectId to string for JSON serialization
-    for note in notes:
-        note['_id'] = str(note['_id'])
+    if not keyword:
+        return jsonify({"error": "keyword is required"}), 400
+    try:
+        limit = parse_bounded_int(request.args.get('limit'), 'limit', None, MAX_PAGE_LIMIT)
+        offset = parse_offset(request.args)
+        min_sentiment = parse_sentiment(request.args, 'min_sentiment')
+        max_sentiment = parse_sentiment(request.args, 'max_sentiment')
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    prefix = parse_flag(request.args, 'prefix')
+    snippet = parse_flag(request.args, 'snippet')
+
+    notes, next_offset = find_notes(
+        keyword,
+        limit=limit,
+        offset=offset,
+        prefix=prefix,
+        category=request.args.get('category') or None,
+        min_sentiment=min_sentiment,
+        max_sentiment=max_sentiment,
+        snippet=snippet
+    )
+    if 'limit' in request.args or 'offset' in request.args:
+        return jsonify({"notes": notes, "next_offset": next_offset}), 200
     return jsonify(notes), 200
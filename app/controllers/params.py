@@ -0,0 +1,109 @@
+"""
+The params module parses and validates the query-string parameters shared by the note endpoints.
+The functions take the request's `args` mapping instead of reading a global request, so the synchronous (Flask) and asynchronous (Quart) controllers validate requests identically.
+
+Key Responsibilities:
+- **Flags**: Reads boolean flags such as `wait`, `prefix` and `snippet`, accepting `1`, `true` and `yes`.
+- **Projections**: Turns `fields=title,category` into a list of note fields, rejecting unknown ones.
+- **Duplicate Detection**: Reads the `duplicates` mode of note creation, defaulting to `DUPLICATE_DETECTION`.
+- **Change Tokens**: Reads the `since` token of the change feed.
+- **Listing Order**: Reads the `sort` order of the filtered note listing and its `after` cursor, whose format depends on the order.
+- **Bounds**: Validates integer limits, offsets and sentiment bounds, raising ValueError with a message suitable for a 400 response.
+"""
+
+from bson import ObjectId
+from config.config import DUPLICATE_DETECTION
+from model.note import NOTE_FIELDS
+
+DUPLICATE_MODES = ('off', 'warn', 'reject')
+LISTING_SORTS = ('-created', 'created', '-sentiment', 'sentiment')
+
+def parse_flag(args, name):
+    return args.get(name, '').lower() in ('1', 'true', 'yes')
+
+def parse_wait(args):
+    # None means "use the configured enrichment mode"
+    if args.get('wait') is None:
+        return None
+    return parse_flag(args, 'wait')
+
+def parse_duplicates(args):
+    mode = (args.get('duplicates') or DUPLICATE_DETECTION).lower()
+    if mode not in DUPLICATE_MODES:
+        raise ValueError(f"duplicates must be one of {', '.join(DUPLICATE_MODES)}")
+    return mode
+
+def parse_change_token(args):
+    # Tokens are the last change sequence number a client has seen; no token starts from the beginning
+    raw = args.get('since')
+    if not raw:
+        return 0
+    try:
+        token = int(raw)
+    except ValueError:
+        raise ValueError("Invalid change token")
+    if token < 0:
+        raise ValueError("Invalid change token")
+    return token
+
+def parse_sort(args):
+    # Newest first unless asked otherwise; a leading '-' puts the highest values first
+    sort = args.get('sort') or LISTING_SORTS[0]
+    if sort not in LISTING_SORTS:
+        raise ValueError(f"sort must be one of {', '.join(LISTING_SORTS)}")
+    return sort
+
+def parse_listing_cursor(args, sort):
+    # Creation-ordered pages continue after a note ID, sentiment-ordered ones after '<sentiment>_<note ID>'
+    raw = args.get('after')
+    if not raw:
+        return None
+    try:
+        if sort.lstrip('-') == 'created':
+            return ObjectId(raw)
+        sentiment, note_id = raw.rsplit('_', 1)
+        return float(sentiment), ObjectId(note_id)
+    except Exception:
+        raise ValueError("Invalid cursor format")
+
+def parse_fields(raw):
+    # Turn `fields=title,category` into a projection list, rejecting unknown fields
+    if not raw:
+        return None
+    fields = [field.strip() for field in raw.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in NOTE_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+def parse_bounded_int(raw, name, default, maximum):
+    if raw is None:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer")
+    if value < 1 or value > maximum:
+        raise ValueError(f"{name} must be between 1 and {maximum}")
+    return value
+
+def parse_offset(args):
+    try:
+        offset = int(args.get('offset', 0))
+    except ValueError:
+        raise ValueError("offset must be an integer")
+    if offset < 0:
+        raise ValueError("offset must not be negative")
+    return offset
+
+def parse_sentiment(args, name):
+    raw = args.get(name)
+    if raw is None or raw == '':
+        return None
+    try:
+        value = float(raw)
+    except ValueError:
+        raise ValueError(f"{name} must be a number")
+    if value < -1 or value > 1:
+        raise ValueError(f"{name} must be between -1 and 1")
+    return value
@@ -0,0 +1,51 @@
+"""
+Gunicorn settings for serving the application in production, replacing Flask's single-process development server.
+
+Key Responsibilities:
+- **Prefork Workers**: Serves with `WEB_WORKERS` worker processes of `WEB_THREADS` threads each, bound to `PORT`.
+- **Shared Models**: Loads the application, the categorisation model and TextBlob once in the master process before forking (`preload_app`), so workers share them copy-on-write instead of each loading its own copy.
+- **Per-Process State**: Refuses the `memory` storage and search backends with several workers and serves without the per-process note cache (see `config/workers.py`).
+- **Fork Safety**: The master never opens a database connection or starts a background thread. Every worker drops any inherited MongoDB client after the fork, so it opens its own connection pool, then starts its own background tasks.
+- **Graceful Shutdown**: On SIGTERM, workers finish in-flight requests within `WEB_GRACEFUL_TIMEOUT`, then drain the background enrichment queue and snapshot the search index before exiting. Each process writes its snapshot through its own temporary file.
+
+Usage (from the `app` directory):
+    gunicorn -c gunicorn.conf.py app:app
+"""
+
+import os
+from config.config import WEB_WORKERS, WEB_THREADS, WEB_TIMEOUT, WEB_GRACEFUL_TIMEOUT
+from config.workers import apply_worker_settings
+
+# Before the application is preloaded, since the note cache is created when it is imported
+apply_worker_settings(WEB_WORKERS)
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = WEB_WORKERS
+threads = WEB_THREADS
+worker_class = 'gthread' if WEB_THREADS > 1 else 'sync'
+timeout = WEB_TIMEOUT
+graceful_timeout = WEB_GRACEFUL_TIMEOUT
+preload_app = True
+accesslog = '-'
+
+def when_ready(server):
+    # Runs in the master after the application is loaded and before any worker is forked
+    from service.warmup_service import preload
+    from utils.startup import format_startup_report
+
+    preload()
+    server.log.info(format_startup_report())
+
+def post_fork(server, worker):
+    from repository.backends.mongo import reset_mongo_client
+    from service.warmup_service import start_background_tasks
+
+    reset_mongo_client()
+    start_background_tasks()
+
+def worker_exit(server, worker):
+    from service.enrichment_service import shutdown_enrichment
+    from service.search_service import save_search_index
+
+    shutdown_enrichment(wait=True)
+    save_search_index()
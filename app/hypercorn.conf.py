@@ -0,0 +1,28 @@
+"""
+Hypercorn settings for serving the asyncio variant of the application (`asgi.py`).
+
+Key Responsibilities:
+- **Worker Processes**: Serves with `WEB_WORKERS` worker processes bound to `PORT`, each running one event loop. Unlike the Gunicorn threads of the Flask application, a worker does not need a thread per open connection.
+- **Per-Process State**: Refuses the `memory` storage and search backends with several workers and serves without the per-process note cache (see `config/workers.py`).
+- **Graceful Shutdown**: On SIGTERM, workers stop accepting connections and finish in-flight requests within `WEB_GRACEFUL_TIMEOUT`, then run the application's shutdown hooks.
+
+Usage (from the `app` directory):
+    hypercorn -c file:hypercorn.conf.py asgi:app
+"""
+
+import os
+import sys
+
+# Unlike Gunicorn, Hypercorn does not put the working directory on the path before loading its settings
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config.config import WEB_WORKERS, WEB_GRACEFUL_TIMEOUT
+from config.workers import apply_worker_settings
+
+apply_worker_settings(WEB_WORKERS)
+
+bind = [f"0.0.0.0:{os.environ.get('PORT', 5000)}"]
+workers = WEB_WORKERS
+worker_class = 'asyncio'
+graceful_timeout = WEB_GRACEFUL_TIMEOUT
+accesslog = '-'
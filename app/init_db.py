@@ -1,23 +1,42 @@
-
 """
-This module is responsible for creating a text index on the 'title' and 'content' fields of the notes collection in a MongoDB database.
-Text indexing is essential for enabling efficient text search capabilities, allowing for fast and accurate retrieval of documents based on textual queries.
+This module is responsible for the database indexes of the application, applied as versioned migrations (see `repository/backends/mongo_migrations.py`).
+Indexing is essential for efficient queries: the text index serves keyword search, and the compound category and sentiment indexes serve the filtered listing of `GET /notes` without scanning the collection.
 
-The module assumes that the MongoDB server is running and accessible via the provided URI, and that the notes collection exists within the specified database.
+The module uses the application's shared storage backend, so it targets the same database (`MONGO_DB_NAME`) as the application.
+Applied migrations are recorded in the database, so running the module again only applies the ones added since; it is safe to run on every deployment.
+It also numbers notes written before change tracking existed, so they are part of the change feed.
+With the `memory` backend there is nothing to create.
 
+Usage (from the `app` directory):
+    python init_db.py
+    python init_db.py --status
 """
-from pymongo import MongoClient
-from config.config import MONGO_URI
+import argparse
+from repository.note_repository import ensure_indexes, backfill_change_sequence
 
-def create_text_index():
-    # Connect to MongoDB
-    client = MongoClient(MONGO_URI)
-    db = client.notes_db
+def create_indexes():
+    applied = ensure_indexes()
+    if applied:
+        print(f"Applied index migrations {', '.join(map(str, applied))}.")
+    else:
+        print("Indexes are up to date.")
 
-    # Create a text index on the 'title' and 'content' fields
-    db.notes.create_index([('title', 'text'), ('content', 'text')])
+def backfill_changes():
+    # Notes written before change tracking have no `seq` and would never appear in the change feed
+    print(f"Assigned change sequence numbers to {backfill_change_sequence()} existing notes.")
 
-    print("Text index created successfully.")
+def print_status():
+    # Only MongoDB keeps indexes, so only it is asked
+    from repository.backends.mongo import get_database
+    from repository.backends.mongo_migrations import migration_status
+    for migration in migration_status(get_database()):
+        print(f"{migration['version']:>3}  {'applied' if migration['applied'] else 'pending'}  {migration['description']}")
 
 if __name__ == '__main__':
-    create_text_index()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--status', action='store_true', help="list the index migrations and whether they are applied, without changing anything")
+    if parser.parse_args().status:
+        print_status()
+    else:
+        create_indexes()
+        backfill_changes()
@@ -0,0 +1,174 @@
+"""
+The compact_model.py module saves the note categorizer in a memory-mappable format and serves predictions from it.
+A pickled pipeline is unpickled into private memory by every worker process, so memory grows with the number of workers.
+In the compact format the large arrays are plain `.npy` files loaded with `mmap_mode='r'`, so every worker maps the same pages of the OS page cache instead of holding its own copy.
+
+Key Responsibilities:
+- **Export**: Converts a fitted `TfidfVectorizer` + `MultinomialNB` or `HashingVectorizer` + `MultinomialNB` pipeline into a directory holding a `meta.json` and one `.npy` file per array. Other pipelines are rejected with a ValueError.
+- **Compact Vocabulary**: Replaces the vectorizer's `vocabulary_` dict, which costs roughly a hundred bytes per term in Python objects, with one sorted fixed-width byte-string array. Feature columns are reordered to match, so a term's position in that array is its column and lookups are a vectorized binary search.
+- **Prediction**: `CompactCategorizer` reproduces the pipeline's `predict` and `predict_proba` (TF-IDF weighting, normalization and the Naive Bayes joint log-likelihood) on top of the mapped arrays, and exposes `classes_` like the pipeline does, so `utils/categorisation` can use either interchangeably.
+
+Usage (from the `app` directory):
+    python -m ml.compact_model ml/note_categorizer.pkl ml/note_categorizer.mmap
+"""
+
+import argparse
+import json
+import os
+import shutil
+import joblib
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.special import logsumexp
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.preprocessing import normalize
+
+COMPACT_FORMAT = 1
+META_FILENAME = 'meta.json'
+
+# Vectorizer settings that affect tokenization and weighting; everything else is either fitted state or irrelevant to prediction
+_TFIDF_PARAMS = ('lowercase', 'strip_accents', 'token_pattern', 'ngram_range', 'analyzer', 'stop_words',
+                 'binary', 'norm', 'use_idf', 'smooth_idf', 'sublinear_tf')
+_HASHING_PARAMS = ('lowercase', 'strip_accents', 'token_pattern', 'ngram_range', 'analyzer', 'stop_words',
+                   'binary', 'norm', 'n_features', 'alternate_sign')
+
+def is_compact_model(path):
+    return os.path.isfile(os.path.join(path, META_FILENAME))
+
+def _vectorizer_params(vectorizer, names):
+    params = vectorizer.get_params()
+    if params.get('preprocessor') is not None or params.get('tokenizer') is not None or callable(params.get('analyzer')):
+        raise ValueError("Vectorizers with custom preprocessors, tokenizers or analyzers cannot be exported")
+    exported = {name: params[name] for name in names}
+    exported['ngram_range'] = list(exported['ngram_range'])
+    if isinstance(exported['stop_words'], (set, frozenset)):
+        exported['stop_words'] = sorted(exported['stop_words'])
+    return exported
+
+def export_compact(model, path):
+    """
+    Write a fitted pipeline to `path` in the compact format, replacing any previous export there.
+
+    Args:
+        model (Pipeline): A fitted two-step pipeline of a TF-IDF or hashing vectorizer and a MultinomialNB classifier.
+        path (str): The output directory.
+    """
+    if not hasattr(model, 'steps') or len(model.steps) != 2 or not isinstance(model[-1], MultinomialNB):
+        raise ValueError("Only two-step pipelines ending in MultinomialNB can be exported")
+    vectorizer, classifier = model[0], model[-1]
+    arrays = {}
+    if isinstance(vectorizer, TfidfVectorizer):
+        terms = sorted(vectorizer.vocabulary_, key=lambda term: term.encode('utf-8'))
+        columns = np.array([vectorizer.vocabulary_[term] for term in terms], dtype=np.int64)
+        meta_vectorizer = {"type": "tfidf", "params": _vectorizer_params(vectorizer, _TFIDF_PARAMS)}
+        arrays["terms"] = np.array([term.encode('utf-8') for term in terms])
+        if vectorizer.use_idf:
+            arrays["idf"] = vectorizer.idf_[columns]
+    elif isinstance(vectorizer, HashingVectorizer):
+        columns = slice(None)
+        meta_vectorizer = {"type": "hashing", "params": _vectorizer_params(vectorizer, _HASHING_PARAMS)}
+    else:
+        raise ValueError(f"Unsupported vectorizer {type(vectorizer).__name__}")
+    arrays["feature_log_prob"] = np.ascontiguousarray(classifier.feature_log_prob_[:, columns])
+    arrays["class_log_prior"] = classifier.class_log_prior_
+
+    temporary_path = f"{path}.tmp"
+    shutil.rmtree(temporary_path, ignore_errors=True)
+    os.makedirs(temporary_path)
+    for name, array in arrays.items():
+        np.save(os.path.join(temporary_path, f"{name}.npy"), array, allow_pickle=False)
+    meta = {
+        "format": COMPACT_FORMAT,
+        "vectorizer": meta_vectorizer,
+        "classes": [str(category) for category in classifier.classes_]
+    }
+    with open(os.path.join(temporary_path, META_FILENAME), 'w') as meta_file:
+        json.dump(meta, meta_file, indent=2)
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(temporary_path, path)
+
+class CompactCategorizer:
+    """
+    A categorizer backed by memory-mapped arrays, with the prediction interface of the exported pipeline.
+
+    Args:
+        path (str): A directory written by `export_compact`.
+        mmap_mode (str): Passed to `numpy.load`; 'r' shares the arrays between processes, None loads private copies.
+    """
+
+    def __init__(self, path, mmap_mode='r'):
+        with open(os.path.join(path, META_FILENAME)) as meta_file:
+            meta = json.load(meta_file)
+        if meta.get("format") != COMPACT_FORMAT:
+            raise ValueError(f"Unsupported compact model format {meta.get('format')}")
+
+        def load(name):
+            array_path = os.path.join(path, f"{name}.npy")
+            return np.load(array_path, mmap_mode=mmap_mode, allow_pickle=False) if os.path.exists(array_path) else None
+
+        self.classes_ = np.array(meta["classes"])
+        self.feature_log_prob = load("feature_log_prob")
+        self.class_log_prior = load("class_log_prior")
+        params = dict(meta["vectorizer"]["params"], ngram_range=tuple(meta["vectorizer"]["params"]["ngram_range"]))
+        self.kind = meta["vectorizer"]["type"]
+        if self.kind == 'tfidf':
+            self.terms = load("terms")
+            self.idf = load("idf")
+            self.binary = params["binary"]
+            self.sublinear_tf = params["sublinear_tf"]
+            self.norm = params["norm"]
+            self._analyzer = TfidfVectorizer(**{name: params[name] for name in params
+                                                if name not in ('norm', 'use_idf', 'smooth_idf', 'sublinear_tf')}).build_analyzer()
+        else:
+            self._hashing = HashingVectorizer(**params)
+
+    def transform(self, contents):
+        """Vectorize contents exactly like the exported vectorizer, as a sparse matrix in the compact column order."""
+        if self.kind == 'hashing':
+            return self._hashing.transform(contents)
+        width = self.terms.dtype.itemsize
+        indptr, indices, counts = [0], [], []
+        for content in contents:
+            # Tokens longer than the longest term cannot be in the vocabulary, and would be truncated by the fixed width
+            tokens = [token for token in (term.encode('utf-8') for term in self._analyzer(content)) if len(token) <= width]
+            if tokens:
+                encoded = np.array(tokens, dtype=self.terms.dtype)
+                positions = np.minimum(np.searchsorted(self.terms, encoded), len(self.terms) - 1)
+                columns, frequencies = np.unique(positions[self.terms[positions] == encoded], return_counts=True)
+                indices.append(columns)
+                counts.append(frequencies)
+                indptr.append(indptr[-1] + len(columns))
+            else:
+                indptr.append(indptr[-1])
+        values = np.concatenate(counts).astype(np.float64) if counts else np.zeros(0)
+        columns = np.concatenate(indices) if indices else np.zeros(0, dtype=np.int64)
+        if self.binary:
+            values[:] = 1.0
+        if self.sublinear_tf:
+            values = np.log(values) + 1.0
+        if self.idf is not None:
+            values *= self.idf[columns]
+        matrix = csr_matrix((values, columns, indptr), shape=(len(contents), len(self.terms)))
+        return normalize(matrix, norm=self.norm, copy=False) if self.norm else matrix
+
+    def _joint_log_likelihood(self, contents):
+        return np.asarray(self.transform(contents) @ self.feature_log_prob.T) + self.class_log_prior
+
+    def predict(self, contents):
+        return self.classes_[np.argmax(self._joint_log_likelihood(contents), axis=1)]
+
+    def predict_proba(self, contents):
+        scores = self._joint_log_likelihood(contents)
+        return np.exp(scores - logsumexp(scores, axis=1, keepdims=True))
+
+def load_compact(path, mmap_mode='r'):
+    return CompactCategorizer(path, mmap_mode=mmap_mode)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('model', help="the pickled pipeline to convert")
+    parser.add_argument('output', help="the compact model directory to write")
+    args = parser.parse_args()
+    export_compact(joblib.load(args.model), args.output)
+    print(f"Compact model written to '{args.output}'.")
@@ -0,0 +1,154 @@
+"""
+The model_registry.py module keeps versioned categorizer artifacts in a directory and records which one is active.
+
+Key Responsibilities:
+- **Registration**: Copies a trained model into `MODEL_REGISTRY_DIR/<version>/model.pkl` (or `model.mmap` for a compact model directory, see `ml/compact_model.py`), next to a `metadata.json` with its SHA-256 hash, creation time, holdout accuracy, training size and a free-form description. The version is the first 12 hex digits of the hash, so registering the same artifact twice yields the same version.
+- **Activation**: Records the active version in a `CURRENT` file, replaced atomically, so a serving process never reads a half-written pointer. Serving processes pick up the change through their file watch or the admin reload endpoint.
+- **Lookup**: Lists registered versions with their metadata, and resolves a version to its artifact path.
+
+Usage (from the `app` directory):
+    python -m ml.model_registry register ml/note_categorizer.pkl --accuracy 0.91 --training-size 120000 --activate
+    python -m ml.model_registry list
+    python -m ml.model_registry activate 3f2a9c0b17de
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from config.config import MODEL_REGISTRY_DIR
+
+MODEL_FILENAME = 'model.pkl'
+COMPACT_MODEL_DIRNAME = 'model.mmap'
+METADATA_FILENAME = 'metadata.json'
+CURRENT_FILENAME = 'CURRENT'
+
+def file_hash(path):
+    """Return the SHA-256 hex digest of a model file, or of every file of a model directory in name order."""
+    digest = hashlib.sha256()
+    if os.path.isdir(path):
+        files = [os.path.join(path, name) for name in sorted(os.listdir(path))]
+    else:
+        files = [path]
+    for file_path in files:
+        with open(file_path, 'rb') as artifact:
+            for block in iter(lambda: artifact.read(1024 * 1024), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+def _write_atomically(path, text):
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, 'w') as output:
+        output.write(text)
+    os.replace(temporary_path, path)
+
+def model_path(version, registry_dir=MODEL_REGISTRY_DIR):
+    compact_path = os.path.join(registry_dir, version, COMPACT_MODEL_DIRNAME)
+    if os.path.isdir(compact_path):
+        return compact_path
+    return os.path.join(registry_dir, version, MODEL_FILENAME)
+
+def register_model(path, accuracy=None, training_size=None, description=None, activate=False, registry_dir=MODEL_REGISTRY_DIR):
+    """
+    Add a trained model artifact to the registry.
+
+    Args:
+        path (str): The joblib artifact, or compact model directory, to register.
+        accuracy (float): The holdout accuracy measured during training, if known.
+        training_size (int): The number of notes the model was trained on, if known.
+        description (str): A free-form note about the model.
+        activate (bool): Whether to make the new version the active one.
+
+    Returns:
+        dict: The metadata of the registered version.
+    """
+    sha256 = file_hash(path)
+    version = sha256[:12]
+    version_dir = os.path.join(registry_dir, version)
+    os.makedirs(version_dir, exist_ok=True)
+    if os.path.isdir(path):
+        target = os.path.join(version_dir, COMPACT_MODEL_DIRNAME)
+        shutil.rmtree(f"{target}.tmp", ignore_errors=True)
+        shutil.copytree(path, f"{target}.tmp")
+        shutil.rmtree(target, ignore_errors=True)
+    else:
+        target = os.path.join(version_dir, MODEL_FILENAME)
+        shutil.copyfile(path, f"{target}.tmp")
+    os.replace(f"{target}.tmp", target)
+    metadata = {
+        "version": version,
+        "sha256": sha256,
+        "created_at": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        "accuracy": accuracy,
+        "training_size": training_size,
+        "description": description
+    }
+    _write_atomically(os.path.join(version_dir, METADATA_FILENAME), json.dumps(metadata, indent=2))
+    if activate:
+        activate_model(version, registry_dir)
+    return metadata
+
+def activate_model(version, registry_dir=MODEL_REGISTRY_DIR):
+    """Make a registered version the active one; raises ValueError for unknown versions."""
+    if not os.path.exists(model_path(version, registry_dir)):
+        raise ValueError(f"Model version '{version}' is not registered")
+    _write_atomically(os.path.join(registry_dir, CURRENT_FILENAME), version)
+
+def active_version(registry_dir=MODEL_REGISTRY_DIR):
+    """Return the active version, or None if the registry is empty or missing."""
+    try:
+        with open(os.path.join(registry_dir, CURRENT_FILENAME)) as current:
+            return current.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+def current_pointer_mtime(registry_dir=MODEL_REGISTRY_DIR):
+    """Return the modification time of the `CURRENT` file, or None when there is none; used to watch for activations."""
+    try:
+        return os.stat(os.path.join(registry_dir, CURRENT_FILENAME)).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+def get_metadata(version, registry_dir=MODEL_REGISTRY_DIR):
+    try:
+        with open(os.path.join(registry_dir, version, METADATA_FILENAME)) as metadata:
+            return json.load(metadata)
+    except FileNotFoundError:
+        return None
+
+def list_models(registry_dir=MODEL_REGISTRY_DIR):
+    """Return the metadata of every registered version, oldest first."""
+    if not os.path.isdir(registry_dir):
+        return []
+    models = [get_metadata(entry, registry_dir) for entry in os.listdir(registry_dir)
+              if os.path.isdir(os.path.join(registry_dir, entry))]
+    return sorted((metadata for metadata in models if metadata), key=lambda metadata: metadata["created_at"])
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+    register = commands.add_parser('register', help="add a model artifact to the registry")
+    register.add_argument('path')
+    register.add_argument('--accuracy', type=float)
+    register.add_argument('--training-size', type=int)
+    register.add_argument('--description')
+    register.add_argument('--activate', action='store_true')
+    commands.add_parser('list', help="list registered versions")
+    activate = commands.add_parser('activate', help="make a registered version the active one")
+    activate.add_argument('version')
+    args = parser.parse_args()
+
+    if args.command == 'register':
+        metadata = register_model(args.path, args.accuracy, args.training_size, args.description, args.activate)
+        print(f"Registered model version {metadata['version']}{' (active)' if args.activate else ''}.")
+    elif args.command == 'list':
+        current = active_version()
+        for metadata in list_models():
+            marker = '*' if metadata["version"] == current else ' '
+            print(f"{marker} {metadata['version']}  {metadata['created_at']}  accuracy={metadata['accuracy']}  "
+                  f"training_size={metadata['training_size']}")
+    else:
+        activate_model(args.version)
+        print(f"Activated model version {args.version}.")
@@ -0,0 +1,198 @@
+"""
+The train_incremental.py script trains the note categorizer out of core, so it can learn from more notes than fit in memory.
+Where `train_model.py` fits TF-IDF and Naive Bayes on the whole dataset at once, this script streams fixed-size batches and updates the model with `partial_fit`.
+
+Key Responsibilities:
+- **Streaming Sources**: Reads `(content, category)` batches from a CSV file in chunks, or from the notes collection through the repository layer in `_id` order. Notes without a category, or categorized as 'Unknown', are skipped.
+- **Stateless Vectorization**: Uses a `HashingVectorizer`, which needs no vocabulary and so no pass over the full dataset. Signs are not alternated, keeping features non-negative as `MultinomialNB` requires.
+- **Incremental Training**: Updates a `MultinomialNB` classifier batch by batch with `partial_fit`. The set of categories is collected in a cheap first pass, because `partial_fit` needs every class up front.
+- **Holdout Evaluation**: Holds out a stable share of rows, chosen by a hash of their content so the split survives restarts, and reports accuracy on them at every checkpoint and at the end. At most `--holdout-max` rows are kept in memory.
+- **Checkpointing**: Writes the model, the stream position and the holdout to a checkpoint every `--checkpoint-every` batches, and resumes from it with `--resume`.
+- **Model Saving**: Saves a scikit-learn pipeline with joblib, so the artifact is a drop-in replacement loadable by `utils/categorisation.load_model`. With `--register` it is also added to the model registry with its accuracy and training size, and `--activate` makes it the serving version.
+
+Usage (from the `app` directory):
+    python -m ml.train_incremental --source csv --csv data/notes.csv
+    python -m ml.train_incremental --source mongo --batch-size 20000 --resume --register --activate
+"""
+
+import argparse
+import hashlib
+import os
+import joblib
+import pandas as pd
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.metrics import accuracy_score
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.pipeline import make_pipeline
+
+CHECKPOINT_FORMAT = 1
+
+def iter_csv_batches(path, batch_size, skip_rows=0):
+    """Yield lists of (content, category) pairs from a CSV file, with the number of rows read, after skipping `skip_rows` rows."""
+    chunks = pd.read_csv(path, chunksize=batch_size, skiprows=range(1, skip_rows + 1),
+                         usecols=['content', 'category'], dtype=str, encoding='utf-8-sig')
+    for chunk in chunks:
+        rows_read = len(chunk.index)
+        chunk = chunk.dropna()
+        yield list(zip(chunk['content'], chunk['category'])), rows_read
+
+def iter_collection_batches(batch_size, after=None):
+    """Yield lists of (content, category) pairs from the notes collection, with the `_id` of the last note of each batch."""
+    from repository.note_repository import iter_notes
+
+    batch, last_id = [], after
+    for note in iter_notes(batch_size=batch_size, fields=['content', 'category'], after=after):
+        last_id = note['_id']
+        if note.get('content') and note.get('category') not in (None, 'Unknown'):
+            batch.append((note['content'], note['category']))
+        if len(batch) == batch_size:
+            yield batch, last_id
+            batch = []
+    if batch:
+        yield batch, last_id
+
+def collect_classes(source, csv_path, batch_size):
+    """Return every category in the source, in sorted order."""
+    classes = set()
+    if source == 'csv':
+        for batch, _ in iter_csv_batches(csv_path, batch_size):
+            classes.update(category for _, category in batch)
+    else:
+        for batch, _ in iter_collection_batches(batch_size):
+            classes.update(category for _, category in batch)
+    return sorted(classes)
+
+def is_holdout(content, holdout_percent):
+    digest = hashlib.sha1(content.encode('utf-8')).digest()
+    return int.from_bytes(digest[:2], 'big') % 100 < holdout_percent
+
+def build_model(n_features, alpha):
+    return make_pipeline(
+        HashingVectorizer(n_features=n_features, alternate_sign=False),
+        MultinomialNB(alpha=alpha)
+    )
+
+def evaluate(model, holdout):
+    if not holdout or not hasattr(model[-1], 'classes_'):
+        return None
+    contents, categories = zip(*holdout)
+    return accuracy_score(categories, model.predict(list(contents)))
+
+def save_checkpoint(path, state):
+    temporary_path = f"{path}.tmp"
+    joblib.dump(state, temporary_path)
+    os.replace(temporary_path, path)
+
+def load_checkpoint(path, source):
+    try:
+        state = joblib.load(path)
+    except FileNotFoundError:
+        print(f"No checkpoint found at '{path}', starting from scratch.")
+        return None
+    if state.get("format") != CHECKPOINT_FORMAT or state.get("source") != source:
+        print(f"Checkpoint '{path}' was written for another format or source, starting from scratch.")
+        return None
+    print(f"Resuming from checkpoint after {state['batches']} batches ({state['rows']} rows).")
+    return state
+
+def train_incremental(source='csv', csv_path=os.path.join('data', 'notes.csv'), output_path=os.path.join('ml', 'note_categorizer.pkl'),
+                      checkpoint_path=os.path.join('ml', 'note_categorizer.ckpt'), batch_size=10000, holdout_percent=10,
+                      holdout_max=20000, checkpoint_every=10, resume=False, n_features=2 ** 20, alpha=0.01,
+                      register=False, activate=False):
+    """
+    Train the categorizer from a stream of batches and save it.
+
+    Args:
+        source (str): 'csv' to read `csv_path`, or 'mongo' to read the notes collection.
+        batch_size (int): The number of rows per `partial_fit` call.
+        holdout_percent (int): The percentage of rows held out for evaluation instead of training.
+        holdout_max (int): The maximum number of held-out rows kept in memory.
+        checkpoint_every (int): The number of batches between checkpoints; 0 disables checkpoints.
+        resume (bool): Continue from the checkpoint at `checkpoint_path` if there is one.
+        register (bool): Add the saved model to the model registry.
+        activate (bool): Make the registered model the serving version.
+
+    Returns:
+        float: The accuracy on the held-out rows, or None if nothing was held out.
+    """
+    state = load_checkpoint(checkpoint_path, source) if resume else None
+    if state is None:
+        classes = collect_classes(source, csv_path, batch_size)
+        if len(classes) < 2:
+            print("Error: at least two categories are needed to train the model.")
+            return None
+        print(f"Training on {len(classes)} categories: {', '.join(classes)}")
+        state = {
+            "format": CHECKPOINT_FORMAT,
+            "source": source,
+            "model": build_model(n_features, alpha),
+            "classes": classes,
+            "position": 0 if source == 'csv' else None,
+            "batches": 0,
+            "rows": 0,
+            "holdout": []
+        }
+
+    model, holdout = state["model"], state["holdout"]
+    vectorizer, classifier = model[0], model[-1]
+    if source == 'csv':
+        batches = iter_csv_batches(csv_path, batch_size, skip_rows=state["position"])
+    else:
+        batches = iter_collection_batches(batch_size, after=state["position"])
+
+    for batch, position in batches:
+        training = []
+        for content, category in batch:
+            if is_holdout(content, holdout_percent):
+                if len(holdout) < holdout_max:
+                    holdout.append((content, category))
+            else:
+                training.append((content, category))
+        if training:
+            contents, categories = zip(*training)
+            classifier.partial_fit(vectorizer.transform(contents), categories, classes=state["classes"])
+
+        state["position"] = state["position"] + position if source == 'csv' else position
+        state["batches"] += 1
+        state["rows"] += len(batch)
+        if checkpoint_every and state["batches"] % checkpoint_every == 0:
+            save_checkpoint(checkpoint_path, state)
+            accuracy = evaluate(model, holdout)
+            accuracy_text = f", holdout accuracy {accuracy:.3f}" if accuracy is not None else ""
+            print(f"Checkpoint after {state['batches']} batches ({state['rows']} rows){accuracy_text}")
+
+    if not hasattr(classifier, 'classes_'):
+        print("Error: no training rows were read, the model was not saved.")
+        return None
+
+    accuracy = evaluate(model, holdout)
+    if accuracy is not None:
+        print(f"Model Accuracy on {len(holdout)} held-out notes: {accuracy:.2f}")
+    joblib.dump(model, output_path)
+    print(f"Model saved to '{output_path}'.")
+    if checkpoint_every:
+        save_checkpoint(checkpoint_path, state)
+    if register:
+        from ml.model_registry import register_model
+
+        metadata = register_model(output_path, accuracy=accuracy, training_size=state["rows"] - len(holdout),
+                                  description=f"Incremental training on {source}", activate=activate)
+        print(f"Registered model version {metadata['version']}{' (active)' if activate else ''}.")
+    return accuracy
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--source', choices=['csv', 'mongo'], default='csv')
+    parser.add_argument('--csv', dest='csv_path', default=os.path.join('data', 'notes.csv'))
+    parser.add_argument('--output', dest='output_path', default=os.path.join('ml', 'note_categorizer.pkl'))
+    parser.add_argument('--checkpoint', dest='checkpoint_path', default=os.path.join('ml', 'note_categorizer.ckpt'))
+    parser.add_argument('--batch-size', type=int, default=10000)
+    parser.add_argument('--holdout-percent', type=int, default=10)
+    parser.add_argument('--holdout-max', type=int, default=20000)
+    parser.add_argument('--checkpoint-every', type=int, default=10)
+    parser.add_argument('--resume', action='store_true')
+    parser.add_argument('--n-features', type=int, default=2 ** 20)
+    parser.add_argument('--alpha', type=float, default=0.01)
+    parser.add_argument('--register', action='store_true', help="add the trained model to the model registry")
+    parser.add_argument('--activate', action='store_true', help="make the registered model the serving version")
+    train_incremental(**vars(parser.parse_args()))
@@ -1,6 +1,79 @@
+"""
+This module defines the `Note` model and its conversion to and from the documents stored by the repository.
+
+Key Responsibilities:
+- **Compact Representation**: `Note` declares its attributes in `__slots__`, so an instance holds no per-object `__dict__`, which keeps bulk creation of thousands of notes light.
+- **Validation**: Rejects attributes of the wrong type with a ValueError when a note is built, before anything reaches storage. Empty titles or contents are the service layer's concern and are accepted here.
+- **BSON Conversion**: `to_bson` returns the document to store, leaving out unset optional fields such as `_id`, `enrichment_status` and the change-tracking `created_at`, `updated_at` and `seq`, and `from_bson` rebuilds a note from a stored document, including notes written before `version` or `model_version` existed.
+"""
+
+from utils.cache import content_hash
+
+# Fields a client may request through the `fields=` projection on list endpoints
+NOTE_FIELDS = ('title', 'content', 'category', 'sentiment', 'version', 'model_version', 'created_at', 'updated_at', 'seq')
+
 class Note:
-    def __init__(self, title, content, category,sentiment=None):
+    __slots__ = ('id', 'title', 'content', 'category', 'sentiment', 'content_hash', 'version', 'model_version', 'enrichment_status',
+                 'created_at', 'updated_at', 'seq')
+
+    def __init__(self, title, content, category,sentiment=None, model_version=None):
+        if not isinstance(title, str) or not isinstance(content, str):
+            raise ValueError("Title and content must be strings")
+        if category is not None and not isinstance(category, str):
+            raise ValueError("Category must be a string")
+        if sentiment is not None and (isinstance(sentiment, bool) or not isinstance(sentiment, (int, float))):
+            raise ValueError("Sentiment must be a number")
+        # Assigned by the repository; None until the note is stored
+        self.id = None
         self.title = title
         self.content = content
         self.category = category
         self.sentiment = sentiment
+        # Stored so updates can tell whether the content, and therefore its enrichment, changed
+        self.content_hash = content_hash(content)
+        # Incremented on every update; used to build ETags for conditional requests
+        self.version = 1
+        # The categorizer version that suggested the category; None when the category was set by the user
+        self.model_version = model_version
+        # Set to 'pending' while enrichment runs in the background; never stored when unset
+        self.enrichment_status = None
+        # Set by the repository when the note is stored: UTC timestamps and its position in the change feed
+        self.created_at = None
+        self.updated_at = None
+        self.seq = None
+
+    def to_bson(self):
+        """Return the document to store for this note."""
+        document = {
+            "title": self.title,
+            "content": self.content,
+            "category": self.category,
+            "sentiment": self.sentiment,
+            "content_hash": self.content_hash,
+            "version": self.version,
+            "model_version": self.model_version
+        }
+        if self.enrichment_status is not None:
+            document["enrichment_status"] = self.enrichment_status
+        for field in ('created_at', 'updated_at', 'seq'):
+            value = getattr(self, field)
+            if value is not None:
+                document[field] = value
+        if self.id is not None:
+            document["_id"] = self.id
+        return document
+
+    @classmethod
+    def from_bson(cls, document):
+        """Build a note from a stored document; fields missing from older documents get their legacy defaults."""
+        note = cls(document['title'], document['content'], document.get('category'), document.get('sentiment'),
+                   model_version=document.get('model_version'))
+        note.id = document.get('_id')
+        note.content_hash = document.get('content_hash') or note.content_hash
+        # Notes written before versioning count as version 0, like in the ETag of `GET /notes/<id>`
+        note.version = document.get('version', 0)
+        note.enrichment_status = document.get('enrichment_status')
+        note.created_at = document.get('created_at')
+        note.updated_at = document.get('updated_at')
+        note.seq = document.get('seq')
+        return note
@@ -0,0 +1,169 @@
+"""
+This module is the asynchronous counterpart of `repository.note_repository`, used by the asyncio server in `asgi.py`.
+It offers the same operations as coroutines, so a request waiting on storage yields the event loop instead of holding a thread.
+
+Key Responsibilities:
+- **Storage Backend**: Picks the asynchronous store for the configured `STORAGE_BACKEND` on first use. `mongo` uses PyMongo's `AsyncMongoClient`. `memory` calls the process's in-memory store directly, since it never blocks, so both servers see the same notes. Any other registered backend runs its synchronous store in worker threads.
+- **Note Operations**: Adds, lists, filters, streams, reads, updates, deletes and searches notes exactly like the synchronous repository, including chunked bulk inserts, order-preserving multi-ID reads, the `version` increment on updates, the change tracking stamps and tombstones, the move of late writes past the change feed's served mark, and the statistics deltas of every write.
+- **Shared Note Cache**: Reads single notes through the same read-through cache and fill tokens as the synchronous repository and invalidates it on every write, so background enrichment done by the synchronous repository is never hidden by a stale entry.
+"""
+
+from bson import ObjectId
+from pymongo.results import DeleteResult
+from config.config import STORAGE_BACKEND
+from repository.backends.async_adapter import AsyncStoreAdapter
+from repository.backends.async_mongo import AsyncMongoNoteStore
+# The cache is shared with the synchronous repository, so invalidations from either side apply to both
+from repository.note_repository import get_store, _note_cache, begin_cache_fill, end_cache_fill, invalidate_note, _filters, _stats_state, _stats_after, _update_result, _stamp, _stamped, utc_now
+from utils.metrics import timed
+from utils.note_stats import STATS_FIELDS, stats_deltas, merge_deltas
+
+_async_backends = {
+    'mongo': AsyncMongoNoteStore,
+    'memory': lambda: AsyncStoreAdapter(get_store(), offload=False)
+}
+
+_store = None
+
+def get_async_store():
+    """Return the process-wide asynchronous note store for the configured backend, creating it on first use."""
+    global _store
+    if _store is None:
+        factory = _async_backends.get(STORAGE_BACKEND)
+        # Backends without an asynchronous implementation run in worker threads
+        _store = factory() if factory else AsyncStoreAdapter(get_store())
+    return _store
+
+def set_async_store(store):
+    """Replace the asynchronous note store in use and return the previous one."""
+    global _store
+    previous, _store = _store, store
+    _note_cache.clear()
+    return previous
+
+async def ping():
+    return await get_async_store().ping()
+
+async def _redeliver_late(written, deleted=False):
+    """Move acknowledged writes the change feed may already have served past to new sequence numbers, like `note_repository._redeliver_late`."""
+    store = get_async_store()
+    while written:
+        served = await store.served_sequence()
+        late = [(note_id, seq) for note_id, seq in written if seq <= served]
+        if not late:
+            return
+        first_seq = await store.next_sequence(len(late)) - len(late) + 1
+        moves = [(note_id, seq, first_seq + position) for position, (note_id, seq) in enumerate(late)]
+        moved = set(await store.restamp(moves, deleted))
+        for note_id in moved:
+            invalidate_note(note_id)
+        written = [(note_id, new_seq) for note_id, _, new_seq in moves if note_id in moved]
+
+async def record_stats(deltas):
+    if not deltas:
+        return
+    try:
+        await get_async_store().increment_stats(deltas)
+    except Exception as e:
+        print(f"Could not update note statistics: {e}")
+
+@timed('db.add_note')
+async def add_note(note):
+    _stamp(note, await get_async_store().next_sequence(), utc_now())
+    result = await get_async_store().insert_one(note.to_bson())
+    note.id = result.inserted_id
+    await _redeliver_late([(note.id, note.seq)])
+    await record_stats(stats_deltas(after=_stats_state(note)))
+    return result
+
+@timed('db.add_notes')
+async def add_notes(notes, chunk_size=1000):
+    """
+    Insert many notes in chunks, like `note_repository.add_notes`.
+
+    Returns:
+        tuple: The assigned IDs in input order, and a dict mapping failed positions to error messages.
+    """
+    errors = {}
+    for start in range(0, len(notes), chunk_size):
+        chunk = notes[start:start + chunk_size]
+        first_seq = await get_async_store().next_sequence(len(chunk)) - len(chunk) + 1
+        now = utc_now()
+        for position, note in enumerate(chunk):
+            note.id = ObjectId()
+            _stamp(note, first_seq + position, now)
+        chunk_errors = await get_async_store().insert_many([note.to_bson() for note in chunk], chunk_size=chunk_size)
+        errors.update({start + position: error for position, error in chunk_errors.items()})
+        await _redeliver_late([(note.id, note.seq) for position, note in enumerate(chunk) if position not in chunk_errors])
+    await record_stats(merge_deltas(stats_deltas(after=_stats_state(note)) for position, note in enumerate(notes) if position not in errors))
+    return [note.id for note in notes], errors
+
+@timed('db.get_all_notes')
+async def get_all_notes(limit=None, after=None, fields=None):
+    return await get_async_store().find_page(limit, after, fields)
+
+@timed('db.get_filtered_notes')
+async def get_filtered_notes(category=None, min_sentiment=None, max_sentiment=None, sort='_id', descending=False, limit=None, after=None, fields=None):
+    return await get_async_store().find_sorted(_filters(category, min_sentiment, max_sentiment), sort, descending, limit, after, fields)
+
+def iter_notes(batch_size=1000, fields=None, after=None):
+    """Return an async iterator over the notes in `_id` order, fetched in batches of `batch_size`."""
+    return get_async_store().iter_documents(batch_size, fields, after)
+
+@timed('db.get_notes_by_ids')
+async def get_notes_by_ids(note_ids, fields=None, category=None, min_sentiment=None, max_sentiment=None):
+    found = await get_async_store().find_by_ids(note_ids, fields, _filters(category, min_sentiment, max_sentiment))
+    notes = {note['_id']: note for note in found}
+    return [notes[note_id] for note_id in note_ids if note_id in notes]
+
+@timed('db.get_note_by_id')
+async def get_note_by_id(note_id, fields=None):
+    note = _note_cache.get(note_id)
+    if note is None:
+        if fields:
+            return await get_async_store().find_one(note_id, fields)
+        token = begin_cache_fill(note_id)
+        try:
+            note = await get_async_store().find_one(note_id)
+        finally:
+            end_cache_fill(note_id, token, note)
+        if note is None:
+            return None
+    if fields:
+        return {key: value for key, value in note.items() if key == '_id' or key in fields}
+    return dict(note)
+
+@timed('db.update_note')
+async def update_note(note_id, updated_note):
+    values = _stamped(updated_note, await get_async_store().next_sequence(), utc_now())
+    previous = await get_async_store().find_one_and_update(note_id, values, fields=STATS_FIELDS)
+    invalidate_note(note_id)
+    if previous is not None:
+        await _redeliver_late([(note_id, values['seq'])])
+        await record_stats(stats_deltas(previous, _stats_after(previous, updated_note)))
+    return _update_result(previous)
+
+@timed('db.delete_note')
+async def delete_note(note_id):
+    previous = await get_async_store().find_one_and_delete(note_id, fields=STATS_FIELDS)
+    invalidate_note(note_id)
+    if previous is not None:
+        tombstone = {"_id": note_id, "seq": await get_async_store().next_sequence(), "deleted_at": utc_now()}
+        await get_async_store().insert_tombstone(tombstone)
+        await _redeliver_late([(note_id, tombstone['seq'])], deleted=True)
+        await record_stats(stats_deltas(before=previous))
+    return DeleteResult({'n': 0 if previous is None else 1}, True)
+
+@timed('db.search_notes')
+async def search_notes(keyword, limit=None, offset=0, category=None, min_sentiment=None, max_sentiment=None, snippet_length=None):
+    return await get_async_store().search(keyword, limit, offset, _filters(category, min_sentiment, max_sentiment), snippet_length)
+
+@timed('db.get_stats')
+async def get_stats(since=None):
+    return await get_async_store().find_stats(since)
+
+@timed('db.get_changes')
+async def get_changes(after, limit, fields=None):
+    """Return the changes after a sequence number up to the served mark, like `note_repository.get_changes`."""
+    served = await get_async_store().mark_served()
+    return [change for change in await get_async_store().find_changes(after, limit, fields) if change['seq'] <= served]
@@ -0,0 +1,98 @@
+"""
+This module lets the asyncio server use storage backends that only have a synchronous API.
+
+Key Responsibilities:
+- **Async Interface**: Wraps a synchronous `NoteStore` with coroutines of the same names and arguments, matching `AsyncMongoNoteStore`.
+- **Thread Offloading**: Runs every call in a worker thread, so a backend doing blocking I/O never stalls the event loop. Backends that never block, like the in-memory store, can be called directly with `offload=False` to avoid the thread hop.
+- **Streaming**: Iterates a synchronous cursor in batches, fetching each batch in a worker thread.
+"""
+
+import asyncio
+from itertools import islice
+
+class AsyncStoreAdapter:
+    """
+    Asynchronous view of a synchronous note store.
+
+    Args:
+        store (NoteStore): The store to wrap.
+        offload (bool): Whether calls run in a worker thread; only pass False for stores that never block.
+    """
+
+    def __init__(self, store, offload=True):
+        self.store = store
+        self.offload = offload
+
+    async def _call(self, method, *args, **kwargs):
+        if self.offload:
+            return await asyncio.to_thread(method, *args, **kwargs)
+        return method(*args, **kwargs)
+
+    async def insert_one(self, document):
+        return await self._call(self.store.insert_one, document)
+
+    async def insert_many(self, documents, chunk_size=1000):
+        return await self._call(self.store.insert_many, documents, chunk_size)
+
+    async def find_one(self, note_id, fields=None):
+        return await self._call(self.store.find_one, note_id, fields)
+
+    async def find_page(self, limit=None, after=None, fields=None):
+        return await self._call(self.store.find_page, limit, after, fields)
+
+    async def iter_documents(self, batch_size=1000, fields=None, after=None):
+        documents = iter(await self._call(self.store.iter_documents, batch_size, fields, after))
+        while True:
+            batch = await self._call(lambda: list(islice(documents, batch_size)))
+            if not batch:
+                return
+            for document in batch:
+                yield document
+
+    async def find_sorted(self, filters=None, sort='_id', descending=False, limit=None, after=None, fields=None):
+        return await self._call(self.store.find_sorted, filters, sort, descending, limit, after, fields)
+
+    async def find_by_ids(self, note_ids, fields=None, filters=None):
+        return await self._call(self.store.find_by_ids, note_ids, fields, filters)
+
+    async def update_one(self, note_id, values, expected_content_hash=None):
+        return await self._call(self.store.update_one, note_id, values, expected_content_hash)
+
+    async def delete_one(self, note_id):
+        return await self._call(self.store.delete_one, note_id)
+
+    async def find_one_and_update(self, note_id, values, expected_content_hash=None, fields=None):
+        return await self._call(self.store.find_one_and_update, note_id, values, expected_content_hash, fields)
+
+    async def find_one_and_delete(self, note_id, fields=None):
+        return await self._call(self.store.find_one_and_delete, note_id, fields)
+
+    async def next_sequence(self, count=1):
+        return await self._call(self.store.next_sequence, count)
+
+    async def mark_served(self):
+        return await self._call(self.store.mark_served)
+
+    async def served_sequence(self):
+        return await self._call(self.store.served_sequence)
+
+    async def restamp(self, moves, deleted=False):
+        return await self._call(self.store.restamp, moves, deleted)
+
+    async def insert_tombstone(self, tombstone):
+        return await self._call(self.store.insert_tombstone, tombstone)
+
+    async def find_changes(self, after, limit, fields=None):
+        return await self._call(self.store.find_changes, after, limit, fields)
+
+    async def increment_stats(self, deltas):
+        return await self._call(self.store.increment_stats, deltas)
+
+    async def find_stats(self, since=None):
+        return await self._call(self.store.find_stats, since)
+
+    async def search(self, keyword, limit=None, offset=0, filters=None, snippet_length=None):
+        return await self._call(self.store.search, keyword, limit, offset, filters, snippet_length)
+
+    async def ping(self):
+        return await self._call(self.store.ping)
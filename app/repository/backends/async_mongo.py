@@ -0,0 +1,176 @@
+"""
+This module implements asynchronous note storage on MongoDB, for the asyncio server in `asgi.py`.
+
+Key Responsibilities:
+- **Shared Async Client**: Creates one PyMongo `AsyncMongoClient` per process on first use, with the same pool size and timeouts as the synchronous client. Its sockets are driven by the event loop, so a request waiting on the database holds no thread.
+- **Note Storage**: Implements the `NoteStore` operations as coroutines on the notes collection, with the same queries, projections and result objects as `MongoNoteStore`, including the statistics buckets and the change feed. Rebuilding the buckets and backfilling sequence numbers are left to the synchronous store.
+
+The client belongs to the event loop it was first used on; `close_async_mongo_client` must run on that loop at shutdown.
+"""
+
+from pymongo import AsyncMongoClient, ASCENDING, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+from config.config import (MONGO_URI, MONGO_DB_NAME, MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE,
+                           MONGO_CONNECT_TIMEOUT_MS, MONGO_SERVER_SELECTION_TIMEOUT_MS, MONGO_SOCKET_TIMEOUT_MS)
+from repository.backends.mongo import _projection, _filter_query, _sorted_query, _merge_changes, _stats_updates, _stats_query
+
+_client = None
+
+def get_async_mongo_client():
+    """Return the process-wide asynchronous MongoDB client, creating it on first use."""
+    global _client
+    # Only the event loop's thread creates the client, so no lock is needed
+    if _client is None:
+        _client = AsyncMongoClient(
+            MONGO_URI,
+            maxPoolSize=MONGO_MAX_POOL_SIZE,
+            minPoolSize=MONGO_MIN_POOL_SIZE,
+            connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+            serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS
+        )
+    return _client
+
+async def close_async_mongo_client():
+    global _client
+    if _client is not None:
+        client, _client = _client, None
+        await client.close()
+
+class AsyncMongoNoteStore:
+    """Asynchronous note storage on the `notes` collection of the configured database."""
+
+    @property
+    def collection(self):
+        return get_async_mongo_client()[MONGO_DB_NAME].notes
+
+    async def insert_one(self, document):
+        return await self.collection.insert_one(document)
+
+    async def insert_many(self, documents, chunk_size=1000):
+        errors = {}
+        for start in range(0, len(documents), chunk_size):
+            try:
+                await self.collection.insert_many(documents[start:start + chunk_size], ordered=False)
+            except BulkWriteError as e:
+                for write_error in e.details.get('writeErrors', []):
+                    errors[start + write_error['index']] = write_error.get('errmsg', 'Write failed')
+        return errors
+
+    async def find_one(self, note_id, fields=None):
+        return await self.collection.find_one({"_id": note_id}, _projection(fields))
+
+    async def find_page(self, limit=None, after=None, fields=None):
+        query = {"_id": {"$gt": after}} if after is not None else {}
+        cursor = self.collection.find(query, _projection(fields)).sort('_id', ASCENDING)
+        if limit is not None:
+            cursor = cursor.limit(limit)
+        return await cursor.to_list()
+
+    async def iter_documents(self, batch_size=1000, fields=None, after=None):
+        query = {"_id": {"$gt": after}} if after is not None else {}
+        cursor = self.collection.find(query, _projection(fields)).sort('_id', ASCENDING).batch_size(batch_size)
+        async with cursor:
+            async for document in cursor:
+                yield document
+
+    async def find_sorted(self, filters=None, sort='_id', descending=False, limit=None, after=None, fields=None):
+        query, sort_spec = _sorted_query(filters, sort, descending, after)
+        cursor = self.collection.find(query, _projection(fields and list(fields) + [sort])).sort(sort_spec)
+        if limit is not None:
+            cursor = cursor.limit(limit)
+        return await cursor.to_list()
+
+    async def find_by_ids(self, note_ids, fields=None, filters=None):
+        query = _filter_query(filters)
+        query["_id"] = {"$in": list(note_ids)}
+        return await self.collection.find(query, _projection(fields)).to_list()
+
+    async def update_one(self, note_id, values, expected_content_hash=None):
+        query = {'_id': note_id}
+        if expected_content_hash is not None:
+            query['content_hash'] = expected_content_hash
+        return await self.collection.update_one(query, {'$set': values, '$inc': {'version': 1}})
+
+    async def delete_one(self, note_id):
+        return await self.collection.delete_one({'_id': note_id})
+
+    async def find_one_and_update(self, note_id, values, expected_content_hash=None, fields=None):
+        query = {'_id': note_id}
+        if expected_content_hash is not None:
+            query['content_hash'] = expected_content_hash
+        return await self.collection.find_one_and_update(query, {'$set': values, '$inc': {'version': 1}},
+                                                         projection=_projection(fields), return_document=ReturnDocument.BEFORE)
+
+    async def find_one_and_delete(self, note_id, fields=None):
+        return await self.collection.find_one_and_delete({'_id': note_id}, projection=_projection(fields))
+
+    @property
+    def tombstones(self):
+        return get_async_mongo_client()[MONGO_DB_NAME].note_tombstones
+
+    async def next_sequence(self, count=1):
+        counter = await get_async_mongo_client()[MONGO_DB_NAME].counters.find_one_and_update(
+            {"_id": "note_seq"}, {"$inc": {"value": count}}, upsert=True, return_document=ReturnDocument.AFTER)
+        return counter["value"]
+
+    async def mark_served(self):
+        counters = get_async_mongo_client()[MONGO_DB_NAME].counters
+        counter = await counters.find_one({"_id": "note_seq"})
+        sequence = counter["value"] if counter else 0
+        await counters.update_one({"_id": "note_seq"}, {"$max": {"served": sequence}}, upsert=True)
+        return sequence
+
+    async def served_sequence(self):
+        counter = await get_async_mongo_client()[MONGO_DB_NAME].counters.find_one({"_id": "note_seq"}, {"served": 1})
+        return counter.get("served", 0) if counter else 0
+
+    async def restamp(self, moves, deleted=False):
+        if not moves:
+            return []
+        collection = self.tombstones if deleted else self.collection
+        await collection.bulk_write([UpdateOne({"_id": note_id, "seq": seq}, {"$set": {"seq": new_seq}}) for note_id, seq, new_seq in moves], ordered=False)
+        expected = {note_id: new_seq for note_id, _, new_seq in moves}
+        stored = await collection.find({"_id": {"$in": list(expected)}}, {"seq": 1}).to_list()
+        return [document['_id'] for document in stored if document.get('seq') == expected[document['_id']]]
+
+    async def insert_tombstone(self, tombstone):
+        await self.tombstones.replace_one({"_id": tombstone["_id"]}, tombstone, upsert=True)
+
+    async def find_changes(self, after, limit, fields=None):
+        query = {"seq": {"$gt": after}}
+        notes = await self.collection.find(query, _projection(fields and list(fields) + ['seq'])).sort('seq', ASCENDING).limit(limit).to_list()
+        tombstones = await self.tombstones.find(query).sort('seq', ASCENDING).limit(limit).to_list()
+        return _merge_changes(notes, tombstones, limit)
+
+    @property
+    def stats_collection(self):
+        return get_async_mongo_client()[MONGO_DB_NAME].note_stats
+
+    async def increment_stats(self, deltas):
+        if deltas:
+            await self.stats_collection.bulk_write(_stats_updates(deltas), ordered=False)
+
+    async def find_stats(self, since=None):
+        return await self.stats_collection.find(_stats_query(since)).to_list()
+
+    async def search(self, keyword, limit=None, offset=0, filters=None, snippet_length=None):
+        query = _filter_query(filters)
+        query["$text"] = {"$search": keyword}
+        projection = {"score": {"$meta": "textScore"}}
+        if snippet_length:
+            projection.update({
+                "title": 1,
+                "category": 1,
+                "sentiment": 1,
+                "snippet": {"$substrCP": [{"$ifNull": ["$content", ""]}, 0, snippet_length]}
+            })
+        cursor = self.collection.find(query, projection).sort([("score", {"$meta": "textScore"})])
+        if offset:
+            cursor = cursor.skip(offset)
+        if limit is not None:
+            cursor = cursor.limit(limit)
+        return await cursor.to_list()
+
+    async def ping(self):
+        return await get_async_mongo_client()[MONGO_DB_NAME].command('ping')
@@ -0,0 +1,166 @@
+"""
+This module defines the interface every note storage backend implements.
+The functions in `repository.note_repository` delegate to a backend, so the service layer does not depend on where notes are stored.
+
+Key Responsibilities:
+- **Storage Interface**: Declares the document operations the repository needs: inserts, reads by ID or page, filtered pages sorted by creation or sentiment, filtered multi-ID reads, guarded single and bulk updates, deletes (optionally returning the previous document), keyword search and a health check.
+- **Change Feed**: Declares the change sequence counter, the mark of the highest sequence number the feed has served, the tombstones of deleted notes, the `seq`-ordered read of both behind `GET /notes/changes`, and the move of a late write to a new sequence number.
+- **Statistics Buckets**: Declares the storage of the materialized note statistics (see `utils/note_stats.py`): incrementing buckets, reading them and rebuilding them from the notes.
+- **Shared Helpers**: Provides the field projection and filter matching that backends without a query language of their own use.
+
+Documents are plain dicts keyed by `_id`. Results of inserts, updates and deletes are PyMongo result objects, whatever the backend, so callers can keep reading `inserted_id`, `matched_count`, `modified_count` and `deleted_count`.
+"""
+
+class NoteStore:
+    """The interface every storage backend implements. Filters are dicts of `category`, `min_sentiment` and `max_sentiment`."""
+
+    def insert_one(self, document):
+        raise NotImplementedError
+
+    def insert_many(self, documents, chunk_size=1000):
+        """Insert documents that already carry an `_id`; return a dict mapping failed positions to error messages."""
+        raise NotImplementedError
+
+    def find_one(self, note_id, fields=None):
+        raise NotImplementedError
+
+    def find_page(self, limit=None, after=None, fields=None):
+        """Return documents in `_id` order, starting after the `after` ID."""
+        raise NotImplementedError
+
+    def iter_documents(self, batch_size=1000, fields=None, after=None):
+        raise NotImplementedError
+
+    def find_sorted(self, filters=None, sort='_id', descending=False, limit=None, after=None, fields=None):
+        """
+        Return filtered documents in `sort` order, ties broken by `_id`, starting after a keyset position.
+
+        Args:
+            filters (dict): The filters; a `sentiment` sort only returns notes that have a sentiment.
+            sort (str): `_id` (creation order) or `sentiment`.
+            descending (bool): Whether the highest values come first.
+            limit (int): The maximum number of documents.
+            after: The position of the last document of the previous page: its `_id`, or its (sentiment, `_id`) for a `sentiment` sort.
+            fields (list): The fields to return; `_id` and the sort field are always included.
+        """
+        raise NotImplementedError
+
+    def find_by_ids(self, note_ids, fields=None, filters=None):
+        """Return the matching documents in any order."""
+        raise NotImplementedError
+
+    def update_one(self, note_id, values, expected_content_hash=None):
+        """Set `values` and increment `version`, only if the stored content hash matches when one is expected."""
+        raise NotImplementedError
+
+    def delete_one(self, note_id):
+        raise NotImplementedError
+
+    def find_one_and_update(self, note_id, values, expected_content_hash=None, fields=None):
+        """Update like `update_one`, returning the document as it was before, projected on `fields`, or None when nothing matched."""
+        raise NotImplementedError
+
+    def find_one_and_delete(self, note_id, fields=None):
+        """Delete like `delete_one`, returning the deleted document projected on `fields`, or None when nothing matched."""
+        raise NotImplementedError
+
+    def bulk_update(self, updates):
+        """
+        Apply many guarded updates in one round trip, incrementing `version` like `update_one`.
+
+        Args:
+            updates (list): (note_id, guard, values) tuples; a note is only updated while its stored fields equal `guard`, and `values` carries a new `seq`.
+
+        Returns:
+            list: The IDs of the updated notes.
+        """
+        raise NotImplementedError
+
+    def next_sequence(self, count=1):
+        """Atomically reserve `count` consecutive change sequence numbers and return the last one."""
+        raise NotImplementedError
+
+    def current_sequence(self):
+        """Return the last change sequence number reserved so far, without reserving one; 0 before the first."""
+        raise NotImplementedError
+
+    def mark_served(self):
+        """Raise the served mark to the last change sequence number reserved so far, and return that number."""
+        raise NotImplementedError
+
+    def served_sequence(self):
+        """Return the served mark; 0 before the change feed was first read."""
+        raise NotImplementedError
+
+    def restamp(self, moves, deleted=False):
+        """
+        Give notes, or tombstones with `deleted`, new change sequence numbers, leaving their other fields as they are.
+
+        Args:
+            moves (list): (note_id, seq, new_seq) tuples; an entry only applies while the stored `seq` still equals `seq`.
+
+        Returns:
+            list: The IDs that were moved.
+        """
+        raise NotImplementedError
+
+    def insert_tombstone(self, tombstone):
+        """Record that a note was deleted; `tombstone` holds its `_id`, `seq` and `deleted_at`."""
+        raise NotImplementedError
+
+    def find_changes(self, after, limit, fields=None):
+        """Return up to `limit` notes and tombstones with a `seq` above `after`, in `seq` order; tombstones carry `deleted: True`."""
+        raise NotImplementedError
+
+    def backfill_sequence(self):
+        """Give a change sequence number to every note stored before change tracking existed; return how many were updated."""
+        raise NotImplementedError
+
+    def increment_stats(self, deltas):
+        """Apply `utils.note_stats.stats_deltas` increments to the statistics buckets, creating missing buckets."""
+        raise NotImplementedError
+
+    def find_stats(self, since=None):
+        """Return every category bucket and the day buckets from the `since` day on (all of them when None)."""
+        raise NotImplementedError
+
+    def rebuild_stats(self):
+        """Recompute every statistics bucket from the notes, replacing the stored ones; return the number of buckets."""
+        raise NotImplementedError
+
+    def search(self, keyword, limit=None, offset=0, filters=None, snippet_length=None):
+        """Return matches best first, each with a `score`, reduced to a `snippet` when `snippet_length` is set."""
+        raise NotImplementedError
+
+    def ensure_indexes(self):
+        pass
+
+    def ping(self):
+        raise NotImplementedError
+
+def project(document, fields):
+    # Mirrors MongoDB inclusion projections, which always keep `_id`
+    if not fields:
+        return dict(document)
+    return {key: value for key, value in document.items() if key == '_id' or key in fields}
+
+def sort_key(document, sort):
+    return document['_id'] if sort == '_id' else (document.get(sort), document['_id'])
+
+def any_filters(filters):
+    return bool(filters) and any(value is not None for value in filters.values())
+
+def matches_filters(document, filters):
+    if not filters:
+        return True
+    category = filters.get('category')
+    if category is not None and document.get('category') != category:
+        return False
+    sentiment = document.get('sentiment')
+    min_sentiment = filters.get('min_sentiment')
+    max_sentiment = filters.get('max_sentiment')
+    if min_sentiment is not None and (sentiment is None or sentiment < min_sentiment):
+        return False
+    if max_sentiment is not None and (sentiment is None or sentiment > max_sentiment):
+        return False
+    return True
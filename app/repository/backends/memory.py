@@ -0,0 +1,276 @@
+"""
+This module implements note storage in process memory, with no database server.
+It serves local development, tests and benchmarks, and single-process deployments that can afford to lose notes on restart.
+
+Key Responsibilities:
+- **Document Store**: Keeps notes in a dict keyed by `_id`, plus a sorted list of IDs for `_id`-ordered pages and keyset pagination.
+- **Sorted Listing**: Serves filtered pages sorted by creation or sentiment by scanning the stored notes, since there is no secondary index to read them in order from.
+- **Keyword Search**: Maintains a BM25 inverted index over titles and contents, standing in for MongoDB's `$text` index. Scores are BM25 scores, not MongoDB text scores, so they are only comparable within one backend.
+- **Change Feed**: Keeps a sorted list of the change sequence numbers of notes and tombstones, so a page of changes is found by bisection instead of a scan.
+- **Statistics Buckets**: Keeps the materialized note statistics in a dict of buckets, rebuilt by a scan of the stored notes.
+- **MongoDB Semantics**: Assigns missing ObjectIds, rejects duplicate IDs and returns PyMongo result objects, so the repository behaves the same on either backend.
+
+Every operation holds a single lock, and documents are copied in and out so callers never share state with the store.
+"""
+
+import bisect
+import threading
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+from pymongo.results import InsertOneResult, UpdateResult, DeleteResult
+from repository.backends.base import NoteStore, project, matches_filters, any_filters, sort_key
+from utils.note_stats import DAY_BUCKET, aggregate_buckets, bucket_id
+from utils.search_index import InvertedIndex
+
+class MemoryNoteStore(NoteStore):
+    """Note storage in a dict, searchable through an in-process BM25 index."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._documents = {}
+        self._ids = []
+        self._index = InvertedIndex()
+        self._stats = {}
+        self._sequence = 0
+        self._served = 0
+        self._tombstones = {}
+        # Sorted change sequence numbers, each mapping to the note or tombstone that holds it
+        self._seqs = []
+        self._by_seq = {}
+
+    def __len__(self):
+        return len(self._documents)
+
+    def insert_one(self, document):
+        # Like PyMongo, assign the ID on the caller's document
+        document.setdefault('_id', ObjectId())
+        with self._lock:
+            self._insert(document)
+        return InsertOneResult(document['_id'], True)
+
+    def insert_many(self, documents, chunk_size=1000):
+        errors = {}
+        with self._lock:
+            for position, document in enumerate(documents):
+                document.setdefault('_id', ObjectId())
+                try:
+                    self._insert(document)
+                except DuplicateKeyError as e:
+                    errors[position] = str(e)
+        return errors
+
+    def find_one(self, note_id, fields=None):
+        with self._lock:
+            document = self._documents.get(note_id)
+            return project(document, fields) if document is not None else None
+
+    def find_page(self, limit=None, after=None, fields=None):
+        with self._lock:
+            start = bisect.bisect_right(self._ids, after) if after is not None else 0
+            end = start + limit if limit is not None else len(self._ids)
+            return [project(self._documents[note_id], fields) for note_id in self._ids[start:end]]
+
+    def iter_documents(self, batch_size=1000, fields=None, after=None):
+        # Pages are read one at a time, so writes between batches are seen like on a live cursor
+        while True:
+            batch = self.find_page(batch_size, after, fields)
+            yield from batch
+            if len(batch) < batch_size:
+                return
+            after = batch[-1]['_id']
+
+    def find_sorted(self, filters=None, sort='_id', descending=False, limit=None, after=None, fields=None):
+        fields = fields and list(fields) + [sort]
+        with self._lock:
+            documents = [document for document in self._documents.values() if matches_filters(document, filters)
+                         and (sort == '_id' or document.get(sort) is not None)]
+            if after is not None:
+                documents = [document for document in documents
+                             if (sort_key(document, sort) < after if descending else sort_key(document, sort) > after)]
+            documents.sort(key=lambda document: sort_key(document, sort), reverse=descending)
+            return [project(document, fields) for document in documents[:limit]]
+
+    def find_by_ids(self, note_ids, fields=None, filters=None):
+        with self._lock:
+            documents = (self._documents.get(note_id) for note_id in dict.fromkeys(note_ids))
+            return [project(document, fields) for document in documents
+                    if document is not None and matches_filters(document, filters)]
+
+    def update_one(self, note_id, values, expected_content_hash=None):
+        if self.find_one_and_update(note_id, values, expected_content_hash, fields=['_id']) is None:
+            return UpdateResult({'n': 0, 'nModified': 0}, True)
+        return UpdateResult({'n': 1, 'nModified': 1}, True)
+
+    def delete_one(self, note_id):
+        if self.find_one_and_delete(note_id, fields=['_id']) is None:
+            return DeleteResult({'n': 0}, True)
+        return DeleteResult({'n': 1}, True)
+
+    def find_one_and_update(self, note_id, values, expected_content_hash=None, fields=None):
+        with self._lock:
+            document = self._documents.get(note_id)
+            if document is None or (expected_content_hash is not None
+                                    and document.get('content_hash') != expected_content_hash):
+                return None
+            previous = project(document, fields)
+            self._forget_seq(document)
+            document.update(values)
+            self._track_seq(document)
+            document['version'] = document.get('version', 0) + 1
+            if 'title' in values or 'content' in values:
+                self._index.add(note_id, document.get('title'), document.get('content'))
+            return previous
+
+    def bulk_update(self, updates):
+        with self._lock:
+            updated = []
+            for note_id, guard, values in updates:
+                document = self._documents.get(note_id)
+                if document is None or any(document.get(field) != value for field, value in guard.items()):
+                    continue
+                self._forget_seq(document)
+                document.update(values)
+                self._track_seq(document)
+                document['version'] = document.get('version', 0) + 1
+                updated.append(note_id)
+            return updated
+
+    def find_one_and_delete(self, note_id, fields=None):
+        with self._lock:
+            document = self._documents.pop(note_id, None)
+            if document is None:
+                return None
+            del self._ids[bisect.bisect_left(self._ids, note_id)]
+            self._index.remove(note_id)
+            self._forget_seq(document)
+            return project(document, fields)
+
+    def next_sequence(self, count=1):
+        with self._lock:
+            self._sequence += count
+            return self._sequence
+
+    def current_sequence(self):
+        with self._lock:
+            return self._sequence
+
+    def mark_served(self):
+        with self._lock:
+            self._served = self._sequence
+            return self._served
+
+    def served_sequence(self):
+        with self._lock:
+            return self._served
+
+    def restamp(self, moves, deleted=False):
+        documents = self._tombstones if deleted else self._documents
+        moved = []
+        with self._lock:
+            for note_id, seq, new_seq in moves:
+                document = documents.get(note_id)
+                if document is None or document.get('seq') != seq:
+                    continue
+                self._forget_seq(document)
+                document['seq'] = new_seq
+                self._track_seq(document)
+                moved.append(note_id)
+        return moved
+
+    def insert_tombstone(self, tombstone):
+        with self._lock:
+            if tombstone['_id'] in self._tombstones:
+                self._forget_seq(self._tombstones[tombstone['_id']])
+            self._tombstones[tombstone['_id']] = dict(tombstone, deleted=True)
+            self._track_seq(self._tombstones[tombstone['_id']])
+
+    def find_changes(self, after, limit, fields=None):
+        with self._lock:
+            start = bisect.bisect_right(self._seqs, after)
+            changes = []
+            for seq in self._seqs[start:start + limit]:
+                note_id, deleted = self._by_seq[seq]
+                if deleted:
+                    changes.append(dict(self._tombstones[note_id]))
+                else:
+                    changes.append(project(self._documents[note_id], fields and list(fields) + ['seq']))
+            return changes
+
+    def backfill_sequence(self):
+        with self._lock:
+            missing = [note_id for note_id in self._ids if self._documents[note_id].get('seq') is None]
+            for note_id in missing:
+                self._documents[note_id]['seq'] = self.next_sequence()
+                self._track_seq(self._documents[note_id])
+            return len(missing)
+
+    def increment_stats(self, deltas):
+        with self._lock:
+            for (kind, key), delta in deltas.items():
+                bucket = self._stats.setdefault(bucket_id(kind, key), {
+                    "kind": kind, "key": key, "count": 0, "sentiment_sum": 0.0, "sentiment_count": 0})
+                for name, value in delta.items():
+                    bucket[name] += value
+
+    def find_stats(self, since=None):
+        with self._lock:
+            return [dict(bucket) for bucket in self._stats.values()
+                    if bucket["kind"] != DAY_BUCKET or since is None or bucket["key"] >= since]
+
+    def rebuild_stats(self):
+        with self._lock:
+            self._stats = {}
+            self.increment_stats(aggregate_buckets(self._documents.values()))
+            return len(self._stats)
+
+    def search(self, keyword, limit=None, offset=0, filters=None, snippet_length=None):
+        with self._lock:
+            # Without filters every ranked match is kept, so only the requested page needs ranking
+            wanted = offset + limit if limit is not None and not any_filters(filters) else len(self._index)
+            ranked = self._index.search(keyword, k=wanted)
+            matches = []
+            for note_id, score in ranked:
+                document = self._documents[note_id]
+                if not matches_filters(document, filters):
+                    continue
+                if snippet_length:
+                    match = project(document, ['title', 'category', 'sentiment'])
+                    match['snippet'] = (document.get('content') or '')[:snippet_length]
+                else:
+                    match = dict(document)
+                match['score'] = score
+                matches.append(match)
+                if limit is not None and len(matches) >= offset + limit:
+                    break
+            return matches[offset:]
+
+    def ping(self):
+        return {"ok": 1.0}
+
+    def _insert(self, document):
+        note_id = document['_id']
+        if note_id in self._documents:
+            raise DuplicateKeyError(f"Duplicate key: _id {note_id}")
+        self._documents[note_id] = dict(document)
+        # ObjectIds grow over time, so new notes are usually appended at the end
+        if not self._ids or self._ids[-1] < note_id:
+            self._ids.append(note_id)
+        else:
+            bisect.insort(self._ids, note_id)
+        self._index.add(note_id, document.get('title'), document.get('content'))
+        self._track_seq(self._documents[note_id])
+
+    def _track_seq(self, document):
+        seq = document.get('seq')
+        if seq is not None:
+            # Sequence numbers grow, so they are usually appended at the end
+            if not self._seqs or self._seqs[-1] < seq:
+                self._seqs.append(seq)
+            else:
+                bisect.insort(self._seqs, seq)
+            self._by_seq[seq] = (document['_id'], bool(document.get('deleted')))
+
+    def _forget_seq(self, document):
+        seq = document.get('seq')
+        if seq is not None and self._by_seq.pop(seq, None) is not None:
+            del self._seqs[bisect.bisect_left(self._seqs, seq)]
@@ -0,0 +1,339 @@
+"""
+This module implements note storage on MongoDB.
+
+Key Responsibilities:
+- **Shared Client**: Creates one `MongoClient` per process on first use, so the application, the repository and the maintenance scripts share a single connection pool. The pool size and timeouts come from the configuration.
+- **Note Storage**: Implements the `NoteStore` interface on the notes collection, using the `$text` index for keyword search, the compound category and sentiment indexes for sorted, filtered pages, and unordered `bulk_write` batches of `UpdateOne` for bulk updates.
+- **Index Migrations**: Creates the indexes through the versioned migrations of `repository/backends/mongo_migrations.py`.
+- **Index Test Mode**: With `MONGO_ASSERT_INDEXED`, explains every query before running it and raises an `AssertionError` when the winning plan scans the whole collection, so a test run proves that each query is served by an index.
+- **Change Feed**: Reserves change sequence numbers from a counter document with `$inc`, keeps the served mark in the same document, raised with `$max`, keeps tombstones of deleted notes in `note_tombstones`, and reads changes from both collections through their `seq` indexes.
+- **Statistics Buckets**: Keeps the materialized note statistics in the `note_stats` collection, updated with unordered bulks of `$inc` upserts and rebuilt by an aggregation pipeline that replaces the collection with `$out`.
+
+The client is created lazily, so importing this module never touches the network. A process forked after the client was created must call `reset_mongo_client`, so it opens its own pool instead of sharing the parent's sockets.
+"""
+
+import heapq
+import threading
+from pymongo import MongoClient, ASCENDING, DESCENDING, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+from config.config import (MONGO_URI, MONGO_DB_NAME, MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE,
+                           MONGO_CONNECT_TIMEOUT_MS, MONGO_SERVER_SELECTION_TIMEOUT_MS, MONGO_SOCKET_TIMEOUT_MS,
+                           MONGO_ASSERT_INDEXED)
+from repository.backends.base import NoteStore
+from repository.backends.mongo_migrations import migrate_indexes
+from utils.note_stats import CATEGORY_BUCKET, DAY_BUCKET, bucket_id
+from utils.startup import timed_phase
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_mongo_client():
+    """Return the process-wide MongoDB client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                with timed_phase('db_client'):
+                    _client = MongoClient(
+                        MONGO_URI,
+                        maxPoolSize=MONGO_MAX_POOL_SIZE,
+                        minPoolSize=MONGO_MIN_POOL_SIZE,
+                        connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+                        serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+                        socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS
+                    )
+    return _client
+
+def close_mongo_client():
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+def reset_mongo_client():
+    """Forget a client inherited from the parent process, without closing it, since the parent still owns its sockets."""
+    global _client, _client_lock
+    _client = None
+    # A lock held by another thread at fork time would stay locked forever in the child
+    _client_lock = threading.Lock()
+
+def get_database():
+    return get_mongo_client()[MONGO_DB_NAME]
+
+def _projection(fields):
+    # `_id` is always returned by MongoDB unless explicitly excluded
+    if not fields:
+        return None
+    return {field: 1 for field in fields}
+
+def _filter_query(filters):
+    filters = filters or {}
+    query = {}
+    if filters.get('category') is not None:
+        query["category"] = filters['category']
+    sentiment_range = {}
+    if filters.get('min_sentiment') is not None:
+        sentiment_range["$gte"] = filters['min_sentiment']
+    if filters.get('max_sentiment') is not None:
+        sentiment_range["$lte"] = filters['max_sentiment']
+    if sentiment_range:
+        query["sentiment"] = sentiment_range
+    return query
+
+def _sorted_query(filters, sort, descending, after):
+    """Return the query and sort specification of a `find_sorted` page, both matching a compound index of migration 2."""
+    query = _filter_query(filters)
+    direction = DESCENDING if descending else ASCENDING
+    past = "$lt" if descending else "$gt"
+    if sort == '_id':
+        if after is not None:
+            query["_id"] = {past: after}
+        return query, [('_id', direction)]
+    sentiment_range = query.setdefault("sentiment", {})
+    # Only numbers sort by sentiment; the open bound keeps notes still waiting for their analysis out of the page
+    bound = "$lte" if descending else "$gte"
+    if bound not in sentiment_range:
+        sentiment_range[bound] = float('inf') if descending else float('-inf')
+    if after is not None:
+        value, note_id = after
+        # Tightening the range bound lets the index scan start at the previous page's last sentiment
+        sentiment_range[bound] = min(sentiment_range[bound], value) if descending else max(sentiment_range[bound], value)
+        query["$or"] = [{"sentiment": {past: value}}, {"_id": {past: note_id}}]
+    return query, [('sentiment', direction), ('_id', direction)]
+
+def collection_scans(plan):
+    """Return the `COLLSCAN` stages of an `explain()` plan, searching nested input stages and shard plans."""
+    if isinstance(plan, list):
+        return [stage for item in plan for stage in collection_scans(item)]
+    if not isinstance(plan, dict):
+        return []
+    found = [plan] if plan.get('stage') == 'COLLSCAN' else []
+    return found + [stage for value in plan.values() for stage in collection_scans(value)]
+
+def _indexed(cursor):
+    if MONGO_ASSERT_INDEXED:
+        # `explain` runs on a copy of the cursor, so the cursor itself is left unread
+        explanation = cursor.explain()
+        winning_plan = explanation.get('queryPlanner', {}).get('winningPlan', explanation)
+        if collection_scans(winning_plan):
+            raise AssertionError(f"Query on '{cursor.collection.name}' scans the whole collection: {winning_plan}")
+    return cursor
+
+def _merge_changes(notes, tombstones, limit):
+    # Both lists are already in `seq` order, so a merge keeps the feed ordered without sorting
+    for tombstone in tombstones:
+        tombstone['deleted'] = True
+    return list(heapq.merge(notes, tombstones, key=lambda change: change['seq']))[:limit]
+
+def _stats_updates(deltas):
+    # One upsert per bucket; `$inc` makes concurrent writers from any process add up instead of overwriting each other
+    return [
+        UpdateOne({"_id": bucket_id(kind, key)}, {"$inc": delta, "$setOnInsert": {"kind": kind, "key": key}}, upsert=True)
+        for (kind, key), delta in deltas.items()
+    ]
+
+def _stats_query(since):
+    if since is None:
+        # Every bucket, read through the (kind, key) index rather than a collection scan
+        return {"kind": {"$in": [CATEGORY_BUCKET, DAY_BUCKET]}}
+    return {"$or": [{"kind": CATEGORY_BUCKET}, {"kind": DAY_BUCKET, "key": {"$gte": since}}]}
+
+def _group_buckets(kind, key):
+    return [
+        {"$group": {
+            "_id": key,
+            "count": {"$sum": 1},
+            "sentiment_sum": {"$sum": {"$cond": [{"$isNumber": "$sentiment"}, "$sentiment", 0]}},
+            "sentiment_count": {"$sum": {"$cond": [{"$isNumber": "$sentiment"}, 1, 0]}}
+        }},
+        {"$project": {
+            "_id": {"$concat": [f"{kind}:", {"$ifNull": ["$_id", ""]}]},
+            "kind": {"$literal": kind},
+            "key": "$_id",
+            "count": 1,
+            "sentiment_sum": 1,
+            "sentiment_count": 1
+        }}
+    ]
+
+# Recomputes every statistics bucket in one pass over the notes on the server, then swaps the result in with `$out`
+STATS_REBUILD_PIPELINE = [
+    {"$project": {"category": 1, "sentiment": 1}},
+    {"$facet": {
+        "categories": _group_buckets(CATEGORY_BUCKET, "$category"),
+        "days": _group_buckets(DAY_BUCKET, {"$dateToString": {"format": "%Y-%m-%d", "date": {"$toDate": "$_id"}}})
+    }},
+    {"$project": {"buckets": {"$concatArrays": ["$categories", "$days"]}}},
+    {"$unwind": "$buckets"},
+    {"$replaceRoot": {"newRoot": "$buckets"}},
+    {"$out": "note_stats"}
+]
+
+class MongoNoteStore(NoteStore):
+    """Note storage on the `notes` collection of the configured database."""
+
+    @property
+    def collection(self):
+        return get_database().notes
+
+    def insert_one(self, document):
+        return self.collection.insert_one(document)
+
+    def insert_many(self, documents, chunk_size=1000):
+        errors = {}
+        for start in range(0, len(documents), chunk_size):
+            try:
+                self.collection.insert_many(documents[start:start + chunk_size], ordered=False)
+            except BulkWriteError as e:
+                for write_error in e.details.get('writeErrors', []):
+                    errors[start + write_error['index']] = write_error.get('errmsg', 'Write failed')
+        return errors
+
+    def find_one(self, note_id, fields=None):
+        return self.collection.find_one({"_id": note_id}, _projection(fields))
+
+    def find_page(self, limit=None, after=None, fields=None):
+        query = {"_id": {"$gt": after}} if after is not None else {}
+        cursor = self.collection.find(query, _projection(fields)).sort('_id', ASCENDING)
+        if limit is not None:
+            cursor = cursor.limit(limit)
+        return list(_indexed(cursor))
+
+    def iter_documents(self, batch_size=1000, fields=None, after=None):
+        query = {"_id": {"$gt": after}} if after is not None else {}
+        return _indexed(self.collection.find(query, _projection(fields)).sort('_id', ASCENDING).batch_size(batch_size))
+
+    def find_sorted(self, filters=None, sort='_id', descending=False, limit=None, after=None, fields=None):
+        query, sort_spec = _sorted_query(filters, sort, descending, after)
+        cursor = self.collection.find(query, _projection(fields and list(fields) + [sort])).sort(sort_spec)
+        if limit is not None:
+            cursor = cursor.limit(limit)
+        return list(_indexed(cursor))
+
+    def find_by_ids(self, note_ids, fields=None, filters=None):
+        query = _filter_query(filters)
+        query["_id"] = {"$in": list(note_ids)}
+        return list(_indexed(self.collection.find(query, _projection(fields))))
+
+    def update_one(self, note_id, values, expected_content_hash=None):
+        query = {'_id': note_id}
+        if expected_content_hash is not None:
+            query['content_hash'] = expected_content_hash
+        return self.collection.update_one(query, {'$set': values, '$inc': {'version': 1}})
+
+    def delete_one(self, note_id):
+        return self.collection.delete_one({'_id': note_id})
+
+    def find_one_and_update(self, note_id, values, expected_content_hash=None, fields=None):
+        query = {'_id': note_id}
+        if expected_content_hash is not None:
+            query['content_hash'] = expected_content_hash
+        return self.collection.find_one_and_update(query, {'$set': values, '$inc': {'version': 1}},
+                                                   projection=_projection(fields), return_document=ReturnDocument.BEFORE)
+
+    def bulk_update(self, updates):
+        if not updates:
+            return []
+        result = self.collection.bulk_write([UpdateOne(dict(guard, _id=note_id), {'$set': values, '$inc': {'version': 1}})
+                                             for note_id, guard, values in updates], ordered=False)
+        if result.matched_count == len(updates):
+            return [note_id for note_id, _, _ in updates]
+        # A bulk result only has counts, so the notes that still carry the new sequence number tell which guards matched
+        expected = {note_id: values['seq'] for note_id, _, values in updates}
+        stored = _indexed(self.collection.find({"_id": {"$in": list(expected)}}, {"seq": 1}))
+        return [document['_id'] for document in stored if document.get('seq') == expected[document['_id']]]
+
+    def find_one_and_delete(self, note_id, fields=None):
+        return self.collection.find_one_and_delete({'_id': note_id}, projection=_projection(fields))
+
+    @property
+    def tombstones(self):
+        return get_database().note_tombstones
+
+    def next_sequence(self, count=1):
+        counter = get_database().counters.find_one_and_update(
+            {"_id": "note_seq"}, {"$inc": {"value": count}}, upsert=True, return_document=ReturnDocument.AFTER)
+        return counter["value"]
+
+    def current_sequence(self):
+        counter = get_database().counters.find_one({"_id": "note_seq"})
+        return counter["value"] if counter else 0
+
+    def mark_served(self):
+        # Only readers raise the mark, and never above a number the counter had already reserved
+        sequence = self.current_sequence()
+        get_database().counters.update_one({"_id": "note_seq"}, {"$max": {"served": sequence}}, upsert=True)
+        return sequence
+
+    def served_sequence(self):
+        counter = get_database().counters.find_one({"_id": "note_seq"}, {"served": 1})
+        return counter.get("served", 0) if counter else 0
+
+    def restamp(self, moves, deleted=False):
+        if not moves:
+            return []
+        collection = self.tombstones if deleted else self.collection
+        collection.bulk_write([UpdateOne({"_id": note_id, "seq": seq}, {"$set": {"seq": new_seq}}) for note_id, seq, new_seq in moves], ordered=False)
+        # Like bulk_update, the documents that now carry their new number tell which moves applied
+        expected = {note_id: new_seq for note_id, _, new_seq in moves}
+        stored = _indexed(collection.find({"_id": {"$in": list(expected)}}, {"seq": 1}))
+        return [document['_id'] for document in stored if document.get('seq') == expected[document['_id']]]
+
+    def insert_tombstone(self, tombstone):
+        self.tombstones.replace_one({"_id": tombstone["_id"]}, tombstone, upsert=True)
+
+    def find_changes(self, after, limit, fields=None):
+        query = {"seq": {"$gt": after}}
+        notes = list(_indexed(self.collection.find(query, _projection(fields and list(fields) + ['seq'])).sort('seq', ASCENDING).limit(limit)))
+        tombstones = list(_indexed(self.tombstones.find(query).sort('seq', ASCENDING).limit(limit)))
+        return _merge_changes(notes, tombstones, limit)
+
+    def backfill_sequence(self):
+        updated = 0
+        for document in _indexed(self.collection.find({"seq": {"$exists": False}}, {"_id": 1}).sort('_id', ASCENDING)):
+            result = self.collection.update_one({"_id": document["_id"], "seq": {"$exists": False}},
+                                                {"$set": {"seq": self.next_sequence()}})
+            updated += result.modified_count
+        return updated
+
+    @property
+    def stats_collection(self):
+        return get_database().note_stats
+
+    def increment_stats(self, deltas):
+        if deltas:
+            self.stats_collection.bulk_write(_stats_updates(deltas), ordered=False)
+
+    def find_stats(self, since=None):
+        return list(_indexed(self.stats_collection.find(_stats_query(since))))
+
+    def rebuild_stats(self):
+        self.collection.aggregate(STATS_REBUILD_PIPELINE)
+        return self.stats_collection.count_documents({})
+
+    def search(self, keyword, limit=None, offset=0, filters=None, snippet_length=None):
+        query = _filter_query(filters)
+        query["$text"] = {"$search": keyword}
+        projection = {"score": {"$meta": "textScore"}}
+        if snippet_length:
+            # Only a prefix of the content leaves the server, not the full body
+            projection.update({
+                "title": 1,
+                "category": 1,
+                "sentiment": 1,
+                "snippet": {"$substrCP": [{"$ifNull": ["$content", ""]}, 0, snippet_length]}
+            })
+        cursor = self.collection.find(query, projection).sort([("score", {"$meta": "textScore"})])
+        if offset:
+            cursor = cursor.skip(offset)
+        if limit is not None:
+            cursor = cursor.limit(limit)
+        return list(_indexed(cursor))
+
+    def ensure_indexes(self):
+        return migrate_indexes(get_database())
+
+    def ping(self):
+        # Forces a round trip, unlike creating the client which connects lazily
+        return get_database().command('ping')
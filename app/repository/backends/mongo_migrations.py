@@ -0,0 +1,68 @@
+"""
+This module defines the MongoDB indexes of the application as numbered migrations, and applies the ones a database has not had yet.
+
+Key Responsibilities:
+- **Versioned Migrations**: Lists every index the application's queries rely on, grouped in migrations numbered in the order they were introduced. A new access pattern gets a new migration instead of an edit to an applied one.
+- **Idempotent Application**: Records each applied migration in the `index_migrations` collection and skips it on later runs. Every index has an explicit name, and creating an index that already exists with the same keys and options is a no-op, so a run interrupted half-way is completed by running it again.
+- **Status**: Reports which migrations a database has applied and which are pending.
+
+Indexes are created by `python init_db.py`, which targets the configured `MONGO_DB_NAME` through the shared client.
+"""
+
+from datetime import datetime, timezone
+from pymongo import ASCENDING, DESCENDING, TEXT
+
+# (version, description, [(collection, keys, options)])
+INDEX_MIGRATIONS = [
+    (1, "Text search, statistics buckets and change feed", [
+        # Named as MongoDB names them by default, so databases indexed before the migrations existed are already up to date
+        ('notes', [('title', TEXT), ('content', TEXT)], {'name': 'title_text_content_text'}),
+        ('note_stats', [('kind', ASCENDING), ('key', ASCENDING)], {'name': 'kind_1_key_1'}),
+        # The change feed reads notes and tombstones in `seq` order from a token on
+        ('notes', [('seq', ASCENDING)], {'name': 'seq_1'}),
+        ('note_tombstones', [('seq', ASCENDING)], {'name': 'seq_1'}),
+    ]),
+    (2, "Filtered listing by category and sentiment, newest or by sentiment first", [
+        # Equality on category, then the sort key, so a category page is read in order without a sort stage
+        ('notes', [('category', ASCENDING), ('_id', DESCENDING)], {'name': 'category_created'}),
+        ('notes', [('category', ASCENDING), ('sentiment', ASCENDING), ('_id', ASCENDING)], {'name': 'category_sentiment_created'}),
+        # Sentiment ranges and sentiment order without a category
+        ('notes', [('sentiment', ASCENDING), ('_id', ASCENDING)], {'name': 'sentiment_created'}),
+    ]),
+]
+
+def latest_version():
+    return INDEX_MIGRATIONS[-1][0]
+
+def applied_versions(database):
+    return sorted(record['_id'] for record in database.index_migrations.find({}, {'_id': 1}).sort('_id', ASCENDING))
+
+def migration_status(database):
+    """Return each migration's version and description, and whether the database has applied it."""
+    applied = set(applied_versions(database))
+    return [{"version": version, "description": description, "applied": version in applied}
+            for version, description, _ in INDEX_MIGRATIONS]
+
+def migrate_indexes(database, target=None):
+    """
+    Create the indexes of every migration the database has not applied yet, in order.
+
+    Args:
+        database: The PyMongo database.
+        target (int): The last version to apply; defaults to the latest.
+
+    Returns:
+        list: The versions applied by this run, empty when the database was already up to date.
+    """
+    target = latest_version() if target is None else target
+    applied = set(applied_versions(database))
+    newly_applied = []
+    for version, description, indexes in INDEX_MIGRATIONS:
+        if version > target or version in applied:
+            continue
+        for collection, keys, options in indexes:
+            database[collection].create_index(keys, **options)
+        database.index_migrations.replace_one(
+            {"_id": version}, {"_id": version, "description": description, "applied_at": datetime.now(timezone.utc)}, upsert=True)
+        newly_applied.append(version)
+    return newly_applied
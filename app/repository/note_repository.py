@@ -1,42 +1,344 @@
 """
-This module is responsible for interacting with a MongoDB database to perform CRUD (Create, Read, Update, Delete) operations on a collection of notes.
-It utilizes the PyMongo library to connect to the database and execute operations on the notes collection.
+This module is responsible for performing CRUD (Create, Read, Update, Delete) operations on the collection of notes.
+It delegates storage to a backend selected with `STORAGE_BACKEND`: `mongo` (MongoDB through PyMongo) or `memory` (an embedded store that needs no server).
 
 Key Responsibilities:
-- **Database Connection**: Establishes a connection to the MongoDB database using a URI specified in the configuration file.
+- **Storage Backend**: Creates the configured note store on first use, not at import, so importing the module never touches the network. Further backends can be added with `register_storage_backend`, and `set_store` swaps the store, e.g. for tests and benchmarks.
 - **Add Note**: Inserts a new note document into the notes collection.
-- **Get All Notes**: Retrieves all note documents from the notes collection.
-- **Update Note**: Updates an existing note document identified by its unique ID.
+- **Add Notes**: Inserts many note documents with unordered `insert_many` calls in fixed-size chunks, reporting which documents failed.
+- **Get All Notes**: Retrieves note documents from the notes collection in `_id` order, optionally one keyset page at a time (`limit`/`after`) and with a field projection.
+- **Filtered Notes**: Retrieves one keyset page of notes filtered by category and sentiment range, in creation or sentiment order, served by the compound indexes of `repository/backends/mongo_migrations.py`.
+- **Iterate Notes**: Returns a live cursor over the notes collection with a configurable batch size, for streaming consumers that must not materialize the full collection.
+- **Get Notes by IDs**: Fetches a set of notes in one query and returns them in the order of the given IDs, as needed to hydrate ranked search results.
+- **Get Note by ID**: Looks up a single note through a read-through cache with a bounded size and TTL. The backend is pluggable and every write to the note invalidates its entry. A miss only fills the entry if no write invalidated the note while it was being read, so a read that raced a write never caches the document as it was before.
+- **Update Note**: Updates an existing note document identified by its unique ID, incrementing its `version` so clients can detect changes.
+- **Apply Enrichment**: Writes background-computed sentiment and category onto a note, but only if its content has not changed since the enrichment was scheduled.
+- **Apply Categories**: Writes model-assigned categories onto many notes with one bulk update, each guarded by the `seq` the note had when it was read, so a note changed in between keeps its newer state.
 - **Delete Note**: Deletes a note document from the collection based on its unique ID.
-- **Search Notes**: Performs a text search on the notes collection to find documents matching a specified keyword.
+- **Change Tracking**: Stamps every insert, update and enrichment with UTC `created_at`/`updated_at` times and a new `seq` from a store-wide counter, and leaves a tombstone with its own `seq` for every delete. `get_changes` reads both in `seq` order for the change feed, and `backfill_change_sequence` numbers notes written before change tracking existed. A sequence number is reserved before its write commits, so the feed raises a served mark before every read, and a write that finds the mark at or above its number once it is acknowledged moves to a new number; no write is skipped however long it took or whatever the clocks of the hosts say.
+- **Note Statistics**: Keeps the materialized per-category and per-day statistics (see `utils/note_stats.py`) current on every insert, update, enrichment and delete. Updates and deletes return the previous category and sentiment in the same round trip, so each write applies an exact delta. `rebuild_stats` recomputes them from the notes to repair drift, e.g. after a failed statistics update.
+- **Search Notes**: Performs a text search on the notes collection to find documents matching a specified keyword. Matches are sorted by MongoDB's `textScore`, filtered by category and sentiment range in the same query, paginated with skip and limit, and can be reduced to a short content snippet.
 
-The module assumes that the MongoDB server is running and accessible via the provided URI.
-It also assumes that the notes collection is properly indexed for text search to enable efficient keyword-based queries.
+With the `mongo` backend, the module assumes that the MongoDB server is running and accessible via the provided URI.
+It also assumes that the index migrations have been applied (see `init_db.py`) to enable efficient keyword search and filtered listing.
 """
 
-from pymongo import MongoClient
-from config.config import MONGO_URI
+import threading
+from datetime import datetime, timezone
+from bson import ObjectId
+from pymongo.results import UpdateResult, DeleteResult
+from config.config import STORAGE_BACKEND, NOTE_CACHE_BACKEND, NOTE_CACHE_SIZE, NOTE_CACHE_TTL_SECONDS
+from repository.backends.memory import MemoryNoteStore
+from repository.backends.mongo import MongoNoteStore
+from utils.cache import create_cache
+from utils.metrics import timed
+from utils.note_stats import STATS_FIELDS, stats_deltas, merge_deltas
 
-client = MongoClient(MONGO_URI)
-db = client.notes_db
-notes_collection = db.notes
+_backends = {
+    'mongo': MongoNoteStore,
+    'memory': MemoryNoteStore
+}
 
+_store = None
+_store_lock = threading.Lock()
+
+# Full note documents by ID; entries are dropped on every write to the note
+_note_cache = create_cache(NOTE_CACHE_BACKEND, NOTE_CACHE_SIZE, NOTE_CACHE_TTL_SECONDS)
+# The token of the latest cache miss reading each note; an invalidation revokes it, so that read does not fill the cache
+_fills = {}
+_fills_lock = threading.Lock()
+
+def register_storage_backend(name, factory):
+    """
+    Make a storage backend available by name.
+
+    Args:
+        name (str): The name used in the `STORAGE_BACKEND` configuration.
+        factory (callable): Called without arguments, must return a `NoteStore`.
+    """
+    _backends[name] = factory
+
+def get_store():
+    """Return the process-wide note store for the configured backend, creating it on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                try:
+                    factory = _backends[STORAGE_BACKEND]
+                except KeyError:
+                    raise ValueError(f"Unknown storage backend '{STORAGE_BACKEND}'. Available: {', '.join(sorted(_backends))}")
+                _store = factory()
+    return _store
+
+def set_store(store):
+    """Replace the note store in use, e.g. with a fresh in-memory store, and return the previous one."""
+    global _store
+    with _store_lock:
+        previous, _store = _store, store
+    with _fills_lock:
+        _fills.clear()
+        _note_cache.clear()
+    return previous
+
+def ensure_indexes():
+    """Apply the storage backend's pending index migrations; return the versions applied."""
+    return get_store().ensure_indexes() or []
+
+def ping():
+    return get_store().ping()
+
+def utc_now():
+    """Return the current UTC time at the millisecond precision of BSON dates, so every backend stores the same value."""
+    now = datetime.now(timezone.utc)
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+def change_time(change):
+    """Return when a note of the change feed was written or a tombstone's note deleted, as an aware UTC datetime."""
+    changed_at = change.get('deleted_at') or change.get('updated_at')
+    # MongoDB returns naive datetimes, which are in UTC
+    if changed_at is not None and changed_at.tzinfo is None:
+        changed_at = changed_at.replace(tzinfo=timezone.utc)
+    return changed_at
+
+def _stamp(note, seq, now):
+    note.created_at = note.updated_at = now
+    note.seq = seq
+
+def _stamped(values, seq, now):
+    # A copy, so the caller's dict is left as it was
+    return dict(values, updated_at=now, seq=seq)
+
+def begin_cache_fill(note_id):
+    """Register a cache miss about to read a note; pass the returned token to `end_cache_fill`."""
+    token = object()
+    with _fills_lock:
+        _fills[note_id] = token
+    return token
+
+def end_cache_fill(note_id, token, note):
+    """Cache the note read since `begin_cache_fill`, unless a write invalidated it in between; None only ends the fill."""
+    with _fills_lock:
+        if _fills.get(note_id) is token:
+            del _fills[note_id]
+            if note is not None:
+                _note_cache.set(note_id, note)
+
+def invalidate_note(note_id):
+    """Drop a written note from the cache, and keep a read that started before the write from caching it again."""
+    with _fills_lock:
+        _fills.pop(note_id, None)
+        _note_cache.delete(note_id)
+
+def _redeliver_late(written, deleted=False):
+    """
+    Move acknowledged writes the change feed may already have served past to new sequence numbers.
+
+    The feed raises the served mark before it reads, so a write whose number is above the mark once it is acknowledged
+    is still ahead of every reader, and one at or below it gets a number above the mark. Costs one read of the mark per write.
+
+    Args:
+        written (list): (note_id, seq) pairs of the notes, or tombstones with `deleted`, just written.
+    """
+    store = get_store()
+    while written:
+        served = store.served_sequence()
+        late = [(note_id, seq) for note_id, seq in written if seq <= served]
+        if not late:
+            return
+        first_seq = store.next_sequence(len(late)) - len(late) + 1
+        moves = [(note_id, seq, first_seq + position) for position, (note_id, seq) in enumerate(late)]
+        moved = set(store.restamp(moves, deleted))
+        for note_id in moved:
+            invalidate_note(note_id)
+        # A note written again in the meantime already has a newer number of its own
+        written = [(note_id, new_seq) for note_id, _, new_seq in moves if note_id in moved]
+
+def _stats_state(note):
+    return {"_id": note.id, "category": note.category, "sentiment": note.sentiment}
+
+def _stats_after(previous, values):
+    after = dict(previous)
+    after.update({field: values[field] for field in STATS_FIELDS if field in values})
+    return after
+
+def _update_result(previous):
+    matched = 0 if previous is None else 1
+    return UpdateResult({'n': matched, 'nModified': matched}, True)
+
+def record_stats(deltas):
+    """Apply statistics deltas; a failure is reported but does not fail the note write, and `rebuild_stats` repairs it."""
+    if not deltas:
+        return
+    try:
+        get_store().increment_stats(deltas)
+    except Exception as e:
+        print(f"Could not update note statistics: {e}")
+
+@timed('db.add_note')
 def add_note(note):
-    return notes_collection.insert_one(note.__dict__)
+    _stamp(note, get_store().next_sequence(), utc_now())
+    result = get_store().insert_one(note.to_bson())
+    note.id = result.inserted_id
+    _redeliver_late([(note.id, note.seq)])
+    record_stats(stats_deltas(after=_stats_state(note)))
+    return result
+
+@timed('db.add_notes')
+def add_notes(notes, chunk_size=1000):
+    """
+    Insert many notes using unordered `insert_many` calls of at most `chunk_size` documents.
+
+    IDs are assigned before each chunk is written so callers can match every input position to its ID,
+    and a failing document does not stop the rest of its chunk from being written.
+
+    Returns:
+        tuple: The assigned IDs in input order, and a dict mapping failed positions to error messages.
+    """
+    errors = {}
+    for start in range(0, len(notes), chunk_size):
+        chunk = notes[start:start + chunk_size]
+        first_seq = get_store().next_sequence(len(chunk)) - len(chunk) + 1
+        now = utc_now()
+        for position, note in enumerate(chunk):
+            note.id = ObjectId()
+            _stamp(note, first_seq + position, now)
+        chunk_errors = get_store().insert_many([note.to_bson() for note in chunk], chunk_size=chunk_size)
+        errors.update({start + position: error for position, error in chunk_errors.items()})
+        _redeliver_late([(note.id, note.seq) for position, note in enumerate(chunk) if position not in chunk_errors])
+    # One statistics update for the whole batch
+    record_stats(merge_deltas(stats_deltas(after=_stats_state(note)) for position, note in enumerate(notes) if position not in errors))
+    return [note.id for note in notes], errors
+
+def _filters(category=None, min_sentiment=None, max_sentiment=None):
+    return {"category": category, "min_sentiment": min_sentiment, "max_sentiment": max_sentiment}
+
+@timed('db.get_all_notes')
+def get_all_notes(limit=None, after=None, fields=None):
+    return get_store().find_page(limit, after, fields)
+
+@timed('db.get_filtered_notes')
+def get_filtered_notes(category=None, min_sentiment=None, max_sentiment=None, sort='_id', descending=False, limit=None, after=None, fields=None):
+    return get_store().find_sorted(_filters(category, min_sentiment, max_sentiment), sort, descending, limit, after, fields)
+
+def iter_notes(batch_size=1000, fields=None, after=None):
+    return get_store().iter_documents(batch_size, fields, after)
 
-def get_all_notes():
-    return list(notes_collection.find())
+@timed('db.get_notes_by_ids')
+def get_notes_by_ids(note_ids, fields=None, category=None, min_sentiment=None, max_sentiment=None):
+    found = get_store().find_by_ids(note_ids, fields, _filters(category, min_sentiment, max_sentiment))
+    notes = {note['_id']: note for note in found}
+    return [notes[note_id] for note_id in note_ids if note_id in notes]
 
-def get_note_by_id(note_id):
-    return notes_collection.find_one({"_id": note_id})
+@timed('db.get_note_by_id')
+def get_note_by_id(note_id, fields=None):
+    note = _note_cache.get(note_id)
+    if note is None:
+        if fields:
+            # Partial reads are not cached, the cache only holds full documents
+            return get_store().find_one(note_id, fields)
+        token = begin_cache_fill(note_id)
+        try:
+            note = get_store().find_one(note_id)
+        finally:
+            end_cache_fill(note_id, token, note)
+        if note is None:
+            return None
+    # Callers get their own copy, so mutating a result never corrupts the cached document
+    if fields:
+        return {key: value for key, value in note.items() if key == '_id' or key in fields}
+    return dict(note)
 
+def note_cache_stats():
+    return _note_cache.stats()
+
+@timed('db.update_note')
 def update_note(note_id, updated_note):
-    return notes_collection.update_one({'_id': note_id}, {'$set': updated_note})
+    # The previous category and sentiment come back with the update itself, so the statistics delta is exact under concurrent writes
+    values = _stamped(updated_note, get_store().next_sequence(), utc_now())
+    previous = get_store().find_one_and_update(note_id, values, fields=STATS_FIELDS)
+    invalidate_note(note_id)
+    if previous is not None:
+        _redeliver_late([(note_id, values['seq'])])
+        record_stats(stats_deltas(previous, _stats_after(previous, updated_note)))
+    return _update_result(previous)
+
+@timed('db.apply_enrichment')
+def apply_enrichment(note_id, expected_content_hash, enrichment):
+    # Matching on the content hash keeps a stale job from overwriting enrichment of newer content
+    values = _stamped(enrichment, get_store().next_sequence(), utc_now())
+    previous = get_store().find_one_and_update(note_id, values, expected_content_hash=expected_content_hash, fields=STATS_FIELDS)
+    invalidate_note(note_id)
+    if previous is not None:
+        _redeliver_late([(note_id, values['seq'])])
+        record_stats(stats_deltas(previous, _stats_after(previous, enrichment)))
+    return _update_result(previous)
+
+@timed('db.apply_categories')
+def apply_categories(notes, categories, version):
+    """
+    Set model-assigned categories on many notes in one bulk update.
+
+    Args:
+        notes (list): The notes as read, each with its `_id`, `seq`, `category` and `sentiment`.
+        categories (list): The new category of each note, in the same order.
+        version (str): The model version that assigned them.
+
+    Returns:
+        int: The number of notes updated; notes written since they were read are left as they are.
+    """
+    if not notes:
+        return 0
+    # One counter round trip reserves the sequence numbers of the whole batch
+    first_seq = get_store().next_sequence(len(notes)) - len(notes) + 1
+    now = utc_now()
+    updates = [(note['_id'], {"seq": note.get('seq')}, _stamped({"category": category, "model_version": version}, first_seq + position, now))
+               for position, (note, category) in enumerate(zip(notes, categories))]
+    updated = set(get_store().bulk_update(updates))
+    for note in notes:
+        invalidate_note(note['_id'])
+    _redeliver_late([(note_id, values['seq']) for note_id, _, values in updates if note_id in updated])
+    record_stats(merge_deltas(stats_deltas(note, _stats_after(note, {"category": category}))
+                              for note, category in zip(notes, categories) if note['_id'] in updated))
+    return len(updated)
 
+@timed('db.delete_note')
 def delete_note(note_id):
-    return notes_collection.delete_one({'_id': note_id})
+    previous = get_store().find_one_and_delete(note_id, fields=STATS_FIELDS)
+    invalidate_note(note_id)
+    if previous is not None:
+        # The tombstone takes a sequence number after the delete, so the change feed never reports it before it happened
+        tombstone = {"_id": note_id, "seq": get_store().next_sequence(), "deleted_at": utc_now()}
+        get_store().insert_tombstone(tombstone)
+        _redeliver_late([(note_id, tombstone['seq'])], deleted=True)
+        record_stats(stats_deltas(before=previous))
+    return DeleteResult({'n': 0 if previous is None else 1}, True)
+
+@timed('db.search_notes')
+def search_notes(keyword, limit=None, offset=0, category=None, min_sentiment=None, max_sentiment=None, snippet_length=None):
+    return get_store().search(keyword, limit, offset, _filters(category, min_sentiment, max_sentiment), snippet_length)
+
+@timed('db.get_stats')
+def get_stats(since=None):
+    return get_store().find_stats(since)
+
+def rebuild_stats():
+    return get_store().rebuild_stats()
+
+@timed('db.get_changes')
+def get_changes(after, limit, fields=None):
+    """
+    Return up to `limit` notes and tombstones changed after the `after` sequence number, in `seq` order.
 
-def search_notes(keyword):
-    return list(notes_collection.find({"$text": {"$search": keyword}}))
+    Only numbers up to the served mark raised right before the read are returned; a write below it that commits
+    later moves above it (see `_redeliver_late`), so continuing from the last returned `seq` never skips a change.
+    """
+    served = get_store().mark_served()
+    return [change for change in get_store().find_changes(after, limit, fields) if change['seq'] <= served]
 
+def mark_changes_served():
+    """Raise the change feed's served mark like a read of the feed does, and return it; every change up to it is either stored or moves above it."""
+    return get_store().mark_served()
 
+def backfill_change_sequence():
+    return get_store().backfill_sequence()
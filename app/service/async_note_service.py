@@ -0,0 +1,246 @@
+"""
+This module is the asynchronous counterpart of `service.note_service`, used by the asyncio server in `asgi.py`.
+Storage calls go through `repository.async_note_repository` and are awaited on the event loop. Sentiment analysis and category prediction are CPU-bound, so they run in a bounded thread pool instead, keeping the loop free to serve other requests in the meantime.
+
+Key Responsibilities:
+- **CPU Offloading**: Runs `analyze_sentiment`, `suggest_category` and their batch versions on `ASYNC_EXECUTOR_WORKERS` threads. The request's context is carried along, so their timings still reach the request's `Server-Timing` breakdown.
+- **Note Operations**: Creates (singly and in bulk), lists, filters, exports, reads, modifies, removes and searches notes with the same semantics as the synchronous service: the same enrichment modes, content-hash checks, `model_version` bookkeeping, search backends and pagination.
+- **Similar Notes**: Finds similar notes and near-duplicates with the shared similarity index in the thread pool, and keeps the index current with every write once it has been built.
+- **Changes**: Reads a page of the change feed with asynchronous queries, settled like `note_service.changes_since`.
+- **Statistics**: Reads the materialized note statistics with an asynchronous query.
+- **Enrichment Status**: Reports a note's enrichment state with an asynchronous read.
+
+The in-process search index and the background enrichment pool are shared with the synchronous service. Calls into them that can block run in the thread pool too.
+"""
+
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from config.config import ASYNC_EXECUTOR_WORKERS, BULK_INSERT_CHUNK_SIZE, SEARCH_DEFAULT_LIMIT, SEARCH_SNIPPET_LENGTH
+from model.note import Note
+from utils.cache import content_hash
+from utils.metrics import timed
+from repository.async_note_repository import add_note, add_notes, get_all_notes, get_filtered_notes, iter_notes, get_note_by_id, update_note, delete_note, search_notes, get_stats, get_changes
+from utils.sentiment_analysis import analyze_sentiment, analyze_sentiment_batch
+from utils.categorisation import suggest_category, suggest_categories, model_version
+from service.enrichment_service import ENRICHMENT_PENDING, ENRICHMENT_DONE, ENRICHMENT_STATUS_FIELDS, describe_enrichment, schedule_enrichment
+from service.search_service import memory_search_enabled, index_note, unindex_note, search_index_notes
+from service import similarity_service
+from service.similarity_service import similarity_index_active, index_note_vector, index_note_vectors, unindex_note_vector
+from service.note_service import _enrich_in_background, changes_page, LISTING_SORTS, listing_page
+from service.stats_service import stats_since
+from utils.note_stats import summarize_stats
+
+_executor = None
+
+def get_executor():
+    """Return the thread pool for CPU-bound work, creating it on first use so a forked worker starts its own threads."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=ASYNC_EXECUTOR_WORKERS, thread_name_prefix='async-cpu')
+    return _executor
+
+def shutdown_executor(wait=True):
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=wait)
+        _executor = None
+
+async def run_blocking(function, *args, **kwargs):
+    """Run a CPU-bound or blocking call in the thread pool and await its result."""
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, function, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(get_executor(), call)
+
+@timed('service.create_note')
+async def create_note(title, content, category=None, wait=None):
+    if not title or not content:
+        print("Error: a note needs a title and content.")
+        return None
+    if _enrich_in_background(wait):
+        note = Note(title, content, category)
+        note.enrichment_status = ENRICHMENT_PENDING
+        result = await add_note(note)
+        if memory_search_enabled():
+            # The index may still need its first build, which reads every note
+            await run_blocking(index_note, result.inserted_id, title, content)
+        if similarity_index_active():
+            await run_blocking(index_note_vector, result.inserted_id, title, content)
+        # Scheduling enriches inline when the queue is full
+        await run_blocking(schedule_enrichment, result.inserted_id, content, note.content_hash, not category)
+        return result
+
+    sentiment = await run_blocking(analyze_sentiment, content)
+    version = None
+    if not category:
+        version = model_version()
+        category = await run_blocking(suggest_category, content)
+    note = Note(title, content, category, sentiment, model_version=version)
+    result = await add_note(note)
+    if memory_search_enabled():
+        await run_blocking(index_note, result.inserted_id, title, content)
+    if similarity_index_active():
+        await run_blocking(index_note_vector, result.inserted_id, title, content)
+    return result
+
+@timed('service.create_notes_bulk')
+async def create_notes_bulk(items):
+    """
+    Create many notes at once, like `note_service.create_notes_bulk`.
+
+    Returns:
+        list: One result per item in input order, holding either the `inserted_id` or an `error`.
+    """
+    results = [{"index": index} for index in range(len(items))]
+    valid, notes = [], []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not item.get('title') or not item.get('content'):
+            results[index]["error"] = "Title and content are required"
+            continue
+        try:
+            notes.append(Note(item['title'], item['content'], item.get('category')))
+        except ValueError as e:
+            results[index]["error"] = str(e)
+            continue
+        valid.append(index)
+    if not valid:
+        return results
+
+    contents = [note.content for note in notes]
+    sentiments = await run_blocking(analyze_sentiment_batch, contents)
+
+    uncategorized = [position for position, index in enumerate(valid) if not items[index].get('category')]
+    version = model_version() if uncategorized else None
+    suggested = await run_blocking(suggest_categories, [contents[position] for position in uncategorized])
+    for position, category in zip(uncategorized, suggested):
+        notes[position].category = category
+        notes[position].model_version = version
+    for note, sentiment in zip(notes, sentiments):
+        note.sentiment = sentiment
+    inserted_ids, errors = await add_notes(notes, chunk_size=BULK_INSERT_CHUNK_SIZE)
+    indexed = []
+    for position, index in enumerate(valid):
+        if position in errors:
+            results[index]["error"] = errors[position]
+        else:
+            results[index]["inserted_id"] = inserted_ids[position]
+            indexed.append((inserted_ids[position], notes[position].title, notes[position].content))
+    if memory_search_enabled() and indexed:
+        await run_blocking(lambda: [index_note(*entry) for entry in indexed])
+    if similarity_index_active() and indexed:
+        await run_blocking(index_note_vectors, indexed)
+    return results
+
+async def list_notes(fields=None):
+    return await get_all_notes(fields=fields)
+
+async def list_notes_page(limit, after=None, fields=None):
+    """
+    Fetch one page of notes in `_id` order, starting after the given cursor.
+
+    Returns:
+        tuple: The notes on this page and the cursor for the next page, or None on the last page.
+    """
+    notes = await get_all_notes(limit=limit + 1, after=after, fields=fields)
+    if len(notes) > limit:
+        notes = notes[:limit]
+        return notes, str(notes[-1]['_id'])
+    return notes, None
+
+async def filter_notes(limit, category=None, min_sentiment=None, max_sentiment=None, sort='-created', after=None, fields=None):
+    """
+    Fetch one page of notes matching the filters, in the `sort` order of `LISTING_SORTS`.
+
+    Returns:
+        tuple: The notes on this page and the cursor for the next page, or None on the last page.
+    """
+    sort_field, descending = LISTING_SORTS[sort]
+    notes = await get_filtered_notes(category, min_sentiment, max_sentiment, sort_field, descending, limit + 1, after, fields)
+    return listing_page(notes, limit, sort_field, fields)
+
+def export_notes(batch_size, fields=None):
+    return iter_notes(batch_size=batch_size, fields=fields)
+
+async def note_by_id(note_id):
+    return await get_note_by_id(note_id)
+
+async def enrichment_status(note_id):
+    return describe_enrichment(await get_note_by_id(note_id, fields=ENRICHMENT_STATUS_FIELDS))
+
+@timed('service.modify_note')
+async def modify_note(note_id, title, content, category, wait=None):
+    updated_note = {
+        "title": title,
+        "content": content,
+        "category": category
+    }
+    new_hash = content_hash(content)
+    stored = await get_note_by_id(note_id, fields=['content_hash', 'category'])
+    if not stored or stored.get('category') != category:
+        updated_note["model_version"] = None
+    content_changed = not stored or stored.get('content_hash') != new_hash
+    background = content_changed and _enrich_in_background(wait)
+    if content_changed:
+        updated_note["content_hash"] = new_hash
+        updated_note["enrichment_error"] = None
+        if background:
+            updated_note["enrichment_status"] = ENRICHMENT_PENDING
+        else:
+            updated_note["sentiment"] = await run_blocking(analyze_sentiment, content)
+            updated_note["enrichment_status"] = ENRICHMENT_DONE
+
+    result = await update_note(note_id, updated_note)
+    if result.matched_count:
+        if memory_search_enabled():
+            await run_blocking(index_note, note_id, title, content)
+        if similarity_index_active():
+            await run_blocking(index_note_vector, note_id, title, content)
+        if background:
+            await run_blocking(schedule_enrichment, note_id, content, new_hash, False)
+    return result
+
+async def remove_note(note_id):
+    result = await delete_note(note_id)
+    if memory_search_enabled():
+        await run_blocking(unindex_note, note_id)
+    if similarity_index_active():
+        # Removals occasionally compact the index
+        await run_blocking(unindex_note_vector, note_id)
+    return result
+
+@timed('service.find_notes')
+async def find_notes(keyword, limit=None, offset=0, prefix=False, category=None, min_sentiment=None, max_sentiment=None, snippet=False):
+    """
+    Search notes by relevance, one page at a time, like `note_service.find_notes`.
+
+    Returns:
+        tuple: The notes on this page, best first, and the offset of the next page, or None on the last page.
+    """
+    limit = limit or SEARCH_DEFAULT_LIMIT
+    snippet_length = SEARCH_SNIPPET_LENGTH if snippet else None
+    filters = {"category": category, "min_sentiment": min_sentiment, "max_sentiment": max_sentiment}
+    if memory_search_enabled():
+        # Ranking is CPU-bound and hydration uses the synchronous repository, so both leave the loop
+        notes = await run_blocking(search_index_notes, keyword, limit + 1, offset, prefix=prefix, filters=filters,
+                                   snippet_length=snippet_length)
+    else:
+        notes = await search_notes(keyword, limit=limit + 1, offset=offset, snippet_length=snippet_length, **filters)
+    if len(notes) > limit:
+        return notes[:limit], offset + limit
+    return notes, None
+
+async def similar_notes(note_id, k):
+    """Find the notes most similar to a stored note, like `similarity_service.similar_notes`."""
+    return await run_blocking(similarity_service.similar_notes, note_id, k)
+
+async def find_duplicates(title, content):
+    """Find near-duplicates of a title and content, like `similarity_service.find_duplicates`."""
+    return await run_blocking(similarity_service.find_duplicates, title, content)
+
+async def note_statistics(days):
+    return summarize_stats(await get_stats(stats_since(days)))
+
+@timed('service.changes_since')
+async def changes_since(since, limit):
+    return changes_page(await get_changes(since, limit + 1), since, limit)
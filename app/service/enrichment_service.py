@@ -0,0 +1,224 @@
+"""
+This module is responsible for enriching notes with sentiment and category, either on the caller's thread or in a background worker pool.
+Running TextBlob and the categorisation model in the background lets note writes return as soon as the note is stored.
+
+Key Responsibilities:
+- **Enrichment**: Computes the sentiment (and, when the note has no category, a suggested category) for a note's content and applies it with a single update, guarded by the content hash the job was scheduled for.
+- **Worker Pool**: Runs enrichment jobs on a fixed number of worker threads fed by a bounded queue. Threads are started lazily, so a process that forks after import starts its own workers.
+- **Retry**: Retries failed jobs with exponential backoff, and marks the note as failed once the retries are exhausted.
+- **Backpressure**: Refuses new jobs when the queue is full, so callers can fall back to enriching on their own thread instead of queueing without bound.
+- **Graceful Drain**: On shutdown, stops accepting jobs and waits for queued jobs to finish. This is registered to run at interpreter exit.
+- **Status**: Reports per-note enrichment status and pool-level counters.
+
+Notes written without background enrichment carry no `enrichment_status` field and are treated as enriched.
+"""
+
+import atexit
+import queue
+import threading
+import time
+from config.config import (ENRICHMENT_WORKERS, ENRICHMENT_QUEUE_SIZE, ENRICHMENT_MAX_RETRIES,
+                           ENRICHMENT_RETRY_BACKOFF_SECONDS)
+from repository.note_repository import apply_enrichment, get_note_by_id
+from utils.sentiment_analysis import analyze_sentiment
+from utils.categorisation import suggest_category, model_version
+
+ENRICHMENT_PENDING = 'pending'
+ENRICHMENT_DONE = 'done'
+ENRICHMENT_FAILED = 'failed'
+
+ENRICHMENT_STATUS_FIELDS = ['enrichment_status', 'enrichment_error', 'sentiment', 'category']
+
+def enrich_note(note_id, content, expected_content_hash, needs_category):
+    """
+    Compute and store the enrichment of a note.
+
+    Args:
+        note_id (ObjectId): The note to enrich.
+        content (str): The content the enrichment is computed from.
+        expected_content_hash (str): The content hash of that content; the write is skipped if the note has changed since.
+        needs_category (bool): Whether a category should be suggested as well.
+
+    Returns:
+        UpdateResult: The result of the update.
+    """
+    enrichment = {
+        "sentiment": analyze_sentiment(content),
+        "enrichment_status": ENRICHMENT_DONE
+    }
+    if needs_category:
+        enrichment["model_version"] = model_version()
+        enrichment["category"] = suggest_category(content)
+    return apply_enrichment(note_id, expected_content_hash, enrichment)
+
+def enrichment_status(note_id):
+    """
+    Look up the enrichment state of a note.
+
+    Returns:
+        dict: The note's status, sentiment and category, or None if the note does not exist.
+    """
+    return describe_enrichment(get_note_by_id(note_id, fields=ENRICHMENT_STATUS_FIELDS))
+
+def describe_enrichment(note):
+    """Build the enrichment status of a note read with `ENRICHMENT_STATUS_FIELDS`, or None if there is no note."""
+    if not note:
+        return None
+    status = {
+        "enrichment_status": note.get('enrichment_status', ENRICHMENT_DONE),
+        "sentiment": note.get('sentiment'),
+        "category": note.get('category')
+    }
+    # Edits clear the error of a failed enrichment by setting it to None
+    if note.get('enrichment_error') is not None:
+        status["enrichment_error"] = note['enrichment_error']
+    return status
+
+class EnrichmentPool:
+    """
+    A pool of worker threads applying enrichment jobs from a bounded queue.
+
+    Args:
+        workers (int): The number of worker threads.
+        queue_size (int): The number of jobs that can wait before `submit` starts refusing new ones.
+        max_retries (int): How many times a failing job is retried before the note is marked as failed.
+        retry_backoff (float): The delay before the first retry, in seconds; it doubles on every further attempt.
+    """
+
+    def __init__(self, workers=4, queue_size=1000, max_retries=3, retry_backoff=0.5):
+        self.workers = workers
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._threads = []
+        self._lock = threading.Lock()
+        self._stopping = False
+        self.completed = 0
+        self.failed = 0
+        self.retried = 0
+        self.rejected = 0
+
+    def submit(self, note_id, content, expected_content_hash, needs_category):
+        """
+        Queue a note for enrichment.
+
+        Returns:
+            bool: True if the job was queued, False if the pool is full or shutting down.
+        """
+        if self._stopping:
+            return False
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((note_id, content, expected_content_hash, needs_category))
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            return False
+        return True
+
+    def shutdown(self, wait=True):
+        """Stop accepting jobs and, if `wait` is set, block until every queued job has been processed."""
+        with self._lock:
+            if self._stopping:
+                return
+            self._stopping = True
+            threads = list(self._threads)
+        # Sentinels are queued behind pending jobs, so workers drain the queue before exiting
+        for _ in threads:
+            self._queue.put(None)
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": len(self._threads),
+                "queue_depth": self._queue.qsize(),
+                "completed": self.completed,
+                "failed": self.failed,
+                "retried": self.retried,
+                "rejected": self.rejected
+            }
+
+    def _ensure_started(self):
+        with self._lock:
+            self._threads = [thread for thread in self._threads if thread.is_alive()]
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._run, name=f"enrichment-{len(self._threads)}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            self._process(job)
+
+    def _process(self, job):
+        note_id, content, expected_content_hash, needs_category = job
+        for attempt in range(self.max_retries + 1):
+            try:
+                enrich_note(note_id, content, expected_content_hash, needs_category)
+            except Exception as e:
+                if attempt < self.max_retries:
+                    with self._lock:
+                        self.retried += 1
+                    time.sleep(self.retry_backoff * (2 ** attempt))
+                    continue
+                print(f"Enrichment failed for note {note_id}: {e}")
+                self._mark_failed(note_id, expected_content_hash, e)
+                return
+            with self._lock:
+                self.completed += 1
+            return
+
+    def _mark_failed(self, note_id, expected_content_hash, error):
+        with self._lock:
+            self.failed += 1
+        try:
+            apply_enrichment(note_id, expected_content_hash,
+                             {"enrichment_status": ENRICHMENT_FAILED, "enrichment_error": str(error)})
+        except Exception as e:
+            print(f"Could not record enrichment failure for note {note_id}: {e}")
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_enrichment_pool():
+    """Return the process-wide enrichment pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = EnrichmentPool(
+                    workers=ENRICHMENT_WORKERS,
+                    queue_size=ENRICHMENT_QUEUE_SIZE,
+                    max_retries=ENRICHMENT_MAX_RETRIES,
+                    retry_backoff=ENRICHMENT_RETRY_BACKOFF_SECONDS
+                )
+                atexit.register(_pool.shutdown)
+    return _pool
+
+def schedule_enrichment(note_id, content, expected_content_hash, needs_category):
+    """
+    Enrich a note in the background, or on the caller's thread when the pool is saturated.
+
+    Falling back to inline enrichment applies backpressure to writers instead of growing the queue without bound.
+
+    Returns:
+        bool: True if the job was queued, False if it was run synchronously.
+    """
+    if get_enrichment_pool().submit(note_id, content, expected_content_hash, needs_category):
+        return True
+    enrich_note(note_id, content, expected_content_hash, needs_category)
+    return False
+
+def enrichment_pool_stats():
+    return _pool.stats() if _pool is not None else None
+
+def shutdown_enrichment(wait=True):
+    """Drain and stop the enrichment pool if it was started."""
+    if _pool is not None:
+        _pool.shutdown(wait=wait)
@@ -2,45 +2,253 @@
 This module is responsible for managing note operations, providing a high-level interface for creating, retrieving, updating, deleting, and searching notes.
 
 Key Responsibilities:
-- **Create Note**: Constructs a new note with a title, content, and optional category. It analyzes the sentiment of the content and suggests a category if none is provided, before saving the note to the repository.
-- **List Notes**: Retrieves all notes from the repository, providing a complete list of stored notes.
-- **Modify Note**: Updates an existing note's title, content, category, and sentiment by its unique ID, reflecting changes in the repository.
+- **Create Note**: Constructs a new note with a title, content, and optional category. It analyzes the sentiment of the content and suggests a category if none is provided, before saving the note to the repository. A suggested category is stored with the `model_version` that produced it. In asynchronous enrichment mode the note is saved immediately as `pending` and enriched by the background pool.
+- **Create Notes in Bulk**: Validates many notes at once, computes their sentiment in one batch and their missing categories with a single vectorized prediction, then writes them in chunked bulk inserts, reporting a result per note.
+- **List Notes**: Retrieves notes from the repository, either as a complete list or one keyset page at a time with a cursor to the next page.
+- **Filter Notes**: Retrieves one keyset page of notes filtered by category and sentiment range, newest or oldest first or by sentiment, with a cursor to the next page.
+- **Export Notes**: Provides a lazy iterator over every note, fetched from the repository in cursor batches, for streaming exports.
+- **Modify Note**: Updates an existing note's title, content, category, and sentiment by its unique ID, reflecting changes in the repository. Sentiment is only recomputed when the content hash differs from the stored one, either inline or in the background depending on the enrichment mode. A submitted category that differs from the stored one counts as set by the user, so `model_version` is cleared; resending the stored category keeps it.
 - **Remove Note**: Deletes a note from the repository based on its unique ID.
-- **Find Notes**: Searches for notes containing a specified keyword, utilizing the repository's search capabilities.
+- **Changes**: Returns one page of the change feed after a sync token: notes created, updated or enriched since, and tombstones of notes deleted since, in the order they happened, with the token to continue from.
+- **Similar Notes**: Keeps the in-process similarity index (see `service/similarity_service.py`) current with every write once it has been built.
+- **Find Notes**: Searches for notes containing a specified keyword, using either the repository's `$text` search or the in-process BM25 index, depending on the configured search backend. Results are ranked by relevance, paginated by offset, optionally filtered by category and sentiment range, and can be reduced to snippets. Every write keeps the in-process index up to date.
 
 The module assumes the existence of a `Note` model class, repository functions for database interactions, and utility functions for sentiment analysis and category suggestion.
 It abstracts the complexity of these operations, offering a simplified interface for note management.
 """
+from config.config import BULK_INSERT_CHUNK_SIZE, ENRICHMENT_MODE, SEARCH_DEFAULT_LIMIT, SEARCH_SNIPPET_LENGTH
 from model.note import Note
-from repository.note_repository import add_note, get_all_notes, get_note_by_id ,update_note, delete_note, search_notes
-from utils.sentiment_analysis import analyze_sentiment
-from utils.categorisation import suggest_category
+from utils.cache import content_hash
+from utils.metrics import timed
+from repository.note_repository import add_note, add_notes, get_all_notes, get_filtered_notes, iter_notes, get_note_by_id ,update_note, delete_note, search_notes, get_changes
+from utils.sentiment_analysis import analyze_sentiment, analyze_sentiment_batch
+from utils.categorisation import suggest_category, suggest_categories, model_version
+from service.enrichment_service import ENRICHMENT_PENDING, ENRICHMENT_DONE, schedule_enrichment
+from service.search_service import memory_search_enabled, index_note, unindex_note, search_index_notes
+from service.similarity_service import index_note_vector, index_note_vectors, unindex_note_vector
+
+def _enrich_in_background(wait):
+    # An explicit `wait` from the client overrides the configured enrichment mode
+    if wait is not None:
+        return not wait
+    return ENRICHMENT_MODE == 'async'
+
+@timed('service.create_note')
+def create_note(title, content, category=None, wait=None):
+    if not title or not content:
+        print("Error: a note needs a title and content.")
+        return None
+    if _enrich_in_background(wait):
+        note = Note(title, content, category)
+        note.enrichment_status = ENRICHMENT_PENDING
+        result = add_note(note)
+        index_note(result.inserted_id, title, content)
+        index_note_vector(result.inserted_id, title, content)
+        schedule_enrichment(result.inserted_id, content, note.content_hash, needs_category=not category)
+        return result
 
-def create_note(title, content, category=None):
     sentiment = analyze_sentiment(content)
+    version = None
     if not category:
+        # Read before predicting, so a concurrent model swap can only make a note look older than it is
+        version = model_version()
         category = suggest_category(content)
-    note = Note(title, content, category, sentiment)
-    return add_note(note)
+    note = Note(title, content, category, sentiment, model_version=version)
+    result = add_note(note)
+    index_note(result.inserted_id, title, content)
+    index_note_vector(result.inserted_id, title, content)
+    return result
+
+@timed('service.create_notes_bulk')
+def create_notes_bulk(items):
+    """
+    Create many notes at once, enriching and inserting them in batches.
+
+    Args:
+        items (list): Note payloads, each a dict with a title, content and optional category.
+
+    Returns:
+        list: One result per item in input order, holding either the `inserted_id` or an `error`.
+    """
+    results = [{"index": index} for index in range(len(items))]
+    valid, notes = [], []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not item.get('title') or not item.get('content'):
+            results[index]["error"] = "Title and content are required"
+            continue
+        try:
+            notes.append(Note(item['title'], item['content'], item.get('category')))
+        except ValueError as e:
+            results[index]["error"] = str(e)
+            continue
+        valid.append(index)
+    if not valid:
+        return results
+
+    contents = [note.content for note in notes]
+    sentiments = analyze_sentiment_batch(contents)
+
+    # Only notes without a category need a prediction, and they all share one model call
+    uncategorized = [position for position, index in enumerate(valid) if not items[index].get('category')]
+    version = model_version() if uncategorized else None
+    suggested = suggest_categories([contents[position] for position in uncategorized])
+    for position, category in zip(uncategorized, suggested):
+        notes[position].category = category
+        notes[position].model_version = version
+    for note, sentiment in zip(notes, sentiments):
+        note.sentiment = sentiment
+    inserted_ids, errors = add_notes(notes, chunk_size=BULK_INSERT_CHUNK_SIZE)
+    indexed = []
+    for position, index in enumerate(valid):
+        if position in errors:
+            results[index]["error"] = errors[position]
+        else:
+            results[index]["inserted_id"] = inserted_ids[position]
+            index_note(inserted_ids[position], notes[position].title, notes[position].content)
+            indexed.append((inserted_ids[position], notes[position].title, notes[position].content))
+    # One vectorizer call for the whole batch
+    index_note_vectors(indexed)
+    return results
+
+def list_notes(fields=None):
+    return get_all_notes(fields=fields)
+
+def list_notes_page(limit, after=None, fields=None):
+    """
+    Fetch one page of notes in `_id` order, starting after the given cursor.
+
+    One extra document is requested so the next cursor is only returned when
+    another page actually exists.
+
+    Returns:
+        tuple: The notes on this page and the cursor for the next page, or None on the last page.
+    """
+    notes = get_all_notes(limit=limit + 1, after=after, fields=fields)
+    if len(notes) > limit:
+        notes = notes[:limit]
+        return notes, str(notes[-1]['_id'])
+    return notes, None
+
+# Listing orders of `filter_notes`, as the stored field sorted on and whether the highest values come first
+LISTING_SORTS = {
+    'created': ('_id', False),
+    '-created': ('_id', True),
+    'sentiment': ('sentiment', False),
+    '-sentiment': ('sentiment', True)
+}
+
+def listing_page(notes, limit, sort_field, fields=None):
+    """Cut the `limit + 1` notes fetched for a filtered page to `limit`, returning them with the cursor of the next page or None."""
+    next_cursor = None
+    if len(notes) > limit:
+        notes = notes[:limit]
+        last = notes[-1]
+        next_cursor = str(last['_id']) if sort_field == '_id' else f"{last[sort_field]!r}_{last['_id']}"
+    if fields and sort_field != '_id' and sort_field not in fields:
+        # The sort field was only fetched for the cursor
+        for note in notes:
+            note.pop(sort_field, None)
+    return notes, next_cursor
 
-def list_notes():
-    return get_all_notes()
+def filter_notes(limit, category=None, min_sentiment=None, max_sentiment=None, sort='-created', after=None, fields=None):
+    """
+    Fetch one page of notes matching the filters, in the `sort` order of `LISTING_SORTS`.
+
+    A sentiment order only lists notes whose sentiment has been analyzed.
+
+    Returns:
+        tuple: The notes on this page and the cursor for the next page, or None on the last page.
+    """
+    sort_field, descending = LISTING_SORTS[sort]
+    notes = get_filtered_notes(category, min_sentiment, max_sentiment, sort_field, descending, limit + 1, after, fields)
+    return listing_page(notes, limit, sort_field, fields)
+
+def export_notes(batch_size, fields=None):
+    return iter_notes(batch_size=batch_size, fields=fields)
 
 def note_by_id(note_id):
     return get_note_by_id(note_id)
 
-def modify_note(note_id, title, content, category):
-    sentiment = analyze_sentiment(content)
+@timed('service.modify_note')
+def modify_note(note_id, title, content, category, wait=None):
     updated_note = {
         "title": title,
         "content": content,
-        "category": category,
-        "sentiment": sentiment
+        "category": category
     }
-    return update_note(note_id, updated_note)
+    # Title- or category-only edits keep the stored sentiment instead of re-running the analysis
+    new_hash = content_hash(content)
+    stored = get_note_by_id(note_id, fields=['content_hash', 'category'])
+    # Every edit resends the category, so it only comes from the user, not from a model, when it changed
+    if not stored or stored.get('category') != category:
+        updated_note["model_version"] = None
+    content_changed = not stored or stored.get('content_hash') != new_hash
+    background = content_changed and _enrich_in_background(wait)
+    if content_changed:
+        updated_note["content_hash"] = new_hash
+        # A job still queued for the old content never applies, so the status and any error of the old content are replaced here
+        updated_note["enrichment_error"] = None
+        if background:
+            updated_note["enrichment_status"] = ENRICHMENT_PENDING
+        else:
+            updated_note["sentiment"] = analyze_sentiment(content)
+            updated_note["enrichment_status"] = ENRICHMENT_DONE
+
+    result = update_note(note_id, updated_note)
+    if result.matched_count:
+        index_note(note_id, title, content)
+        index_note_vector(note_id, title, content)
+        if background:
+            schedule_enrichment(note_id, content, new_hash, needs_category=False)
+    return result
 
 def remove_note(note_id):
-    return delete_note(note_id)
+    result = delete_note(note_id)
+    unindex_note(note_id)
+    unindex_note_vector(note_id)
+    return result
+
+@timed('service.find_notes')
+def find_notes(keyword, limit=None, offset=0, prefix=False, category=None, min_sentiment=None, max_sentiment=None, snippet=False):
+    """
+    Search notes by relevance, one page at a time.
+
+    One extra match is requested so the next offset is only returned when another page exists.
+
+    Returns:
+        tuple: The notes on this page, best first, and the offset of the next page, or None on the last page.
+    """
+    limit = limit or SEARCH_DEFAULT_LIMIT
+    snippet_length = SEARCH_SNIPPET_LENGTH if snippet else None
+    filters = {"category": category, "min_sentiment": min_sentiment, "max_sentiment": max_sentiment}
+    if memory_search_enabled():
+        notes = search_index_notes(keyword, limit + 1, offset, prefix=prefix, filters=filters, snippet_length=snippet_length)
+    else:
+        notes = search_notes(keyword, limit=limit + 1, offset=offset, snippet_length=snippet_length, **filters)
+    if len(notes) > limit:
+        return notes[:limit], offset + limit
+    return notes, None
+
+def changes_page(changes, since, limit):
+    """
+    Cut a page of the change feed and the token to continue from.
+
+    Args:
+        changes (list): Up to `limit + 1` changes after `since`, in `seq` order.
+
+    Returns:
+        tuple: The changes of the page, the token to continue from, and whether another page is already available.
+    """
+    page = changes[:limit]
+    token = page[-1]['seq'] if page else since
+    return page, str(token), len(changes) > limit
+
+@timed('service.changes_since')
+def changes_since(since, limit):
+    """
+    Fetch the changes made after a sync token, one page at a time.
 
-def find_notes(keyword):
-    return search_notes(keyword)
+    Returns:
+        tuple: The changes, the next token and whether more changes can be fetched right away.
+    """
+    return changes_page(get_changes(since, limit + 1), since, limit)
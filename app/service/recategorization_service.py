@@ -0,0 +1,228 @@
+"""
+This module re-categorizes stored notes with the active model, so that notes categorized by an earlier model follow a retrained one.
+
+Key Responsibilities:
+- **Batch Scan**: Reads notes in `_id`-ordered batches through the repository, so memory stays bounded and the position in the collection is a single `_id`.
+- **Selection**: Categorizes notes still without a category and notes categorized by an earlier model version. Skips notes whose category was set by a user, i.e. stored with `model_version` set to None, and notes already categorized by the active version. Notes stored before `model_version` existed had their category sent by the client, so their category is kept too unless `include_legacy` is set.
+- **Parallel Prediction**: Sends the contents of whole batches to a pool of worker processes, each loading the model once and classifying a batch with one vectorized `predict`. Batches are predicted ahead while earlier ones are written.
+- **Bulk Writes**: Writes each batch back with `apply_categories`, one unordered bulk of `UpdateOne` guarded per note, so a note edited during the run keeps its edit. Notes whose category does not change are not written, so the change feed and the statistics only see real changes.
+- **Checkpointing**: Saves the last `_id` written and the running counts after every batch, and resumes from them with `resume`. A checkpoint written for another model version is ignored.
+- **Throttling**: Keeps the scan under `max_rate` notes per second by sleeping between batches, so the job does not starve live traffic of database and CPU time.
+- **Background Runs**: `start_recategorization` runs the job on a background thread for the admin endpoint, and `recategorization_status` reports its progress.
+
+Only one background run is allowed per process. Two runs in different processes are still safe, since the per-note guards make every write conditional, but they duplicate work.
+
+Usage (from the `app` directory):
+    python -m service.recategorization_service
+    python -m service.recategorization_service --resume --workers 4 --max-rate 5000
+"""
+
+import argparse
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+import joblib
+from config.config import RECATEGORIZE_BATCH_SIZE, RECATEGORIZE_WORKERS, RECATEGORIZE_MAX_RATE, RECATEGORIZE_CHECKPOINT_PATH
+from repository.note_repository import iter_notes, apply_categories, utc_now
+from utils.categorisation import current_model, model_version
+
+CHECKPOINT_FORMAT = 1
+# Fields read for every note: the content to classify, the state its guard and statistics delta need, and its categorization
+SCAN_FIELDS = ['content', 'category', 'sentiment', 'model_version', 'seq']
+
+_status = {"state": "idle"}
+_status_lock = threading.Lock()
+_thread = None
+
+def is_user_assigned(note, include_legacy=False):
+    """
+    Whether a stored note's category was set by a user rather than by a model.
+
+    A category without a `model_version` field predates model versioning and was sent by the client, so it counts as
+    set by a user, unless `include_legacy` treats it as model output.
+    """
+    if not note.get('category'):
+        return False
+    if 'model_version' not in note:
+        return not include_legacy
+    return note['model_version'] is None
+
+def needs_category(note, version, include_legacy=False):
+    return not is_user_assigned(note, include_legacy) and note.get('model_version') != version
+
+def _init_worker():
+    # Each worker loads the model once, not once per batch
+    current_model()
+
+def _predict(contents):
+    """Classify a batch in a worker process; returns the worker's model version with the categories."""
+    model, version = current_model()
+    if model is None:
+        return None, []
+    return version, [str(category) for category in model.predict(contents)]
+
+def _prediction_pool(workers):
+    if workers <= 0:
+        return None
+    # Spawned rather than forked, so the pool is safe to start from a threaded server process
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'), initializer=_init_worker)
+
+def _submit(pool, contents):
+    if pool is None:
+        future = Future()
+        future.set_result(_predict(contents))
+        return future
+    return pool.submit(_predict, contents)
+
+def _iter_batches(batch_size, after):
+    notes = iter_notes(batch_size=batch_size, fields=SCAN_FIELDS, after=after)
+    while True:
+        batch = list(islice(notes, batch_size))
+        if not batch:
+            return
+        yield batch
+
+def save_checkpoint(path, state):
+    temporary_path = f"{path}.tmp"
+    joblib.dump(state, temporary_path)
+    os.replace(temporary_path, path)
+
+def load_checkpoint(path, version):
+    try:
+        state = joblib.load(path)
+    except FileNotFoundError:
+        print(f"No checkpoint found at '{path}', starting from scratch.")
+        return None
+    if state.get("format") != CHECKPOINT_FORMAT or state.get("model_version") != version:
+        print(f"Checkpoint '{path}' was written for another format or model version, starting from scratch.")
+        return None
+    print(f"Resuming from checkpoint after {state['scanned']} notes.")
+    return state
+
+def _throttle(started, scanned, max_rate):
+    if max_rate > 0:
+        delay = scanned / max_rate - (time.monotonic() - started)
+        if delay > 0:
+            time.sleep(delay)
+
+def recategorize_notes(batch_size=RECATEGORIZE_BATCH_SIZE, workers=RECATEGORIZE_WORKERS, max_rate=RECATEGORIZE_MAX_RATE,
+                       checkpoint_path=RECATEGORIZE_CHECKPOINT_PATH, resume=False, include_legacy=False, progress=None):
+    """
+    Re-categorize every stored note that a model categorized, with the active model.
+
+    Args:
+        batch_size (int): The number of notes read, predicted and written together.
+        workers (int): The number of prediction processes; 0 predicts in the calling process.
+        max_rate (float): The maximum number of notes scanned per second; 0 disables the throttle.
+        checkpoint_path (str): Where the position is saved after every batch; None disables checkpoints.
+        resume (bool): Continue from the checkpoint at `checkpoint_path` if there is one for the active model.
+        include_legacy (bool): Also re-categorize notes stored before `model_version` existed, whose categories are otherwise kept.
+        progress (callable): Called with the running counts after every batch.
+
+    Returns:
+        dict: The `model_version` and the number of notes `scanned`, `skipped`, `unchanged`, `updated`, and in `conflicts` because they were written during the run.
+
+    Raises:
+        ValueError: If no model is loaded, or the active model changes during the run. Batches written so far stay checkpointed.
+    """
+    version = model_version()
+    if version is None:
+        raise ValueError("No categorization model is loaded")
+    state = load_checkpoint(checkpoint_path, version) if resume and checkpoint_path else None
+    state = state or {"format": CHECKPOINT_FORMAT, "model_version": version, "after": None,
+                      "scanned": 0, "skipped": 0, "unchanged": 0, "updated": 0, "conflicts": 0}
+    started, scanned_before = time.monotonic(), state["scanned"]
+
+    def write(notes, candidates, future):
+        predicted_version, categories = future.result() if future is not None else (version, [])
+        if predicted_version != version:
+            raise ValueError(f"The active model changed from {version} to {predicted_version} during the run; run it again to apply the new model")
+        changed = [(note, category) for note, category in zip(candidates, categories) if category != note.get('category')]
+        updated = apply_categories([note for note, _ in changed], [category for _, category in changed], version)
+        state["after"] = notes[-1]['_id']
+        state["scanned"] += len(notes)
+        state["skipped"] += len(notes) - len(candidates)
+        state["unchanged"] += len(candidates) - len(changed)
+        state["updated"] += updated
+        state["conflicts"] += len(changed) - updated
+        if checkpoint_path:
+            save_checkpoint(checkpoint_path, state)
+        if progress is not None:
+            progress(_counts(state))
+        _throttle(started, state["scanned"] - scanned_before, max_rate)
+
+    pool = _prediction_pool(workers)
+    try:
+        # Up to one batch per worker is predicted ahead of the batch being written
+        ahead = deque()
+        for notes in _iter_batches(batch_size, state["after"]):
+            candidates = [note for note in notes if needs_category(note, version, include_legacy)]
+            future = _submit(pool, [note.get('content') or '' for note in candidates]) if candidates else None
+            ahead.append((notes, candidates, future))
+            if len(ahead) > max(workers, 1):
+                write(*ahead.popleft())
+        while ahead:
+            write(*ahead.popleft())
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    return _counts(state)
+
+def _counts(state):
+    return {key: state[key] for key in ("model_version", "scanned", "skipped", "unchanged", "updated", "conflicts")}
+
+def recategorization_status():
+    """Return the state of the latest background run: `idle`, `running`, `finished` or `failed`, with its counts."""
+    with _status_lock:
+        return dict(_status)
+
+def _update_status(**values):
+    with _status_lock:
+        _status.update(values)
+
+def _run(options):
+    try:
+        result = recategorize_notes(progress=lambda counts: _update_status(**counts), **options)
+        _update_status(state="finished", finished_at=utc_now(), **result)
+    except Exception as e:
+        print(f"Re-categorization failed: {e}")
+        _update_status(state="failed", finished_at=utc_now(), error=str(e))
+
+def start_recategorization(**options):
+    """
+    Start `recategorize_notes` with `options` on a background thread.
+
+    Returns:
+        dict: The status of the new run, or None if a run is already in progress.
+
+    Raises:
+        ValueError: If no model is loaded.
+    """
+    global _thread
+    version = model_version()
+    if version is None:
+        raise ValueError("No categorization model is loaded")
+    with _status_lock:
+        if _thread is not None and _thread.is_alive():
+            return None
+        _status.clear()
+        _status.update(state="running", started_at=utc_now(), model_version=version)
+        _thread = threading.Thread(target=_run, args=(options,), name='recategorization', daemon=True)
+        _thread.start()
+        return dict(_status)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--batch-size', type=int, default=RECATEGORIZE_BATCH_SIZE)
+    parser.add_argument('--workers', type=int, default=RECATEGORIZE_WORKERS, help="prediction processes; 0 predicts in this process")
+    parser.add_argument('--max-rate', type=float, default=RECATEGORIZE_MAX_RATE, help="notes scanned per second at most; 0 disables the throttle")
+    parser.add_argument('--checkpoint', dest='checkpoint_path', default=RECATEGORIZE_CHECKPOINT_PATH)
+    parser.add_argument('--resume', action='store_true', help="continue from the checkpoint of the active model")
+    parser.add_argument('--include-legacy', action='store_true', help="also re-categorize notes stored before model versions were recorded")
+    counts = recategorize_notes(**vars(parser.parse_args()))
+    print(f"Scanned {counts['scanned']} notes with model {counts['model_version']}: {counts['updated']} re-categorized, "
+          f"{counts['unchanged']} unchanged, {counts['skipped']} skipped, {counts['conflicts']} changed during the run.")
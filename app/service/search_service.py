@@ -0,0 +1,153 @@
+"""
+This module is responsible for serving note search from the in-process BM25 index when the `memory` search backend is configured.
+
+Key Responsibilities:
+- **Index Lifecycle**: Loads the index from its snapshot on first use, then replays the change feed (see `GET /notes/changes`) from the position saved with the snapshot, so notes created, edited or deleted after it was written are current, whether by this process before a crash or by another process. Without a snapshot it builds the index from the notes collection, then replays the writes the scan may have missed.
+- **Incremental Maintenance**: Applies note creations, updates and deletions to the index as they happen.
+- **Snapshots**: Writes a new snapshot, with the change feed position it is current up to, in the background every `SEARCH_SNAPSHOT_INTERVAL` changes and once more at interpreter exit, so restarts stay fast.
+- **Search**: Ranks notes for a query, fetches only the requested page of top matches from the repository, and attaches each note's relevance score. Category and sentiment filters are applied by the repository while fetching ranked candidates in batches, so a page is filled in rank order without loading every match.
+
+Every process keeps its own index, so changes made by other processes are only picked up the next time the index is loaded or rebuilt.
+With the `mongo` backend, every function in this module is a no-op apart from explicit searches.
+"""
+
+import atexit
+import threading
+from config.config import SEARCH_BACKEND, SEARCH_INDEX_PATH, SEARCH_SNAPSHOT_INTERVAL
+from repository.note_repository import iter_notes, get_notes_by_ids, get_changes, mark_changes_served
+from utils.search_index import InvertedIndex
+
+# Ranked candidates are fetched in batches of this size when filters may reject some of them
+HYDRATE_BATCH_SIZE = 200
+# Changes are replayed from the change feed in pages of this size
+CATCH_UP_BATCH_SIZE = 1000
+
+_index = None
+_lock = threading.Lock()
+_mutations = 0
+_snapshot_lock = threading.Lock()
+
+def memory_search_enabled():
+    return SEARCH_BACKEND == 'memory'
+
+def _index_notes(index):
+    # A write the scan misses commits after the served mark was raised, so it moves above the mark and is replayed
+    index.sequence = mark_changes_served()
+    for note in iter_notes(fields=['title', 'content']):
+        index.add(note['_id'], note.get('title'), note.get('content'))
+    _catch_up(index)
+
+def _catch_up(index):
+    """Apply every change after the index's change feed position to it, and move the position past them."""
+    while True:
+        changes = get_changes(index.sequence, CATCH_UP_BATCH_SIZE, fields=['title', 'content'])
+        for change in changes:
+            if change.get('deleted'):
+                index.remove(change['_id'])
+            else:
+                index.add(change['_id'], change.get('title'), change.get('content'))
+        if changes:
+            index.sequence = changes[-1]['seq']
+        if len(changes) < CATCH_UP_BATCH_SIZE:
+            return
+
+def get_search_index():
+    """Return the process-wide search index, loading or building it on first use."""
+    global _index
+    if _index is None:
+        with _lock:
+            if _index is None:
+                index = InvertedIndex.load(SEARCH_INDEX_PATH) if SEARCH_INDEX_PATH else None
+                # A snapshot ahead of the change feed was taken from another database, e.g. a lost in-memory store
+                if index is None or index.sequence > mark_changes_served():
+                    index = InvertedIndex()
+                    _index_notes(index)
+                else:
+                    # Writes since the snapshot, including edits and deletions the snapshot missed when the process died
+                    _catch_up(index)
+                _index = index
+                if SEARCH_INDEX_PATH:
+                    atexit.register(save_search_index)
+    return _index
+
+def rebuild_search_index():
+    """Rebuild the index from scratch, replacing the one in use, and snapshot it."""
+    global _index
+    index = InvertedIndex()
+    _index_notes(index)
+    with _lock:
+        _index = index
+    save_search_index()
+    return len(index)
+
+def save_search_index():
+    if _index is None or not SEARCH_INDEX_PATH:
+        return
+    # Skip rather than queue up when a snapshot is already being written
+    if not _snapshot_lock.acquire(blocking=False):
+        return
+    try:
+        _index.save(SEARCH_INDEX_PATH)
+    except OSError as e:
+        print(f"Could not save search index snapshot: {e}")
+    finally:
+        _snapshot_lock.release()
+
+def _record_mutation():
+    global _mutations
+    _mutations += 1
+    if SEARCH_INDEX_PATH and SEARCH_SNAPSHOT_INTERVAL and _mutations % SEARCH_SNAPSHOT_INTERVAL == 0:
+        threading.Thread(target=save_search_index, name='search-snapshot', daemon=True).start()
+
+def index_note(note_id, title, content):
+    if not memory_search_enabled():
+        return
+    get_search_index().add(note_id, title, content)
+    _record_mutation()
+
+def unindex_note(note_id):
+    if not memory_search_enabled():
+        return
+    get_search_index().remove(note_id)
+    _record_mutation()
+
+def search_index_notes(keyword, limit, offset=0, prefix=False, filters=None, snippet_length=None):
+    """
+    Search notes with the in-process index.
+
+    Args:
+        keyword (str): The query.
+        limit (int): The maximum number of notes to return.
+        offset (int): The number of ranked matches to skip.
+        prefix (bool): Whether the last query term is a prefix.
+        filters (dict): Optional `category`, `min_sentiment` and `max_sentiment` constraints.
+        snippet_length (int): When set, return a content snippet of this length instead of the full content.
+
+    Returns:
+        list: The matching notes, best first, each with a `score` field.
+    """
+    index = get_search_index()
+    filters = {name: value for name, value in (filters or {}).items() if value is not None}
+    fields = ['title', 'category', 'sentiment', 'content'] if snippet_length else None
+    wanted = offset + limit
+
+    if not filters:
+        ranked = index.search(keyword, k=wanted, prefix=prefix)[offset:]
+        notes = get_notes_by_ids([note_id for note_id, _ in ranked], fields)
+    else:
+        # Filters can reject any candidate, so walk the full ranking until the page is filled
+        ranked = index.search(keyword, k=len(index), prefix=prefix)
+        notes = []
+        for start in range(0, len(ranked), HYDRATE_BATCH_SIZE):
+            batch = [note_id for note_id, _ in ranked[start:start + HYDRATE_BATCH_SIZE]]
+            notes.extend(get_notes_by_ids(batch, fields, **filters))
+            if len(notes) >= wanted:
+                break
+        notes = notes[offset:wanted]
+
+    scores = dict(ranked)
+    for note in notes:
+        note['score'] = scores[note['_id']]
+        if snippet_length:
+            note['snippet'] = (note.pop('content', None) or '')[:snippet_length]
+    return notes
@@ -0,0 +1,222 @@
+"""
+This module is responsible for finding notes similar to a given note, and near-duplicates of a note about to be created, with the in-process `SimilarityIndex`.
+
+Key Responsibilities:
+- **Shared Vector Space**: Embeds a note's title and content with the active categorizer's own TF-IDF vectorizer (see `utils.categorisation.vectorize`), so no second model has to be trained, stored or loaded.
+- **Index Lifecycle**: Builds the index from the notes collection on a background thread, in batches through one vectorizer call each, so no request waits for it. The build starts when a worker starts with duplicate detection enabled (see `service/warmup_service.py`), or else on the first similarity query, and runs again when a different model version becomes active, since vectors of two models are not comparable. Until the index is ready, similar notes are unavailable and no duplicates are reported.
+- **Incremental Maintenance**: Applies this process's note creations, updates and deletions to a built index as they happen. Writes that arrive while the index is being built are queued and applied before it is published, so none are lost.
+- **Catch-Up**: Before every query, applies the changes made since the last query from the change feed (see `GET /notes/changes`), so notes written by other worker processes are found too.
+- **Similar Notes**: Returns the `k` notes closest to a stored note by cosine similarity, each with its `similarity`.
+- **Duplicate Detection**: Returns the stored notes whose similarity to a new title and content reaches `DUPLICATE_THRESHOLD`.
+
+Every process keeps its own index, kept current with the other processes' writes through the change feed.
+"""
+
+import threading
+from itertools import islice
+from config.config import DUPLICATE_THRESHOLD, DUPLICATE_MAX_RESULTS
+from repository.note_repository import iter_notes, get_note_by_id, get_notes_by_ids, get_changes, mark_changes_served
+from utils.categorisation import vectorize, model_version
+from utils.similarity_index import SimilarityIndex
+
+# Notes are vectorized in batches of this size while the index is built
+BUILD_BATCH_SIZE = 2000
+# Fields returned for every similar or duplicate note
+SIMILAR_NOTE_FIELDS = ['title', 'category', 'sentiment']
+
+_index = None
+_index_version = None
+# The change feed position up to which every change is in the index
+_synced_seq = 0
+_building = False
+_backlog = []
+# Guards the index, its version, its feed position and the backlog; held only briefly
+_state_lock = threading.Lock()
+# Serializes builds, which can take seconds on large collections
+_build_lock = threading.Lock()
+# Serializes catch-ups, so two requests never read the same changes
+_sync_lock = threading.Lock()
+_build_thread = None
+
+def _note_text(title, content):
+    return f"{title or ''}\n{content or ''}"
+
+def _build_index():
+    """Vectorize every stored note into a new index; returns (None, None) when the model changes or goes away mid-build."""
+    index, version = None, None
+    notes = iter_notes(batch_size=BUILD_BATCH_SIZE, fields=['title', 'content'])
+    while True:
+        batch = list(islice(notes, BUILD_BATCH_SIZE))
+        if not batch:
+            break
+        matrix, batch_version = vectorize([_note_text(note.get('title'), note.get('content')) for note in batch])
+        if matrix is None or (index is not None and batch_version != version):
+            return None, None
+        if index is None:
+            index, version = SimilarityIndex(matrix.shape[1]), batch_version
+        index.add_many([note['_id'] for note in batch], matrix)
+    if index is None:
+        # An empty collection still needs the vector width, which one empty text provides
+        matrix, version = vectorize([''])
+        if matrix is None:
+            return None, None
+        index = SimilarityIndex(matrix.shape[1])
+    return index, version
+
+def _apply(index, version, entries):
+    """Apply queued (note_id, title, content) additions and (note_id, None, None) removals in order."""
+    for note_id, title, content in entries:
+        if title is None and content is None:
+            index.remove(note_id)
+            continue
+        matrix, entry_version = vectorize([_note_text(title, content)])
+        if entry_version == version:
+            index.add(note_id, matrix)
+
+def build_similarity_index():
+    """Build the index for the active model, replacing the one in use; a no-op when it is current or no model is loaded."""
+    global _index, _index_version, _synced_seq, _building, _backlog
+    with _build_lock:
+        while model_version() is not None and (_index is None or _index_version != model_version()):
+            # A write up to the watermark that the scan misses commits after the mark was raised, so it moves
+            # above the watermark, and the catch-up replays everything after it
+            watermark = mark_changes_served()
+            with _state_lock:
+                _building = True
+                _backlog = []
+            index = None
+            try:
+                index, built_version = _build_index()
+            finally:
+                with _state_lock:
+                    if index is not None:
+                        _apply(index, built_version, _backlog)
+                        _index, _index_version, _synced_seq = index, built_version, watermark
+                    _building = False
+                    _backlog = []
+
+def _run_build():
+    try:
+        build_similarity_index()
+    except Exception as e:
+        print(f"Could not build the similarity index: {e}")
+
+def start_similarity_index():
+    """Build the index on a background thread, unless it is current or already being built."""
+    global _build_thread
+    if model_version() is None or (_index is not None and _index_version == model_version()):
+        return
+    with _state_lock:
+        if _build_thread is None or not _build_thread.is_alive():
+            _build_thread = threading.Thread(target=_run_build, name='similarity-index', daemon=True)
+            _build_thread.start()
+
+def _catch_up():
+    """Apply the changes other processes made since the last catch-up to the index."""
+    global _synced_seq
+    with _sync_lock:
+        after = _synced_seq
+        while True:
+            changes = get_changes(after, BUILD_BATCH_SIZE, fields=['title', 'content'])
+            for change in changes:
+                if change.get('deleted'):
+                    unindex_note_vector(change['_id'])
+            index_note_vectors([(change['_id'], change.get('title'), change.get('content')) for change in changes if not change.get('deleted')])
+            if changes:
+                after = changes[-1]['seq']
+            if len(changes) < BUILD_BATCH_SIZE:
+                break
+        with _state_lock:
+            _synced_seq = max(_synced_seq, after)
+
+def get_similarity_index():
+    """
+    Return the process-wide similarity index, caught up with every process's writes.
+
+    Returns None while no model is loaded or the index for the active model is not built yet; the build is then started in the background.
+    """
+    version = model_version()
+    if version is None:
+        return None
+    if _index is None or _index_version != version:
+        start_similarity_index()
+        return None
+    _catch_up()
+    return _index
+
+def similarity_index_active():
+    """Whether writes need to reach the index, i.e. it is built or being built."""
+    return _index is not None or _building
+
+def index_note_vectors(entries):
+    """
+    Add or replace the vectors of stored notes in a built index.
+
+    Args:
+        entries (list): (note_id, title, content) tuples.
+    """
+    global _index
+    if not similarity_index_active() or not entries:
+        return
+    matrix, version = vectorize([_note_text(title, content) for _, title, content in entries])
+    with _state_lock:
+        if _building:
+            _backlog.extend(entries)
+        elif _index is not None:
+            if version != _index_version:
+                # Vectors of another model cannot be mixed in; the next query rebuilds
+                _index = None
+            else:
+                _index.add_many([note_id for note_id, _, _ in entries], matrix)
+
+def index_note_vector(note_id, title, content):
+    index_note_vectors([(note_id, title, content)])
+
+def unindex_note_vector(note_id):
+    with _state_lock:
+        if _building:
+            _backlog.append((note_id, None, None))
+        elif _index is not None:
+            _index.remove(note_id)
+
+def _with_similarity(ranked):
+    notes = get_notes_by_ids([note_id for note_id, _ in ranked], SIMILAR_NOTE_FIELDS)
+    scores = dict(ranked)
+    for note in notes:
+        note['similarity'] = round(scores[note['_id']], 4)
+    return notes
+
+def similar_notes(note_id, k):
+    """
+    Find the notes most similar to a stored note.
+
+    Args:
+        note_id (ObjectId): The note to compare against; it is never part of the result.
+        k (int): The maximum number of notes to return.
+
+    Returns:
+        list: The similar notes, most similar first, each with a `similarity` between 0 and 1. Notes sharing no term are left out.
+        None is returned when no model is loaded or the index is not built yet.
+    """
+    index = get_similarity_index()
+    if index is None:
+        return None
+    note = get_note_by_id(note_id)
+    if note is None:
+        return []
+    matrix, _ = vectorize([_note_text(note.get('title'), note.get('content'))])
+    return _with_similarity(index.query(matrix, k, exclude=note_id))
+
+def find_duplicates(title, content, threshold=DUPLICATE_THRESHOLD, limit=DUPLICATE_MAX_RESULTS):
+    """
+    Find stored notes that are near-duplicates of a title and content.
+
+    Returns:
+        list: At most `limit` notes whose similarity is at least `threshold`, most similar first; empty when no model is loaded or the index is not built yet.
+    """
+    index = get_similarity_index()
+    if index is None:
+        return []
+    matrix, _ = vectorize([_note_text(title, content)])
+    ranked = [(note_id, score) for note_id, score in index.query(matrix, limit) if score >= threshold]
+    return _with_similarity(ranked)
@@ -0,0 +1,35 @@
+"""
+This module serves the note statistics behind `GET /notes/stats` from the materialized buckets the repository keeps up to date.
+
+Key Responsibilities:
+- **Statistics**: Returns the total number of notes and their average sentiment, the same per category, and a daily trend of created notes over the last `days` days. Only the buckets are read, so the cost grows with the number of categories and days, not with the number of notes.
+- **Rebuild**: Recomputes every bucket from the notes, to repair statistics after a failed delta or a write made outside the application.
+
+Usage (from the `app` directory):
+    python -m service.stats_service --rebuild
+"""
+
+import argparse
+from datetime import datetime, timedelta, timezone
+from repository.note_repository import get_stats, rebuild_stats
+from utils.note_stats import summarize_stats
+
+def stats_since(days):
+    """Return the first day, as YYYY-MM-DD, of a trend covering the last `days` UTC days including today."""
+    return (datetime.now(timezone.utc).date() - timedelta(days=days - 1)).isoformat()
+
+def note_statistics(days):
+    return summarize_stats(get_stats(stats_since(days)))
+
+def rebuild_note_statistics():
+    """Recompute the statistics from the notes and return the number of buckets written."""
+    return rebuild_stats()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Note statistics maintenance")
+    parser.add_argument('--rebuild', action='store_true', help="recompute every statistics bucket from the notes")
+    args = parser.parse_args()
+    if args.rebuild:
+        print(f"Rebuilt {rebuild_note_statistics()} statistics buckets.")
+    else:
+        parser.print_help()
@@ -0,0 +1,66 @@
+"""
+This module is responsible for warming up the application's expensive resources before it serves traffic.
+Models, NLP resources and the database connection are all loaded lazily, so without a warmup the first requests pay for them.
+
+Key Responsibilities:
+- **Warmup**: Loads the categorisation model, loads TextBlob and its lexicon, and performs a database round trip, timing each step as a startup phase.
+- **Preload**: Loads the model and NLP resources without touching the database, for a server that loads them once before forking workers so the workers share them copy-on-write. Each worker then opens its own database connection.
+- **Background Tasks**: Starts the work each serving process runs on background threads: the model registry watch, and building the similarity index when duplicate detection is enabled. Threads do not survive a fork, so this runs in every worker after it started, never in a preloading master.
+- **Readiness**: Remembers whether warmup succeeded, so a readiness probe can report it and retry after a failure.
+
+A missing categorisation model does not make the application unready, because category suggestion falls back to 'Unknown' by design.
+"""
+
+import threading
+from config.config import DUPLICATE_DETECTION
+from repository.note_repository import ping
+from service.similarity_service import start_similarity_index
+from utils.categorisation import get_model, start_model_watcher
+from utils.sentiment_analysis import warmup_sentiment
+from utils.startup import timed_phase
+
+_ready = False
+_checks = {}
+_lock = threading.Lock()
+
+def warmup():
+    """
+    Load every lazily initialized resource, once.
+
+    Returns:
+        dict: Whether the application is ready, and the outcome of each check.
+    """
+    global _ready
+    if _ready:
+        return {"ready": True, "checks": dict(_checks)}
+    with _lock:
+        if not _ready:
+            _checks["model"] = "loaded" if get_model() is not None else "missing"
+            try:
+                warmup_sentiment()
+                _checks["sentiment"] = "ok"
+            except Exception as e:
+                _checks["sentiment"] = f"error: {e}"
+            try:
+                with timed_phase('db_connect'):
+                    ping()
+                _checks["database"] = "ok"
+            except Exception as e:
+                _checks["database"] = f"error: {e}"
+            _ready = _checks["sentiment"] == "ok" and _checks["database"] == "ok"
+        return {"ready": _ready, "checks": dict(_checks)}
+
+def preload():
+    """Load the categorisation model and TextBlob, but not the database client, which must not be shared across a fork."""
+    get_model()
+    warmup_sentiment()
+
+def start_background_tasks():
+    """Start the background threads of a serving process; call it once the process will not fork again."""
+    start_model_watcher()
+    if DUPLICATE_DETECTION != 'off':
+        # Note creation checks for duplicates, so the index is built before the first request needs it
+        start_similarity_index()
+
+def is_ready():
+    return _ready
@@ -0,0 +1,153 @@
+"""
+This module provides the caching primitives used to avoid repeating expensive work.
+
+Key Responsibilities:
+- **Content Hashing**: Computes a stable SHA-256 digest of note content, used both as a cache key and as the `content_hash` stored on each note to detect unchanged content.
+- **Cache Interface**: Defines the `CacheBackend` interface (get, set, delete, clear, stats) that every cache implements, so callers do not depend on where entries are stored.
+- **LRU Cache**: A thread-safe, size-bounded least-recently-used cache with an optional time-to-live. It evicts the oldest entry when full, and counts hits, misses, evictions and expirations.
+- **Backend Registry**: Maps backend names from the configuration to factories. `memory` (the in-process LRU) and `none` (no caching) are built in, and a shared cache can be added with `register_cache_backend`.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+def content_hash(content):
+    """
+    Compute the SHA-256 hex digest of the given content.
+
+    Args:
+        content (str): The note content; None is treated as empty content.
+
+    Returns:
+        str: The hex digest.
+    """
+    return hashlib.sha256((content or '').encode('utf-8')).hexdigest()
+
+class CacheBackend:
+    """The interface every cache backend implements. Missing keys return the given default."""
+
+    def get(self, key, default=None):
+        raise NotImplementedError
+
+    def set(self, key, value):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def stats(self):
+        return {}
+
+class NullCache(CacheBackend):
+    """A cache that stores nothing, used to disable caching through configuration."""
+
+    def get(self, key, default=None):
+        return default
+
+    def set(self, key, value):
+        pass
+
+    def delete(self, key):
+        pass
+
+    def clear(self):
+        pass
+
+class LRUCache(CacheBackend):
+    """
+    A thread-safe least-recently-used cache with a fixed maximum size.
+
+    Args:
+        maxsize (int): The number of entries kept before the least recently used one is evicted.
+        ttl (float): The number of seconds an entry stays valid, or None to keep entries until evicted.
+    """
+
+    def __init__(self, maxsize=10000, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value, expires_at = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_ratio": self.hits / lookups if lookups else 0.0
+            }
+
+_backends = {
+    'memory': lambda maxsize, ttl: LRUCache(maxsize, ttl),
+    'none': lambda maxsize, ttl: NullCache()
+}
+
+def register_cache_backend(name, factory):
+    """
+    Make a cache backend available by name.
+
+    Args:
+        name (str): The name used in the configuration.
+        factory (callable): Called with `maxsize` and `ttl`, must return a `CacheBackend`.
+    """
+    _backends[name] = factory
+
+def create_cache(backend, maxsize, ttl=None):
+    """Create a cache from a configured backend name."""
+    try:
+        factory = _backends[backend]
+    except KeyError:
+        raise ValueError(f"Unknown cache backend '{backend}'. Available: {', '.join(sorted(_backends))}")
+    return factory(maxsize, ttl)
@@ -3,8 +3,14 @@ This module is responsible for loading a pre-trained machine learning model and
 It leverages the joblib library to load the model and provides a function to predict the category of a given text input.
 
 Key Responsibilities:
-- **Model Loading**: Loads the trained model from a specified file path at the module level to ensure it is loaded only once, optimizing performance by avoiding repeated loading.
+- **Model Loading**: Loads the trained model on first use, guarded by a lock so it is loaded only once even under concurrent requests. The active version of the model registry (see `ml/model_registry.py`) is preferred, falling back to the single file at `MODEL_PATH`. Importing the module stays cheap, and the load can be triggered ahead of traffic with `get_model()`.
+- **Shared Model Memory**: Loads compact model directories (see `ml/compact_model.py`) with their arrays memory-mapped, so worker processes share one copy of the model through the page cache.
+- **Hot Reload**: `reload_model` loads a newly activated version and swaps it in atomically while predictions in flight finish on the previous model. A background thread, started by the serving process with `start_model_watcher()`, polls the registry's `CURRENT` pointer every `MODEL_WATCH_INTERVAL_SECONDS` and reloads when it changes.
 - **Category Suggestion**: Uses the loaded model to predict and suggest a category for the given content. If the model is not loaded successfully, it returns 'Unknown' as a fallback.
+- **Micro-Batching**: When enabled in the configuration, single-note suggestions from concurrent requests are routed through a `MicroBatcher` so they share one `predict` (or `predict_proba`) call.
+- **Batch Category Suggestion**: Predicts categories for many contents with a single vectorized `predict` call, which costs about the same as predicting one.
+- **Vectorization**: Exposes the model's own vectorizer through `vectorize`, so other features (see `service/similarity_service.py`) compare notes in the same TF-IDF space the categorizer was trained on.
+- **Memoization**: Caches predictions in a bounded LRU cache keyed by a hash of the content and the model version (the digest of the model file), so repeated content is never re-predicted and a new model never serves stale categories.
 
 The module includes error handling to manage common issues such as missing or corrupted model files, providing informative messages to guide the user.
 It assumes that the model file is located in the 'ml' directory and is named 'note_categorizer.pkl'.
@@ -12,24 +18,40 @@ It assumes that the model file is located in the 'ml' directory and is named 'no
 
 import joblib
 import os
+import threading
+import time
+from config.config import CATEGORY_BATCHING_ENABLED, CATEGORY_BATCH_MAX_SIZE, CATEGORY_BATCH_MAX_WAIT_MS, CATEGORY_BATCH_WITH_PROBA, CATEGORY_CACHE_SIZE, MODEL_WATCH_INTERVAL_SECONDS
+from ml.compact_model import is_compact_model, load_compact
+from ml.model_registry import active_version, activate_model, current_pointer_mtime, file_hash, model_path as registry_model_path
+from utils.cache import LRUCache, content_hash
+from utils.metrics import timed
+from utils.micro_batcher import MicroBatcher
+from utils.startup import timed_phase
 
 # Define the path to the model file
 MODEL_PATH = os.environ.get('MODEL_FILE_PATH', '/opt/render/project/src/app/utils/ml/note_categorizer.pkl')
 
-def load_model():
+def load_model(path=None):
     """
     Load the trained model from the specified file path.
 
+    Args:
+        path (str): The model file, or a compact model directory; defaults to `MODEL_PATH`.
+
     Returns:
         model: The loaded model if successful, None otherwise.
     """
+    path = path or MODEL_PATH
     try:
-        # Load the trained model
-        model = joblib.load(MODEL_PATH)
+        # Load the trained model; compact models map their arrays instead of unpickling private copies
+        if os.path.isdir(path) and is_compact_model(path):
+            model = load_compact(path)
+        else:
+            model = joblib.load(path)
         print("Model loaded successfully.")
         return model
     except FileNotFoundError:
-        print(f"Error: The model file '{MODEL_PATH}' was not found.")
+        print(f"Error: The model file '{path}' was not found.")
         return None
     except EOFError:
         print("Error: The model file is incomplete or corrupted.")
@@ -38,8 +60,155 @@ def load_model():
         print(f"An unexpected error occurred: {e}")
         return None
 
-# Load the model once at module level to avoid repeated loading
-model = load_model()
+def model_file_version(path):
+    """Return a short digest of the model file or directory, used to tell model versions apart."""
+    return file_hash(path)[:12]
+
+# The model and its version are swapped together as one tuple, so a prediction never pairs a model with another model's version
+_active = (None, None)
+_model_loaded = False
+_model_lock = threading.Lock()
+_reload_lock = threading.Lock()
+_watcher = None
+
+def _load_active_model():
+    # The registry's active version wins; without a registry, fall back to the single MODEL_PATH artifact
+    version = active_version()
+    if version:
+        model = load_model(registry_model_path(version))
+        return model, (version if model else None)
+    model = load_model()
+    return model, (model_file_version(MODEL_PATH) if model else None)
+
+def current_model():
+    """Return the active (model, version) pair, loading it on first call; both are None if no model could be loaded."""
+    global _active, _model_loaded
+    if not _model_loaded:
+        with _model_lock:
+            if not _model_loaded:
+                with timed_phase('model_load'):
+                    _active = _load_active_model()
+                _model_loaded = True
+    return _active
+
+def get_model():
+    """
+    Return the trained model, loading it on first call.
+
+    Returns:
+        model: The loaded model, or None if it could not be loaded.
+    """
+    return current_model()[0]
+
+def model_version():
+    """Return the version of the loaded model, loading it if needed."""
+    return current_model()[1]
+
+def reload_model(version=None):
+    """
+    Load the active model version and swap it in without interrupting predictions.
+
+    The new model is fully loaded before the swap, and predictions already running keep the model they started with.
+
+    Args:
+        version (str): A registered version to activate first; by default the registry's current version is reloaded.
+
+    Returns:
+        str: The version now serving.
+
+    Raises:
+        ValueError: If the version is not registered, or the model could not be loaded.
+    """
+    global _active, _model_loaded
+    with _reload_lock:
+        if version is not None:
+            activate_model(version)
+        model, loaded_version = _load_active_model()
+        if model is None:
+            raise ValueError("The model could not be loaded; the previous model is still serving")
+        with _model_lock:
+            _active = (model, loaded_version)
+            _model_loaded = True
+        return loaded_version
+
+def _watch_registry():
+    last_seen = current_pointer_mtime()
+    while True:
+        time.sleep(MODEL_WATCH_INTERVAL_SECONDS)
+        seen = current_pointer_mtime()
+        if seen is not None and seen != last_seen:
+            try:
+                print(f"Model version {reload_model()} activated.")
+            except ValueError as e:
+                print(f"Model reload failed: {e}")
+        last_seen = seen
+
+def start_model_watcher():
+    """
+    Start the thread polling the model registry, unless the watch is disabled or already running.
+
+    Threads do not survive a fork, so a serving process calls it once it will not fork again; predictions never start it.
+    """
+    global _watcher
+    if MODEL_WATCH_INTERVAL_SECONDS <= 0:
+        return
+    with _model_lock:
+        if _watcher is None or not _watcher.is_alive():
+            _watcher = threading.Thread(target=_watch_registry, name='model-watcher', daemon=True)
+            _watcher.start()
+
+_cache = LRUCache(CATEGORY_CACHE_SIZE)
+
+def _predict_batch(contents, model=None):
+    """
+    Predict categories for a batch of contents, with confidences when `predict_proba` is enabled.
+
+    Returns:
+        list: A (category, confidence) tuple per content; confidence is None when probabilities are disabled.
+    """
+    model = model or get_model()
+    if CATEGORY_BATCH_WITH_PROBA and hasattr(model, 'predict_proba'):
+        probabilities = model.predict_proba(contents)
+        best = probabilities.argmax(axis=1)
+        return [(str(model.classes_[column]), float(probabilities[row, column])) for row, column in enumerate(best)]
+    return [(category, None) for category in model.predict(contents).tolist()]
+
+# Concurrent single-note predictions are grouped into one model call when batching is enabled
+_batcher = MicroBatcher(
+    _predict_batch,
+    max_batch_size=CATEGORY_BATCH_MAX_SIZE,
+    max_wait_ms=CATEGORY_BATCH_MAX_WAIT_MS,
+    name='category-batcher'
+) if CATEGORY_BATCHING_ENABLED else None
+
+@timed('category')
+def suggest_category_with_confidence(content):
+    """
+    Suggest a category for the given content along with the model's confidence.
+
+    Args:
+        content (str): The content of the note.
+
+    Returns:
+        tuple: The suggested category and its probability, or ('Unknown', None) if the model is not loaded.
+    """
+    model, version = current_model()
+    if model:
+        key = (content_hash(content), version)
+        cached = _cache.get(key)
+        if cached is not None:
+            return cached
+        try:
+            if _batcher is not None:
+                result = _batcher.process(content)
+            else:
+                result = _predict_batch([content], model)[0]
+        except Exception as e:
+            print(f"Prediction error: {e}")
+            return 'Unknown', None
+        _cache.set(key, result)
+        return result
+    return 'Unknown', None
 
 def suggest_category(content):
     """
@@ -51,12 +220,62 @@ def suggest_category(content):
     Returns:
         str: The suggested category, or 'Unknown' if the model is not loaded.
     """
-    if model:
+    return suggest_category_with_confidence(content)[0]
+
+def batching_stats():
+    """Return the micro-batcher's batch-size and queue-wait metrics, or None when batching is disabled."""
+    return _batcher.stats() if _batcher is not None else None
+
+def category_cache_stats():
+    return _cache.stats()
+
+@timed('category_batch')
+def suggest_categories(contents):
+    """
+    Suggest categories for many contents with a single call to the trained model.
+
+    Args:
+        contents (list): The contents of the notes.
+
+    Returns:
+        list: The suggested categories in input order, or 'Unknown' for each if the model is not loaded.
+    """
+    if not contents:
+        return []
+    model, version = current_model()
+    if not model:
+        return ['Unknown'] * len(contents)
+
+    keys = [(content_hash(content), version) for content in contents]
+    results = [_cache.get(key) for key in keys]
+    # Only contents missing from the cache go to the model, still in a single call
+    misses = [index for index, result in enumerate(results) if result is None]
+    if misses:
         try:
-            return model.predict([content])[0]
+            predicted = _predict_batch([contents[index] for index in misses], model)
         except Exception as e:
             print(f"Prediction error: {e}")
-            return 'Unknown'
-    else:
-        return 'Unknown'
+            predicted = [('Unknown', None)] * len(misses)
+        else:
+            for index, result in zip(misses, predicted):
+                _cache.set(keys[index], result)
+        for index, result in zip(misses, predicted):
+            results[index] = result
+    return [category for category, _ in results]
+
+def vectorize(contents):
+    """
+    Turn contents into the feature vectors the active model classifies, without classifying them.
 
+    Args:
+        contents (list): The texts to vectorize.
+
+    Returns:
+        tuple: A sparse matrix with one L2-normalized row per content and the version of the model that produced it, or (None, None) if the model is not loaded.
+    """
+    model, version = current_model()
+    if not model:
+        return None, None
+    # A pipeline vectorizes with every step but the classifier; the compact model exposes its vectorizer directly
+    vectorizer = model[:-1] if hasattr(model, 'steps') else model
+    return vectorizer.transform(contents), version
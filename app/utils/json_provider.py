@@ -0,0 +1,61 @@
+"""
+This module provides the JSON provider used by both the Flask and the Quart application to encode responses and decode request bodies.
+
+Key Responsibilities:
+- **Native Types**: Encodes `ObjectId` as its hex string and datetimes as ISO 8601 with their UTC offset, naive ones being taken as UTC like MongoDB stores them, so note documents go straight from the repository into a response without a per-note copy.
+- **Fast Path**: Uses orjson when it is installed, which serializes straight to UTF-8 bytes in C. Keys are sorted, the output is compact and the body ends in a newline, like Flask's default provider; only non-ASCII characters differ, which are written as UTF-8 instead of being escaped.
+- **Fallback**: Falls back to the standard library `json` module with the same conventions when orjson is missing.
+"""
+
+import json
+from datetime import date, datetime, timezone
+from bson import ObjectId
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        # MongoDB returns naive datetimes that are in UTC
+        return (value if value.tzinfo else value.replace(tzinfo=timezone.utc)).isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC
+
+    def dumps_bytes(value):
+        """Serialize a value to compact UTF-8 JSON with sorted keys."""
+        return orjson.dumps(value, default=_default, option=_ORJSON_OPTIONS)
+
+    def loads(data):
+        return orjson.loads(data)
+else:
+    def dumps_bytes(value):
+        """Serialize a value to compact UTF-8 JSON with sorted keys."""
+        return json.dumps(value, default=_default, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+    def loads(data):
+        return json.loads(data)
+
+class FastJSONProvider(JSONProvider):
+    """A JSON provider for Flask and Quart applications that handles `ObjectId` and datetimes."""
+
+    mimetype = 'application/json'
+
+    def dumps(self, obj, **kwargs):
+        return dumps_bytes(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        # The encoded bytes become the body as they are, without a round trip through str
+        body = dumps_bytes(self._prepare_response_obj(args, kwargs)) + b'\n'
+        return self._app.response_class(body, mimetype=self.mimetype)
@@ -0,0 +1,211 @@
+"""
+This module implements a batch sentiment analyzer that scores polarity like TextBlob's default `PatternAnalyzer`, at a fraction of its cost.
+
+Key Responsibilities:
+- **Compiled Lexicon**: Reads the polarity lexicon that ships with TextBlob (`en/en-sentiment.xml`) once, without importing TextBlob or NLTK, and compiles it into one dict from word to row and flat numpy arrays of polarity, intensity and flags. Word senses are averaged and adverbs derived from adjectives ("terribly") the way TextBlob does it.
+- **Tokenization**: Splits text the way TextBlob's tokenizer does: on whitespace, then peeling punctuation off both ends of each chunk, so inner punctuation stays ("well-written", "f*cking"), a trailing ellipsis is one token that ends a modifier or negation, and abbreviations keep their period. Plain words skip the peeling.
+- **Vectorized Scoring**: Concatenates the tokens of a whole batch and applies TextBlob's rules to all of them at once with numpy: modifiers ("very good") scale the word they precede, negations ("not good", carried across short words) turn a score into -0.5 times itself, and exclamation marks boost the preceding score. Polarities are averaged per document with `numpy.bincount`.
+
+Tolerance: on texts without emoticons or the "(!)" irony marker, polarities equal TextBlob's within `POLARITY_TOLERANCE`, i.e. up to float rounding, whatever their punctuation. Emoticons and "(!)" are not scored, so a text with one differs from TextBlob by that marker's share of the average, and its pieces (such as "*" and ")" of "*)") count as punctuation tokens. `benchmarks/bench_sentiment.py` measures the agreement.
+"""
+
+import importlib.util
+import os
+import re
+import xml.etree.ElementTree as ElementTree
+import numpy as np
+
+NEGATIONS = ('no', 'not', 'never')
+# TextBlob's tokenizer (`textblob._text.find_tokens`) splits on whitespace, then peels punctuation off both ends of each chunk,
+# keeping inner punctuation ("well-written", "f*cking", "a,b"), a trailing "..." as one token and the period of abbreviations
+PUNCTUATION = ',;:!?()[]{}`\'"@#$^&*+-|=~_'
+ABBREVIATIONS = frozenset(('a.', 'adj.', 'adv.', 'al.', 'a.m.', 'c.', 'cf.', 'comp.', 'conf.', 'def.', 'ed.', 'e.g.', 'esp.', 'etc.',
+                           'ex.', 'f.', 'fig.', 'gen.', 'id.', 'i.e.', 'int.', 'l.', 'm.', 'Med.', 'Mil.', 'Mr.', 'n.', 'n.q.',
+                           'orig.', 'p.m.', 'pl.', 'pred.', 'pres.', 'ref.', 'v.', 'vs.', 'w/'))
+ABBREVIATION_PATTERN = re.compile(r"^(?:[A-Za-z]\.)+$|^[A-Z][b|c|d|f|g|h|j|k|l|m|n|p|q|r|s|t|v|w|x|z]+.$")
+# Like TextBlob, "don't" becomes "do", "n", "'" and "t", so contractions never read as a negation
+CONTRACTION_PATTERN = re.compile(r"'d|'m|'s|'ll|'re|'ve|n't")
+QUOTES = str.maketrans({quote: f" {quote} " for quote in '“”‘’\'"'})
+# A word scored after a negation counts as -0.5 times its polarity, as in TextBlob
+NEGATION_FACTOR = -0.5
+EXCLAMATION_BOOST = 1.25
+# The largest difference from TextBlob's polarity on texts without emoticons or irony markers
+POLARITY_TOLERANCE = 1e-9
+
+def textblob_lexicon_path():
+    """Return the path of the sentiment lexicon bundled with TextBlob, found without importing the package."""
+    spec = importlib.util.find_spec('textblob')
+    if spec is None or not spec.submodule_search_locations:
+        raise FileNotFoundError("TextBlob is not installed, so its sentiment lexicon is not available")
+    return os.path.join(list(spec.submodule_search_locations)[0], 'en', 'en-sentiment.xml')
+
+def _peel(chunk, tokens):
+    # Leading punctuation comes off one character at a time; periods stay
+    while chunk and chunk[0] in PUNCTUATION:
+        tokens.append(chunk[0])
+        chunk = chunk[1:]
+    tail = []
+    while chunk and chunk[-1] in PUNCTUATION or chunk.endswith('.'):
+        if chunk[-1] in PUNCTUATION:
+            tail.append(chunk[-1])
+            chunk = chunk[:-1]
+        if chunk.endswith('...'):
+            tail.append('...')
+            chunk = chunk[:-3].rstrip('.')
+        if chunk.endswith('.'):
+            if chunk in ABBREVIATIONS or ABBREVIATION_PATTERN.match(chunk):
+                break
+            tail.append('.')
+            chunk = chunk[:-1]
+    if chunk:
+        tokens.append(chunk)
+    tokens.extend(reversed(tail))
+
+def tokenize(text):
+    """Split a text into the lowercased tokens TextBlob's sentiment analysis sees, leaving emoticons and "(!)" in pieces."""
+    tokens = []
+    for chunk in CONTRACTION_PATTERN.sub(lambda match: ' ' + match.group(), text).translate(QUOTES).split():
+        # Most chunks are plain words, which need no peeling
+        if chunk.isalnum():
+            tokens.append(chunk)
+        else:
+            _peel(chunk, tokens)
+    # Abbreviations are recognized by their case, so tokens are only lowercased now
+    return [token.lower() for token in tokens]
+
+def _average(values):
+    return [sum(column) / len(column) for column in zip(*values)]
+
+def read_lexicon(path):
+    """
+    Read a pattern-style sentiment lexicon the way TextBlob's English `Sentiment.load` does.
+
+    Returns:
+        dict: Word to {part-of-speech tag or None: (polarity, subjectivity, intensity)}, where None holds the average over all tags.
+    """
+    words = {}
+    for entry in ElementTree.parse(path).getroot().findall('word'):
+        form = entry.attrib.get('form')
+        if form:
+            scores = (float(entry.attrib.get('polarity', 0.0)), float(entry.attrib.get('subjectivity', 0.0)),
+                      float(entry.attrib.get('intensity', 1.0)))
+            words.setdefault(form, {}).setdefault(entry.attrib.get('pos'), []).append(scores)
+    for form, senses in words.items():
+        words[form] = {pos: _average(scores) for pos, scores in senses.items()}
+    for form, tags in list(words.items()):
+        tags[None] = _average(tags.values())
+    # Adjectives also score as the adverb derived from them, e.g. "terrible" as "terribly"
+    for form, tags in list(words.items()):
+        if 'JJ' in tags:
+            stem = form[:-1] + 'i' if form.endswith('y') else form
+            stem = stem[:-2] if stem.endswith('le') else stem
+            adverb = words.setdefault(stem + 'ly', {})
+            adverb['RB'] = adverb[None] = tuple(tags['JJ'])
+    return words
+
+class LexiconSentiment:
+    """
+    Polarity of many texts per call, from a compiled sentiment lexicon.
+
+    Args:
+        path (str): A pattern-style sentiment lexicon; defaults to the one bundled with TextBlob.
+    """
+
+    def __init__(self, path=None):
+        words = read_lexicon(path or textblob_lexicon_path())
+        vocabulary = list(words) + [word for word in NEGATIONS + ('!',) if word not in words]
+        self._rows = {word: row for row, word in enumerate(vocabulary)}
+        self._known = np.array([word in words for word in vocabulary], dtype=bool)
+        self._polarity = np.array([words[word][None][0] if word in words else 0.0 for word in vocabulary], dtype=np.float64)
+        self._intensity = np.array([words[word][None][2] if word in words else 1.0 for word in vocabulary], dtype=np.float64)
+        self._modifier = np.array([word in words and 'RB' in words[word] for word in vocabulary], dtype=bool)
+        # A negation after an -ly modifier ("really not good") negates the modifier's chain instead of resetting it
+        self._ly = np.array([word.endswith('ly') for word in vocabulary], dtype=bool)
+        self._negation = np.array([word in NEGATIONS for word in vocabulary], dtype=bool)
+        self._exclamation = np.array([word == '!' for word in vocabulary], dtype=bool)
+
+    def __len__(self):
+        return int(self._known.sum())
+
+    def polarity(self, text):
+        return self.polarity_batch([text])[0]
+
+    def polarity_batch(self, texts):
+        """
+        Score the polarity of many texts in one vectorized pass.
+
+        Args:
+            texts (list): The texts to score; None counts as empty.
+
+        Returns:
+            list: A polarity between -1.0 and 1.0 per text, in input order; 0.0 for texts without scored words.
+        """
+        tokens, lengths = [], []
+        for text in texts:
+            found = tokenize(text or '')
+            tokens.extend(found)
+            lengths.append(len(found))
+        if not tokens:
+            return [0.0] * len(texts)
+        rows = self._rows
+        codes = np.fromiter((rows.get(token, -1) for token in tokens), dtype=np.int64, count=len(tokens))
+        sizes = np.fromiter(map(len, tokens), dtype=np.int64, count=len(tokens))
+        document = np.repeat(np.arange(len(texts)), lengths)
+        listed = codes >= 0
+        lookup = np.where(listed, codes, 0)
+
+        def flag(table):
+            return listed & table[lookup]
+
+        known, modifier, negation, exclamation = flag(self._known), flag(self._modifier), flag(self._negation), flag(self._exclamation)
+        polarity = np.where(known, self._polarity[lookup], 0.0)
+        intensity = np.where(known, self._intensity[lookup], 1.0)
+
+        def last_before(mask):
+            # The position of the closest earlier token in the same document where mask holds, or -1
+            positions = np.maximum.accumulate(np.where(mask, np.arange(len(tokens)), -1))
+            previous = np.concatenate(([-1], positions[:-1]))
+            return np.where((previous >= 0) & (document[np.maximum(previous, 0)] == document), previous, -1)
+
+        previous_known = last_before(known)
+        has_previous = previous_known >= 0
+        anchor = np.maximum(previous_known, 0)
+
+        # A modifier is carried across words of at most two characters, so "very a good" still modifies "good"
+        blocked = np.cumsum(~known & (sizes > 2) & ~negation)
+        # A negation right after an -ly modifier ("really not") negates the modifier's assessment and keeps the modifier going
+        absorbed = (negation & ~known & has_previous & modifier[anchor] & flag(self._ly)[anchor]
+                    & (blocked - blocked[anchor] == 0))
+        blocking = ~known & (sizes > 2) & ~absorbed
+        blocked = np.cumsum(blocking)
+        blocked_between = np.where(has_previous, (blocked - blocking) - blocked[anchor], 1)
+        merged = known & has_previous & modifier[anchor] & (blocked_between == 0)
+
+        # Any other negation is carried until a scored word or a word of two or more characters
+        negation_state = last_before(known | negation | (~negation & (sizes > 1)))
+        state = np.maximum(negation_state, 0)
+        negated = known & (negation_state >= 0) & negation[state] & ~absorbed[state]
+        # A negated modifier inverts its intensity for the word it modifies
+        effective_intensity = np.where(negated, 1.0 / intensity, intensity)
+        score = np.where(merged, np.clip(polarity * effective_intensity[anchor], -1.0, 1.0), polarity)
+        chain_negated = negated.copy()
+        chain_negated[previous_known[absorbed]] = True
+        # A chain of modified words is one assessment, negated if any of its words is; chains are short, so this takes few passes
+        while True:
+            carried = chain_negated | (merged & chain_negated[anchor])
+            if np.array_equal(carried, chain_negated):
+                break
+            chain_negated = carried
+
+        # A word modified by the next one is scored as part of that word's assessment only
+        superseded = np.zeros(len(tokens), dtype=bool)
+        superseded[previous_known[merged]] = True
+        scored = known & ~superseded
+        targets = previous_known[exclamation & (previous_known >= 0)]
+        boosts = np.bincount(targets, minlength=len(tokens))
+        score = np.clip(score * EXCLAMATION_BOOST ** boosts, -1.0, 1.0)
+        score = np.where(chain_negated, NEGATION_FACTOR * score, score)
+
+        totals = np.bincount(document[scored], weights=score[scored], minlength=len(texts))
+        counts = np.bincount(document[scored], minlength=len(texts))
+        return (totals / np.maximum(counts, 1)).tolist()
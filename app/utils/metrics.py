@@ -0,0 +1,176 @@
+"""
+This module collects latency histograms for the application's hot paths and renders them in the Prometheus text format.
+
+Key Responsibilities:
+- **Histograms**: Counts observations into fixed latency buckets, with a running sum and count. Recording an observation is a binary search and a few additions under a lock, so instrumentation stays cheap enough to leave on.
+- **Operation Timing**: Provides `timed`, usable both as a decorator (of plain or `async` functions) and as a context manager, which records the duration of a named operation such as `sentiment` or `db.get_note_by_id`.
+- **Per-Request Breakdown**: While a request is being timed, also accumulates the time spent in every operation within that request, for the `Server-Timing` response header. The breakdown lives in a context variable, so concurrent requests never mix, and work done on background threads only reaches the histograms.
+- **Prometheus Export**: Renders every histogram, including the per-endpoint request latency, in the Prometheus text exposition format.
+"""
+
+import bisect
+import inspect
+import threading
+import time
+from contextvars import ContextVar
+from functools import wraps
+from config.config import METRICS_ENABLED
+
+# Upper bounds in seconds, from sub-millisecond cache hits to multi-second bulk writes
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+OPERATION_METRIC = 'smartnote_operation_duration_seconds'
+REQUEST_METRIC = 'smartnote_http_request_duration_seconds'
+
+_HELP = {
+    OPERATION_METRIC: 'Duration of instrumented operations.',
+    REQUEST_METRIC: 'Duration of HTTP requests by endpoint.'
+}
+
+class Histogram:
+    """
+    A thread-safe histogram with fixed bucket upper bounds.
+
+    Args:
+        buckets (tuple): The ascending upper bounds; observations above the last one only count towards +Inf.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[position] += 1
+            self._sum += value
+
+    def snapshot(self):
+        """Return the cumulative count per upper bound (ending with +Inf), the sum and the count."""
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        cumulative, running = [], 0
+        for count in counts:
+            running += count
+            cumulative.append(running)
+        return {"buckets": cumulative, "sum": total, "count": running}
+
+_histograms = {}
+_histograms_lock = threading.Lock()
+_request_timings = ContextVar('request_timings', default=None)
+
+def _histogram(metric, labels):
+    key = (metric, labels)
+    histogram = _histograms.get(key)
+    if histogram is None:
+        with _histograms_lock:
+            histogram = _histograms.setdefault(key, Histogram())
+    return histogram
+
+def observe(name, seconds):
+    """Record the duration of an operation, in the histograms and in the current request's breakdown."""
+    if not METRICS_ENABLED:
+        return
+    _histogram(OPERATION_METRIC, (('operation', name),)).observe(seconds)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+def observe_request(method, endpoint, status, seconds):
+    if not METRICS_ENABLED:
+        return
+    labels = (('method', method), ('endpoint', endpoint), ('status', str(status)))
+    _histogram(REQUEST_METRIC, labels).observe(seconds)
+
+class timed:
+    """
+    Time an operation, as a decorator or as a context manager.
+
+    Args:
+        name (str): The operation name, used as the histogram label and the `Server-Timing` metric name.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        observe(self.name, time.perf_counter() - self._started)
+        return False
+
+    def __call__(self, function):
+        name = self.name
+
+        if inspect.iscoroutinefunction(function):
+            # Time the awaited work, not just the creation of the coroutine
+            @wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await function(*args, **kwargs)
+                finally:
+                    observe(name, time.perf_counter() - started)
+            return async_wrapper
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - started)
+        return wrapper
+
+def start_request_timing():
+    """Start collecting the operation breakdown of the current request; returns a token for `finish_request_timing`."""
+    return _request_timings.set({})
+
+def finish_request_timing(token):
+    """Stop collecting and return the current request's breakdown, mapping operation names to seconds."""
+    timings = _request_timings.get() or {}
+    _request_timings.reset(token)
+    return timings
+
+def format_server_timing(timings, total=None):
+    """Format a breakdown as a `Server-Timing` header value, with durations in milliseconds."""
+    entries = [f"{name};dur={seconds * 1000.0:.3f}" for name, seconds in timings.items()]
+    if total is not None:
+        entries.append(f"total;dur={total * 1000.0:.3f}")
+    return ', '.join(entries)
+
+def _format_labels(labels):
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels
+    )
+    return ','.join(f'{name}="{value}"' for name, value in escaped)
+
+def render_prometheus():
+    """
+    Render every histogram in the Prometheus text exposition format.
+
+    Returns:
+        str: The metrics page, one `_bucket` line per bound plus `_sum` and `_count` for every label set.
+    """
+    with _histograms_lock:
+        histograms = sorted(_histograms.items())
+    lines = []
+    current_metric = None
+    for (metric, labels), histogram in histograms:
+        if metric != current_metric:
+            lines.append(f"# HELP {metric} {_HELP[metric]}")
+            lines.append(f"# TYPE {metric} histogram")
+            current_metric = metric
+        snapshot = histogram.snapshot()
+        bounds = [repr(bound) for bound in histogram.buckets] + ['+Inf']
+        for bound, count in zip(bounds, snapshot["buckets"]):
+            lines.append(f"{metric}_bucket{{{_format_labels(labels + (('le', bound),))}}} {count}")
+        lines.append(f"{metric}_sum{{{_format_labels(labels)}}} {snapshot['sum']!r}")
+        lines.append(f"{metric}_count{{{_format_labels(labels)}}} {snapshot['count']}")
+    return '\n'.join(lines) + '\n'
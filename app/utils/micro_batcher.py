@@ -0,0 +1,140 @@
+"""
+This module provides a micro-batching layer that groups calls from concurrent callers into a single batched call.
+It is used in front of the categorisation model, whose vectorize-and-predict cost is nearly the same for one row as for dozens,
+so serving concurrent requests one row at a time wastes most of the CPU on per-call overhead.
+
+Key Responsibilities:
+- **Request Collection**: Queues items submitted by any number of threads and returns a `Future` for each one.
+- **Batch Formation**: A single background worker waits for up to `max_wait_ms` after the first queued item, or until `max_batch_size` items have been collected, whichever comes first.
+- **Result Fan-out**: Runs the batch handler once and resolves each caller's future with its own result, or with the handler's exception if the batch fails.
+- **Metrics**: Records the number of batches, a histogram of batch sizes and the time items spend waiting in the queue.
+
+The worker thread is started lazily on first use, so a process that forks after importing this module starts its own worker.
+"""
+
+import threading
+import time
+import queue
+from concurrent.futures import Future
+
+# Upper bounds of the batch-size histogram buckets; larger batches fall into the last bucket
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+class MicroBatcher:
+    """
+    Collects items from concurrent callers and processes them in batches.
+
+    Args:
+        handler (callable): Called with a list of items, must return a list of results in the same order.
+        max_batch_size (int): The largest batch passed to the handler.
+        max_wait_ms (float): How long to wait for more items after the first one arrives.
+        max_queue_size (int): The number of items that can wait before `submit` blocks the caller.
+        name (str): A name for the worker thread and in reported metrics.
+    """
+
+    def __init__(self, handler, max_batch_size=64, max_wait_ms=5, max_queue_size=10000, name='micro-batcher'):
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.name = name
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._lock = threading.Lock()
+        self._worker = None
+        self._stopped = False
+        self._batches = 0
+        self._items = 0
+        self._batch_size_counts = [0] * len(BATCH_SIZE_BUCKETS)
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def submit(self, item):
+        """Queue an item for the next batch and return a `Future` for its result."""
+        if self._stopped:
+            raise RuntimeError(f"{self.name} has been shut down")
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((item, future, time.perf_counter()))
+        return future
+
+    def process(self, item, timeout=None):
+        """Submit an item and block until its result is available."""
+        return self.submit(item).result(timeout)
+
+    def shutdown(self, wait=True):
+        """Stop accepting items and let the worker finish what is already queued."""
+        self._stopped = True
+        if self._worker is not None:
+            self._queue.put(None)
+            if wait:
+                self._worker.join()
+
+    def stats(self):
+        """Return batch-size and queue-wait metrics collected so far."""
+        with self._lock:
+            return {
+                "name": self.name,
+                "batches": self._batches,
+                "items": self._items,
+                "avg_batch_size": self._items / self._batches if self._batches else 0.0,
+                "batch_size_histogram": {
+                    f"le_{bound}": count for bound, count in zip(BATCH_SIZE_BUCKETS, self._batch_size_counts)
+                },
+                "avg_queue_wait_ms": 1000.0 * self._wait_total / self._items if self._items else 0.0,
+                "max_queue_wait_ms": 1000.0 * self._wait_max,
+                "queue_depth": self._queue.qsize()
+            }
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._worker.start()
+
+    def _collect(self):
+        # Block for the first item, then keep collecting until the batch is full or its deadline passes
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = first[2] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is None:
+                # Put the sentinel back so the loop exits after this batch
+                self._queue.put(None)
+                break
+            batch.append(entry)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            started = time.perf_counter()
+            self._record(len(batch), [started - enqueued for _, _, enqueued in batch])
+            try:
+                results = self.handler([item for item, _, _ in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(f"{self.name} handler returned {len(results)} results for {len(batch)} items")
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future, _), result in zip(batch, results):
+                future.set_result(result)
+
+    def _record(self, size, waits):
+        bucket = next((i for i, bound in enumerate(BATCH_SIZE_BUCKETS) if size <= bound), len(BATCH_SIZE_BUCKETS) - 1)
+        with self._lock:
+            self._batches += 1
+            self._items += size
+            self._batch_size_counts[bucket] += 1
+            self._wait_total += sum(waits)
+            self._wait_max = max(self._wait_max, max(waits))
@@ -0,0 +1,94 @@
+"""
+This module is responsible for turning an iterable of note documents into a stream of newline-delimited JSON (NDJSON).
+It is used by the export endpoint to stream large collections without ever building the full response in memory.
+
+Key Responsibilities:
+- **NDJSON Encoding**: Serializes each document on its own line, converting values such as `ObjectId` and datetimes to strings.
+- **Chunking**: Groups lines into chunks of a bounded size to avoid one tiny write per document, while sending the first document immediately so clients receive the first byte without waiting for a full chunk.
+- **Gzip Compression**: Optionally compresses the chunk stream incrementally, so compression does not require buffering the whole export either.
+- **Async Streams**: `aiter_ndjson` and `agzip_stream` do the same for async iterators, as used by the asyncio server.
+"""
+
+import json
+import zlib
+
+DEFAULT_CHUNK_BYTES = 64 * 1024
+
+def iter_ndjson(documents, chunk_bytes=DEFAULT_CHUNK_BYTES):
+    """
+    Encode documents as NDJSON and yield them in chunks of roughly `chunk_bytes`.
+
+    Args:
+        documents (iterable): The documents to encode, typically a live database cursor.
+        chunk_bytes (int): The size at which buffered lines are flushed.
+
+    Yields:
+        bytes: Encoded chunks, each ending on a line boundary.
+    """
+    buffer = []
+    buffered = 0
+    first = True
+    for document in documents:
+        line = (json.dumps(document, default=str) + '\n').encode('utf-8')
+        buffer.append(line)
+        buffered += len(line)
+        if first or buffered >= chunk_bytes:
+            yield b''.join(buffer)
+            buffer = []
+            buffered = 0
+            first = False
+    if buffer:
+        yield b''.join(buffer)
+
+def gzip_stream(chunks):
+    """
+    Compress a stream of byte chunks into a single gzip stream.
+
+    The first chunk is sync-flushed so compressed output starts flowing immediately.
+
+    Args:
+        chunks (iterable): The uncompressed byte chunks.
+
+    Yields:
+        bytes: Compressed gzip data.
+    """
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    first = True
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if first:
+            data += compressor.flush(zlib.Z_SYNC_FLUSH)
+            first = False
+        if data:
+            yield data
+    yield compressor.flush()
+
+async def aiter_ndjson(documents, chunk_bytes=DEFAULT_CHUNK_BYTES):
+    """Like `iter_ndjson`, for an async iterator of documents such as an asynchronous database cursor."""
+    buffer = []
+    buffered = 0
+    first = True
+    async for document in documents:
+        line = (json.dumps(document, default=str) + '\n').encode('utf-8')
+        buffer.append(line)
+        buffered += len(line)
+        if first or buffered >= chunk_bytes:
+            yield b''.join(buffer)
+            buffer = []
+            buffered = 0
+            first = False
+    if buffer:
+        yield b''.join(buffer)
+
+async def agzip_stream(chunks):
+    """Like `gzip_stream`, for an async iterator of byte chunks."""
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    first = True
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if first:
+            data += compressor.flush(zlib.Z_SYNC_FLUSH)
+            first = False
+        if data:
+            yield data
+    yield compressor.flush()
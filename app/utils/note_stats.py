@@ -0,0 +1,106 @@
+"""
+This module defines the materialized note statistics behind `GET /notes/stats`: the buckets a note counts in, the deltas a write applies to them, and the summary served to clients.
+
+Key Responsibilities:
+- **Buckets**: Every note counts in the bucket of its category and in the bucket of the UTC day it was created, read from the timestamp in its ObjectId. A bucket holds the number of notes, the sum of their sentiments and the number of notes that have a sentiment, so averages stay exact while enrichment is pending.
+- **Deltas**: `stats_deltas` turns a note's state before and after a write into increments per bucket, so storage can apply them with atomic `$inc` upserts instead of re-aggregating the collection. Inserts have no before state and deletes no after state.
+- **Summary**: `summarize_stats` turns the stored buckets into totals, per-category figures and a daily trend. Its cost depends on the number of categories and days, not on the number of notes.
+"""
+
+from bson import ObjectId
+
+# The fields of a note that its buckets depend on, besides its `_id`
+STATS_FIELDS = ['category', 'sentiment']
+CATEGORY_BUCKET = 'category'
+DAY_BUCKET = 'day'
+
+def note_day(note_id):
+    """Return the UTC creation day of a note as YYYY-MM-DD, or None for IDs that carry no timestamp."""
+    if not isinstance(note_id, ObjectId):
+        return None
+    return note_id.generation_time.date().isoformat()
+
+def bucket_id(kind, key):
+    return f"{kind}:{key if key is not None else ''}"
+
+def _buckets(document):
+    yield CATEGORY_BUCKET, document.get('category')
+    day = note_day(document.get('_id'))
+    if day is not None:
+        yield DAY_BUCKET, day
+
+def _has_sentiment(sentiment):
+    return isinstance(sentiment, (int, float)) and not isinstance(sentiment, bool)
+
+def stats_deltas(before=None, after=None):
+    """
+    Compute how a write changes the statistics buckets.
+
+    Args:
+        before (dict): The note's `_id`, category and sentiment before the write, or None for an insert.
+        after (dict): The same fields after the write, or None for a delete.
+
+    Returns:
+        dict: Increments of `count`, `sentiment_sum` and `sentiment_count` keyed by (kind, key) bucket, leaving out buckets that do not change.
+    """
+    deltas = {}
+    for document, sign in ((before, -1), (after, 1)):
+        if document is None:
+            continue
+        sentiment = document.get('sentiment')
+        scored = _has_sentiment(sentiment)
+        for bucket in _buckets(document):
+            delta = deltas.setdefault(bucket, {"count": 0, "sentiment_sum": 0.0, "sentiment_count": 0})
+            delta["count"] += sign
+            if scored:
+                delta["sentiment_sum"] += sign * sentiment
+                delta["sentiment_count"] += sign
+    return {bucket: delta for bucket, delta in deltas.items() if any(delta.values())}
+
+def merge_deltas(many):
+    """Sum several `stats_deltas` results, so a bulk write updates each bucket once."""
+    merged = {}
+    for deltas in many:
+        for bucket, delta in deltas.items():
+            total = merged.setdefault(bucket, {"count": 0, "sentiment_sum": 0.0, "sentiment_count": 0})
+            for name, value in delta.items():
+                total[name] += value
+    return merged
+
+def aggregate_buckets(documents):
+    """Compute every bucket from scratch, for stores without an aggregation engine of their own."""
+    return merge_deltas(stats_deltas(after=document) for document in documents)
+
+def _average(bucket):
+    if bucket["sentiment_count"] <= 0:
+        return None
+    return round(bucket["sentiment_sum"] / bucket["sentiment_count"], 4)
+
+def summarize_stats(buckets):
+    """
+    Build the statistics response from stored buckets.
+
+    Args:
+        buckets (list): Bucket documents with `kind`, `key`, `count`, `sentiment_sum` and `sentiment_count`.
+
+    Returns:
+        dict: The `total`, the `categories` by descending count and the `daily` trend in date order.
+    """
+    categories = [bucket for bucket in buckets if bucket["kind"] == CATEGORY_BUCKET and bucket["count"] > 0]
+    days = [bucket for bucket in buckets if bucket["kind"] == DAY_BUCKET and bucket["count"] > 0]
+    total = {
+        "count": sum(bucket["count"] for bucket in categories),
+        "sentiment_sum": sum(bucket["sentiment_sum"] for bucket in categories),
+        "sentiment_count": sum(bucket["sentiment_count"] for bucket in categories)
+    }
+    return {
+        "total": {"count": total["count"], "average_sentiment": _average(total)},
+        "categories": [
+            {"category": bucket["key"], "count": bucket["count"], "average_sentiment": _average(bucket)}
+            for bucket in sorted(categories, key=lambda bucket: (-bucket["count"], bucket["key"] or ''))
+        ],
+        "daily": [
+            {"date": bucket["key"], "count": bucket["count"], "average_sentiment": _average(bucket)}
+            for bucket in sorted(days, key=lambda bucket: bucket["key"])
+        ]
+    }
@@ -0,0 +1,56 @@
+"""
+This module provides an optional sampling profiler for requests.
+
+Key Responsibilities:
+- **Sampling**: Decides per request whether to profile it, profiling `PROFILE_SAMPLE_PERCENT` percent of requests. At the default of 0 nothing is ever profiled.
+- **Profiling**: Runs cProfile around a sampled request and writes its stats to `PROFILE_OUTPUT_DIR`, one `.prof` file per request, for `python -m pstats` or snakeviz.
+
+Only one request is profiled at a time per process, since cProfile cannot profile overlapping requests reliably; sampled requests that arrive while another one is being profiled are skipped.
+"""
+
+import cProfile
+import itertools
+import os
+import random
+import re
+import threading
+import time
+from config.config import PROFILE_SAMPLE_PERCENT, PROFILE_OUTPUT_DIR
+
+_active = threading.Lock()
+_sequence = itertools.count(1)
+
+def start_profile():
+    """
+    Start profiling the current request if it is sampled.
+
+    Returns:
+        cProfile.Profile: The running profiler, or None if the request is not profiled.
+    """
+    if PROFILE_SAMPLE_PERCENT <= 0 or random.random() * 100.0 >= PROFILE_SAMPLE_PERCENT:
+        return None
+    if not _active.acquire(blocking=False):
+        return None
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another profiler, e.g. a debugger's, is already active on this thread
+        _active.release()
+        return None
+    return profiler
+
+def finish_profile(profiler, label):
+    """Stop a profiler started by `start_profile` and write its stats; returns the file path."""
+    try:
+        profiler.disable()
+        os.makedirs(PROFILE_OUTPUT_DIR, exist_ok=True)
+        name = re.sub(r'[^A-Za-z0-9_.-]+', '_', label)
+        path = os.path.join(PROFILE_OUTPUT_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(_sequence)}-{name}.prof")
+        profiler.dump_stats(path)
+        return path
+    except OSError as e:
+        print(f"Could not write request profile: {e}")
+        return None
+    finally:
+        _active.release()
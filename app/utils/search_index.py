@@ -0,0 +1,252 @@
+"""
+This module implements an in-process full-text search engine for notes, used as an alternative to MongoDB's `$text` search.
+It keeps a compact inverted index over note titles and contents and ranks matches with BM25.
+
+Key Responsibilities:
+- **Tokenization**: Lowercases text and splits it into alphanumeric terms with a single precompiled regular expression. Title terms are weighted more heavily than content terms.
+- **Inverted Index**: Maps every term to a small integer ID and every note to a small integer document number. Each posting maps a document number to its term frequency, and a forward index remembers each document's terms so it can be removed cheaply.
+- **Incremental Updates**: Adds, replaces and removes single notes without rebuilding the index.
+- **BM25 Ranking**: Scores candidate documents with Okapi BM25 and returns only the top-k through a heap, instead of sorting every match.
+- **Prefix Queries**: Terms ending in `*`, or the last term when prefix mode is requested, expand to every indexed term with that prefix, found by binary search over the sorted vocabulary. Prefixes shorter than `MIN_PREFIX_LENGTH` match nothing.
+- **Snapshots**: Saves the index to disk atomically and loads it back, so a restart does not need to re-read every note. A snapshot records the index's `sequence`, the position in its source it is current up to, and is serialized from a copy taken under the lock, so searches and writes only wait for the copy, not for pickling and disk I/O.
+
+All public methods are thread-safe.
+"""
+
+import bisect
+import heapq
+import math
+import os
+import pickle
+import re
+import threading
+from array import array
+from collections import defaultdict
+from operator import itemgetter
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Shorter prefixes would expand to a large share of the vocabulary
+MIN_PREFIX_LENGTH = 2
+
+# Bumped whenever the snapshot layout changes, so stale snapshots are rebuilt instead of misread
+SNAPSHOT_FORMAT = 2
+
+def tokenize(text):
+    return _TOKEN_RE.findall((text or '').lower())
+
+def parse_query(query, prefix=False):
+    """
+    Split a query into (term, is_prefix) pairs.
+
+    A whitespace-separated word ending in `*` makes its last term a prefix term; with `prefix`
+    set, the last term of the whole query is a prefix term as well.
+    """
+    terms = []
+    for word in (query or '').split():
+        tokens = tokenize(word)
+        if not tokens:
+            continue
+        terms.extend((token, False) for token in tokens[:-1])
+        terms.append((tokens[-1], word.endswith('*')))
+    if prefix and terms:
+        terms[-1] = (terms[-1][0], True)
+    return terms
+
+class InvertedIndex:
+    """
+    An incrementally maintained inverted index with BM25 ranking.
+
+    Args:
+        k1 (float): BM25 term-frequency saturation.
+        b (float): BM25 document-length normalization.
+        title_weight (int): How many times a title term counts relative to a content term.
+
+    Attributes:
+        sequence (int): The position in the indexed source the index is current up to, kept in snapshots; set by the owner.
+    """
+
+    def __init__(self, k1=1.2, b=0.75, title_weight=2):
+        self.k1 = k1
+        self.b = b
+        self.title_weight = title_weight
+        self._lock = threading.RLock()
+        self._term_ids = {}
+        self._terms = []
+        self._postings = []
+        self._doc_numbers = {}
+        self._doc_keys = []
+        self._doc_terms = {}
+        self._doc_lengths = {}
+        self._total_length = 0
+        self._free_numbers = []
+        self._sorted_terms = None
+        self.sequence = 0
+
+    def __len__(self):
+        return len(self._doc_numbers)
+
+    def __contains__(self, doc_id):
+        return doc_id in self._doc_numbers
+
+    def add(self, doc_id, title, content):
+        """Index a document, replacing any previous version with the same ID."""
+        frequencies = defaultdict(int)
+        for term in tokenize(title):
+            frequencies[term] += self.title_weight
+        for term in tokenize(content):
+            frequencies[term] += 1
+
+        with self._lock:
+            self._remove(doc_id)
+            if self._free_numbers:
+                number = self._free_numbers.pop()
+                self._doc_keys[number] = doc_id
+            else:
+                number = len(self._doc_keys)
+                self._doc_keys.append(doc_id)
+            self._doc_numbers[doc_id] = number
+
+            term_ids = array('I')
+            for term, frequency in frequencies.items():
+                term_id = self._term_ids.get(term)
+                if term_id is None:
+                    term_id = len(self._terms)
+                    self._term_ids[term] = term_id
+                    self._terms.append(term)
+                    self._postings.append({})
+                    self._sorted_terms = None
+                self._postings[term_id][number] = frequency
+                term_ids.append(term_id)
+            length = sum(frequencies.values())
+            self._doc_terms[number] = term_ids
+            self._doc_lengths[number] = length
+            self._total_length += length
+
+    def remove(self, doc_id):
+        """Remove a document from the index; unknown IDs are ignored."""
+        with self._lock:
+            self._remove(doc_id)
+
+    def search(self, query, k=10, prefix=False):
+        """
+        Find the `k` best-matching documents for a query.
+
+        Args:
+            query (str): Free-text query. A term ending in `*` matches every term starting with it.
+            k (int): The number of results to return.
+            prefix (bool): Treat the last query term as a prefix, as in search-as-you-type.
+
+        Returns:
+            list: (doc_id, score) tuples, best match first.
+        """
+        query_terms = parse_query(query, prefix)
+
+        with self._lock:
+            total_docs = len(self._doc_numbers)
+            if total_docs == 0 or k <= 0:
+                return []
+            average_length = self._total_length / total_docs
+            # Hoist the BM25 constants out of the per-posting loop, which dominates query time
+            length_factor = self.k1 * self.b / average_length
+            base_norm = self.k1 * (1 - self.b)
+            doc_lengths = self._doc_lengths
+            scores = defaultdict(float)
+            for term, is_prefix in query_terms:
+                for term_id in self._expand(term, is_prefix):
+                    postings = self._postings[term_id]
+                    document_frequency = len(postings)
+                    if not document_frequency:
+                        continue
+                    idf = math.log(1 + (total_docs - document_frequency + 0.5) / (document_frequency + 0.5))
+                    weight = idf * (self.k1 + 1)
+                    for number, frequency in postings.items():
+                        scores[number] += weight * frequency / (frequency + base_norm + length_factor * doc_lengths[number])
+            best = heapq.nlargest(k, scores.items(), key=itemgetter(1))
+            return [(self._doc_keys[number], score) for number, score in best]
+
+    def save(self, path):
+        """Write a snapshot of the index to `path`, replacing it atomically."""
+        # Postings are changed in place, so they are copied; the term arrays of a document are replaced, never changed
+        with self._lock:
+            state = {
+                "format": SNAPSHOT_FORMAT,
+                "params": (self.k1, self.b, self.title_weight),
+                "sequence": self.sequence,
+                "terms": list(self._terms),
+                "postings": [dict(postings) for postings in self._postings],
+                "doc_keys": list(self._doc_keys),
+                "doc_terms": dict(self._doc_terms),
+                "doc_lengths": dict(self._doc_lengths),
+                "free_numbers": list(self._free_numbers)
+            }
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        # One temporary file per process, so processes saving at the same time never write into each other's file
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, 'wb') as snapshot:
+            pickle.dump(state, snapshot, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load an index from a snapshot written by `save`.
+
+        Returns:
+            InvertedIndex: The loaded index, or None if the snapshot is missing or from another format.
+        """
+        try:
+            with open(path, 'rb') as snapshot:
+                state = pickle.load(snapshot)
+        except FileNotFoundError:
+            return None
+        if state.get("format") != SNAPSHOT_FORMAT:
+            return None
+
+        index = cls(*state["params"])
+        index.sequence = state["sequence"]
+        index._terms = state["terms"]
+        index._term_ids = {term: term_id for term_id, term in enumerate(index._terms)}
+        index._postings = state["postings"]
+        index._doc_keys = state["doc_keys"]
+        index._free_numbers = state["free_numbers"]
+        free = set(index._free_numbers)
+        index._doc_numbers = {key: number for number, key in enumerate(index._doc_keys) if number not in free}
+        index._doc_terms = state["doc_terms"]
+        index._doc_lengths = state["doc_lengths"]
+        index._total_length = sum(index._doc_lengths.values())
+        return index
+
+    def max_doc_id(self):
+        """Return the largest document ID in the index, or None when it is empty."""
+        with self._lock:
+            return max(self._doc_numbers) if self._doc_numbers else None
+
+    def _remove(self, doc_id):
+        number = self._doc_numbers.pop(doc_id, None)
+        if number is None:
+            return
+        for term_id in self._doc_terms.pop(number):
+            self._postings[term_id].pop(number, None)
+        self._total_length -= self._doc_lengths.pop(number)
+        self._doc_keys[number] = None
+        self._free_numbers.append(number)
+
+    def _expand(self, term, is_prefix):
+        # Exact terms map to at most one ID; prefix terms to every vocabulary entry sharing the prefix
+        if not is_prefix:
+            term_id = self._term_ids.get(term)
+            return [term_id] if term_id is not None else []
+        prefix = term
+        if len(prefix) < MIN_PREFIX_LENGTH:
+            return []
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self._terms)
+        start = bisect.bisect_left(self._sorted_terms, prefix)
+        matches = []
+        for term in self._sorted_terms[start:]:
+            if not term.startswith(prefix):
+                break
+            matches.append(self._term_ids[term])
+        return matches
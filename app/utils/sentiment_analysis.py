@@ -2,14 +2,99 @@
 This module is responsible for analyzing the sentiment of user input text using the TextBlob library.
 It provides a function to calculate the sentiment polarity of a given text, which can be used to determine the overall sentiment as positive, negative, or neutral.
 
+The engine is selected with `SENTIMENT_ENGINE`: `textblob` builds a `TextBlob` per text, while `lexicon` scores texts with TextBlob's own polarity lexicon compiled into numpy arrays (see `utils/lexicon_sentiment.py`), many texts per vectorized pass and within a documented tolerance of TextBlob's polarity.
+`analyze_sentiment_batch` scores a list of texts at once, which the `lexicon` engine does in a single call.
+
+Results are memoized in a bounded LRU cache keyed by a hash of the content and the analyzer version, so templated or duplicated notes are only analyzed once.
+TextBlob (and the NLTK stack behind it) is imported on first use rather than at module import, keeping cold start and test collection fast; `warmup_sentiment()` loads it ahead of traffic. The `lexicon` engine never imports TextBlob at all.
+
 The module assumes that the TextBlob library is installed and available in the environment. It is designed to be simple and efficient, providing a quick way to assess the sentiment of textual content.
 """
 
-from textblob import TextBlob
+import threading
+from importlib.metadata import version
+from config.config import SENTIMENT_CACHE_SIZE, SENTIMENT_ENGINE
+from utils.cache import LRUCache, content_hash
+from utils.metrics import timed
+from utils.startup import timed_phase
 # from tags import NoteTag
 
+SENTIMENT_ENGINES = ('textblob', 'lexicon')
+if SENTIMENT_ENGINE not in SENTIMENT_ENGINES:
+    raise ValueError(f"Unknown sentiment engine '{SENTIMENT_ENGINE}'. Available: {', '.join(SENTIMENT_ENGINES)}")
+
+# Part of every cache key, so upgrading the analyzer or switching engines never serves stale scores
+SENTIMENT_VERSION = f"{'' if SENTIMENT_ENGINE == 'textblob' else 'lexicon-'}textblob-{version('textblob')}"
+
+_cache = LRUCache(SENTIMENT_CACHE_SIZE)
+
+_textblob = None
+_lexicon = None
+_engine_lock = threading.Lock()
+
+def _get_textblob():
+    global _textblob
+    if _textblob is None:
+        with _engine_lock:
+            if _textblob is None:
+                with timed_phase('nlp_load'):
+                    from textblob import TextBlob
+                    # The first analysis loads the polarity lexicon, so do it here rather than on a request
+                    TextBlob("warmup").sentiment
+                _textblob = TextBlob
+    return _textblob
+
+def _get_lexicon():
+    global _lexicon
+    if _lexicon is None:
+        with _engine_lock:
+            if _lexicon is None:
+                with timed_phase('nlp_load'):
+                    from utils.lexicon_sentiment import LexiconSentiment
+                    _lexicon = LexiconSentiment()
+    return _lexicon
+
+def warmup_sentiment():
+    if SENTIMENT_ENGINE == 'lexicon':
+        _get_lexicon()
+    else:
+        _get_textblob()
+
+def _polarities(contents):
+    if SENTIMENT_ENGINE == 'lexicon':
+        return _get_lexicon().polarity_batch(contents)
+    TextBlob = _get_textblob()
+    return [TextBlob(content).sentiment.polarity for content in contents]
+
 "Analyse sentiment of th user input"
+@timed('sentiment')
 def analyze_sentiment(content):
-    blob = TextBlob(content)
-    return blob.sentiment.polarity
-    
+    key = (content_hash(content), SENTIMENT_VERSION)
+    polarity = _cache.get(key)
+    if polarity is None:
+        polarity = _polarities([content])[0]
+        _cache.set(key, polarity)
+    return polarity
+
+@timed('sentiment_batch')
+def analyze_sentiment_batch(contents):
+    """
+    Analyze the sentiment of many contents, sending only those missing from the cache to the engine, in one call.
+
+    Args:
+        contents (list): The contents of the notes.
+
+    Returns:
+        list: The polarity of each content, in input order.
+    """
+    keys = [(content_hash(content), SENTIMENT_VERSION) for content in contents]
+    results = [_cache.get(key) for key in keys]
+    misses = [index for index, result in enumerate(results) if result is None]
+    if misses:
+        for index, polarity in zip(misses, _polarities([contents[index] for index in misses])):
+            _cache.set(keys[index], polarity)
+            results[index] = polarity
+    return results
+
+def sentiment_cache_stats():
+    return _cache.stats()
@@ -0,0 +1,134 @@
+"""
+This module implements an in-process index for finding the notes most similar to a given vector, by cosine similarity over sparse TF-IDF vectors.
+
+Key Responsibilities:
+- **Term-Major Storage**: Keeps the merged vectors as a sparse matrix with one row per term and one column per note, i.e. an inverted index. Scoring a query only touches the rows of its own terms, so its cost grows with the number of notes sharing those terms rather than with the full matrix.
+- **Incremental Updates**: New vectors go to a small row-major buffer that is scored directly and merged into the term-major matrix every `merge_threshold` additions. Replaced and removed notes are tombstoned and dropped by a compaction once they make up `compact_ratio` of the columns.
+- **Vectorized Top-k**: Computes every score with one sparse-dense product and selects the best `k` with `numpy.argpartition`, so there is no per-note Python loop in a query.
+
+Vectors must be L2-normalized, which the TF-IDF and hashing vectorizers of the categorizer do by default, so dot products are cosine similarities. All public methods are thread-safe.
+"""
+
+import threading
+import numpy as np
+from scipy.sparse import csr_matrix, hstack, vstack
+from sklearn.preprocessing import normalize
+
+class SimilarityIndex:
+    """
+    Exact top-k cosine similarity over sparse vectors.
+
+    Args:
+        n_features (int): The width of the vectors.
+        merge_threshold (int): The number of buffered vectors at which the buffer is merged into the term-major matrix.
+        compact_ratio (float): The share of tombstoned columns at which they are dropped.
+    """
+
+    def __init__(self, n_features, merge_threshold=4096, compact_ratio=0.25):
+        self.n_features = n_features
+        self.merge_threshold = merge_threshold
+        self.compact_ratio = compact_ratio
+        self._postings = csr_matrix((n_features, 0), dtype=np.float32)
+        self._pending = []
+        self._pending_count = 0
+        self._keys = []
+        self._columns = {}
+        # One byte per column, 1 while the note is live; a bytearray appends in constant time and views as a numpy array for free
+        self._alive = bytearray()
+        self._dead = 0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._columns)
+
+    def __contains__(self, key):
+        return key in self._columns
+
+    def add(self, key, vector):
+        self.add_many([key], vector)
+
+    def add_many(self, keys, vectors):
+        """Add or replace the vectors of `keys`, given as the rows of a sparse matrix in the same order."""
+        vectors = normalize(csr_matrix(vectors, dtype=np.float32))
+        if vectors.shape != (len(keys), self.n_features):
+            raise ValueError(f"Expected {len(keys)} vectors of width {self.n_features}, got a {vectors.shape[0]} x {vectors.shape[1]} matrix")
+        with self._lock:
+            for key in keys:
+                self._tombstone(key)
+                self._columns[key] = len(self._keys)
+                self._keys.append(key)
+                self._alive.append(1)
+            self._pending.append(vectors)
+            self._pending_count += vectors.shape[0]
+            if self._pending_count >= self.merge_threshold:
+                self._merge()
+
+    def remove(self, key):
+        with self._lock:
+            self._tombstone(key)
+            if self._dead > self.compact_ratio * len(self._keys):
+                self._compact()
+
+    def query(self, vector, k=10, exclude=None, min_score=0.0):
+        """
+        Return the `k` live keys most similar to `vector`, best first.
+
+        Args:
+            vector: A 1 x `n_features` sparse vector; it is normalized here.
+            exclude: A key to leave out, typically the note the query was built from.
+            min_score (float): Only keys scoring strictly above this are returned.
+
+        Returns:
+            list: (key, similarity) pairs.
+        """
+        vector = normalize(csr_matrix(vector, dtype=np.float32))
+        vector.sum_duplicates()
+        with self._lock:
+            total = len(self._keys)
+            if total == 0 or k <= 0:
+                return []
+            scores = np.zeros(total, dtype=np.float32)
+            merged = self._postings.shape[1]
+            if merged and vector.nnz:
+                scores[:merged] = self._postings[vector.indices].T @ vector.data
+            pending = self._pending_rows()
+            if pending is not None:
+                scores[merged:] = (pending @ vector.T).toarray().ravel()
+            scores[np.frombuffer(self._alive, dtype=np.uint8) == 0] = -1.0
+            if exclude is not None and exclude in self._columns:
+                scores[self._columns[exclude]] = -1.0
+            k = min(k, total)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind='stable')]
+            return [(self._keys[column], float(scores[column])) for column in top if scores[column] > min_score]
+
+    def _tombstone(self, key):
+        column = self._columns.pop(key, None)
+        if column is not None:
+            self._alive[column] = 0
+            self._dead += 1
+
+    def _pending_rows(self):
+        if not self._pending:
+            return None
+        if len(self._pending) > 1:
+            # Collapsed in place, so a query after a few additions only stacks those onto one matrix
+            self._pending = [vstack(self._pending, format='csr')]
+        return self._pending[0]
+
+    def _merge(self):
+        pending = self._pending_rows()
+        if pending is None:
+            return
+        self._postings = hstack([self._postings, pending.T], format='csr', dtype=np.float32)
+        self._pending = []
+        self._pending_count = 0
+
+    def _compact(self):
+        self._merge()
+        keep = np.flatnonzero(np.frombuffer(self._alive, dtype=np.uint8))
+        self._postings = self._postings.tocsc()[:, keep].tocsr()
+        self._keys = [self._keys[column] for column in keep]
+        self._columns = {key: column for column, key in enumerate(self._keys)}
+        self._alive = bytearray(b'\x01' * len(self._keys))
+        self._dead = 0
@@ -0,0 +1,58 @@
+"""
+This module records how long each phase of application startup takes, so boot time can be tracked as the service scales out.
+
+Key Responsibilities:
+- **Phase Timing**: Provides a `timed_phase` context manager and a `record_phase` function that store the duration of named phases such as `import`, `model_load`, `nlp_load` and `db_connect`.
+- **Startup Report**: Summarizes the recorded phases, their total and the process uptime in milliseconds. A phase timed inside another one (such as `db_client` within `db_connect`) is reported but left out of the total, which the enclosing phase already covers.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+_process_started = time.perf_counter()
+_phases = {}
+_nested = set()
+_open = threading.local()
+_lock = threading.Lock()
+
+def record_phase(name, seconds, nested=False):
+    with _lock:
+        _phases[name] = seconds
+        if nested:
+            _nested.add(name)
+        else:
+            _nested.discard(name)
+
+@contextmanager
+def timed_phase(name):
+    """Time the enclosed block and record it as the given startup phase."""
+    depth = getattr(_open, 'depth', 0)
+    _open.depth = depth + 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _open.depth = depth
+        record_phase(name, time.perf_counter() - started, nested=depth > 0)
+
+def startup_report():
+    """
+    Summarize the startup phases recorded so far.
+
+    Returns:
+        dict: The duration of every phase, the total of the outermost phases and the time since this module was imported, all in milliseconds.
+    """
+    with _lock:
+        phases = {name: round(seconds * 1000.0, 2) for name, seconds in _phases.items()}
+        nested = set(_nested)
+    return {
+        "phases_ms": phases,
+        "total_ms": round(sum(ms for name, ms in phases.items() if name not in nested), 2),
+        "uptime_ms": round((time.perf_counter() - _process_started) * 1000.0, 2)
+    }
+
+def format_startup_report():
+    report = startup_report()
+    phases = ' '.join(f"{name}={ms:.1f}ms" for name, ms in report["phases_ms"].items())
+    return f"Startup: {phases} total={report['total_ms']:.1f}ms"
@@ -0,0 +1,177 @@
+"""
+End-to-end benchmark of the notes API on the embedded `memory` storage backend, so no database server is needed.
+
+For each corpus size the script seeds a fresh store with synthetic notes, then measures throughput and p50/p95/p99 latency
+of create, get-by-id, list, search and update, both through the Flask test client (`http.*`) and by calling the service
+layer directly (`service.*`). The difference between the two is the cost of routing, parsing and serialization.
+It also measures `analyze_sentiment` and `suggest_category` on their own, on content they have not seen before.
+
+Results are written as JSON. With `--compare`, they are checked against an earlier run: the script exits with status 1
+when any operation's p95 latency grew, or its throughput dropped, by more than `--threshold`.
+
+Usage:
+    python benchmarks/bench_api.py --sizes 1000 100000 1000000 --requests 500 --output results.json
+    python benchmarks/bench_api.py --sizes 1000 --compare results.json --threshold 0.2
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+os.environ['STORAGE_BACKEND'] = 'memory'
+os.environ.setdefault('MODEL_FILE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app', 'ml', 'note_categorizer.pkl'))
+
+from corpus import load_vocabulary, generate_corpus, percentile
+from app import app
+from model.note import Note
+from repository.backends.memory import MemoryNoteStore
+from repository.note_repository import add_notes, set_store
+from service.note_service import create_note, note_by_id, list_notes_page, find_notes, modify_note
+from service.warmup_service import warmup
+from utils.categorisation import suggest_category
+from utils.sentiment_analysis import analyze_sentiment
+
+CATEGORIES = ['Work', 'Personal', 'Ideas', 'Shopping', 'Health']
+SEED_CHUNK_SIZE = 10000
+
+def measure(operation, arguments):
+    latencies = []
+    started = time.perf_counter()
+    for argument in arguments:
+        call_started = time.perf_counter()
+        operation(argument)
+        latencies.append((time.perf_counter() - call_started) * 1000.0)
+    elapsed = time.perf_counter() - started
+    return {
+        "count": len(latencies),
+        "throughput_ops": len(latencies) / elapsed if elapsed else 0.0,
+        "mean_ms": sum(latencies) / len(latencies),
+        "p50_ms": percentile(latencies, 0.50),
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99)
+    }
+
+def seed(size, vocabulary):
+    set_store(MemoryNoteStore())
+    rng = random.Random(size)
+    note_ids = []
+    chunk = []
+    for _, title, content in generate_corpus(size, vocabulary):
+        note = Note(title, content, rng.choice(CATEGORIES), round(rng.uniform(-1, 1), 3))
+        chunk.append(note)
+        if len(chunk) == SEED_CHUNK_SIZE:
+            note_ids.extend(add_notes(chunk, chunk_size=SEED_CHUNK_SIZE)[0])
+            chunk = []
+    if chunk:
+        note_ids.extend(add_notes(chunk, chunk_size=SEED_CHUNK_SIZE)[0])
+    return note_ids
+
+def _check(response):
+    if response.status_code >= 400:
+        raise RuntimeError(f"{response.request.method} {response.request.path} returned {response.status_code}")
+    return response
+
+def run(size, request_count, vocabulary):
+    started = time.perf_counter()
+    note_ids = seed(size, vocabulary)
+    print(f"\n{size:,} notes: seeded in {time.perf_counter() - started:.2f}s")
+
+    rng = random.Random(7)
+    common = vocabulary[:200]
+
+    def contents(prefix):
+        # Unique content on every call, so the sentiment and category caches never hide the real cost
+        return [f"{prefix} {i} " + ' '.join(rng.sample(common, 12)) for i in range(request_count)]
+
+    def sample_ids():
+        return [rng.choice(note_ids) for _ in range(request_count)]
+
+    keywords = [rng.choice(common) for _ in range(request_count)]
+    client = app.test_client()
+    operations = {
+        "http.create": (lambda content: _check(client.post('/notes', json={"title": "Benchmark", "content": content})),
+                        contents("http create")),
+        "http.get": (lambda note_id: _check(client.get(f'/notes/{note_id}')), sample_ids()),
+        "http.list": (lambda note_id: _check(client.get(f'/notes/all?limit=50&after={note_id}')), sample_ids()),
+        "http.search": (lambda keyword: _check(client.get(f'/notes/search?keyword={keyword}&limit=20')), keywords),
+        "http.update": (lambda item: _check(client.put(f'/notes/update/{item[0]}', json={
+                            "title": "Updated", "content": item[1], "category": "Work"})),
+                        list(zip(sample_ids(), contents("http update")))),
+        "service.create": (lambda content: create_note("Benchmark", content), contents("service create")),
+        "service.get": (note_by_id, sample_ids()),
+        "service.list": (lambda note_id: list_notes_page(50, after=note_id), sample_ids()),
+        "service.search": (lambda keyword: find_notes(keyword, limit=20), keywords),
+        "service.update": (lambda item: modify_note(item[0], "Updated", item[1], "Work"),
+                           list(zip(sample_ids(), contents("service update")))),
+        "component.analyze_sentiment": (analyze_sentiment, contents("sentiment")),
+        "component.suggest_category": (suggest_category, contents("category"))
+    }
+
+    results = {}
+    for name, (operation, arguments) in operations.items():
+        results[name] = measure(operation, arguments)
+        result = results[name]
+        print(f"  {name:28s} {result['throughput_ops']:10,.0f} ops/s  p50 {result['p50_ms']:8.3f} ms  "
+              f"p95 {result['p95_ms']:8.3f} ms  p99 {result['p99_ms']:8.3f} ms")
+    return results
+
+def find_regressions(results, baseline, threshold):
+    """
+    Compare two runs operation by operation.
+
+    Returns:
+        list: One message per operation whose p95 latency grew, or throughput dropped, by more than `threshold`.
+    """
+    regressions = []
+    for size, operations in results["results"].items():
+        for name, current in operations.items():
+            previous = baseline.get("results", {}).get(size, {}).get(name)
+            if previous is None:
+                continue
+            if previous["p95_ms"] and current["p95_ms"] > previous["p95_ms"] * (1 + threshold):
+                regressions.append(f"{size} {name}: p95 {previous['p95_ms']:.3f} ms -> {current['p95_ms']:.3f} ms")
+            if current["throughput_ops"] < previous["throughput_ops"] * (1 - threshold):
+                regressions.append(f"{size} {name}: throughput {previous['throughput_ops']:,.0f} -> "
+                                   f"{current['throughput_ops']:,.0f} ops/s")
+    return regressions
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 100000, 1000000])
+    parser.add_argument('--requests', type=int, default=500, help="calls per operation and corpus size")
+    parser.add_argument('--output', help="write the results to this JSON file")
+    parser.add_argument('--compare', help="a results file from an earlier run to check for regressions")
+    parser.add_argument('--threshold', type=float, default=0.1, help="tolerated relative slowdown (default 0.1)")
+    args = parser.parse_args()
+
+    warmup()
+    vocabulary = load_vocabulary()
+    results = {
+        "meta": {
+            "timestamp": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "requests": args.requests
+        },
+        "results": {str(size): run(size, args.requests, vocabulary) for size in args.sizes}
+    }
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(results, output, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            regressions = find_regressions(results, json.load(baseline_file), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"\nNo regressions above {args.threshold:.0%}")
@@ -0,0 +1,200 @@
+"""
+Load comparison of the synchronous server (Flask on Gunicorn, `app.py`) and the asyncio server (Quart on Hypercorn, `asgi.py`) at increasing connection counts.
+
+For each server the script starts it as a subprocess on its own port, seeds it with synthetic notes through
+`POST /notes/bulk`, then holds `--connections` keep-alive connections open at once, each sending requests back to back
+for `--duration` seconds. It reports throughput, p50/p95/p99 latency and errors per server and connection count.
+The load generator is a small asyncio HTTP/1.1 client, so one process can hold thousands of connections.
+
+Scenarios:
+- `read`: `GET /notes/<id>` of random seeded notes; dominated by storage I/O.
+- `write`: `POST /notes?wait=true`; sentiment analysis and categorization on every request.
+- `mixed`: 80% reads and 20% writes.
+
+The gap between the servers depends on how long requests wait on I/O. With the default embedded `memory` backend there
+is no network round trip, and both servers run a single worker so all requests see the same notes. Pass `--mongo-uri`
+to run against a MongoDB server, where the synchronous server's concurrency is capped at `--workers` x `--threads`
+requests in flight, while the asyncio server keeps every connection's request in flight.
+
+Usage:
+    python benchmarks/bench_concurrency.py --connections 16 64 256 1024 --duration 10
+    python benchmarks/bench_concurrency.py --mongo-uri mongodb://localhost:27017/ --workers 4 --scenario mixed --output load.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+import urllib.request
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.join(BENCHMARKS_DIR, '..', 'app')
+
+from corpus import load_vocabulary, generate_corpus, percentile
+
+SERVERS = {
+    "sync": ['gunicorn', '-c', 'gunicorn.conf.py', 'app:app'],
+    "async": ['hypercorn', '-c', 'file:hypercorn.conf.py', 'asgi:app']
+}
+SEED_CHUNK_SIZE = 500
+WRITE_SHARE = {"read": 0.0, "write": 1.0, "mixed": 0.2}
+
+def start_server(name, port, args):
+    env = dict(os.environ, PORT=str(port), WEB_WORKERS=str(args.workers), WEB_THREADS=str(args.threads),
+               MODEL_WATCH_INTERVAL_SECONDS='0', WARMUP_ON_BOOT='true')
+    if args.mongo_uri:
+        env.update(STORAGE_BACKEND='mongo', MONGO_URI=args.mongo_uri, MONGO_DB_NAME=args.mongo_db)
+    else:
+        env.update(STORAGE_BACKEND='memory')
+    env.setdefault('MODEL_FILE_PATH', os.path.join(APP_DIR, 'ml', 'note_categorizer.pkl'))
+    process = subprocess.Popen(SERVERS[name], cwd=APP_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"The {name} server exited with status {process.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/ready", timeout=5) as response:
+                if response.status == 200:
+                    return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"The {name} server did not become ready")
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+def seed(port, size):
+    vocabulary = load_vocabulary()
+    note_ids = []
+    notes = [{"title": title, "content": content} for _, title, content in generate_corpus(size, vocabulary)]
+    for start in range(0, len(notes), SEED_CHUNK_SIZE):
+        body = json.dumps({"notes": notes[start:start + SEED_CHUNK_SIZE]}).encode('utf-8')
+        request = urllib.request.Request(f"http://127.0.0.1:{port}/notes/bulk", data=body,
+                                         headers={"Content-Type": "application/json"}, method='POST')
+        with urllib.request.urlopen(request, timeout=120) as response:
+            note_ids.extend(result["inserted_id"] for result in json.load(response)["results"] if "inserted_id" in result)
+    return note_ids
+
+async def read_response(reader):
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split(' ', 2)[1])
+    headers = {name.strip().lower(): value.strip() for name, value in (line.split(':', 1) for line in lines[1:] if ':' in line)}
+    if 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
+    elif headers.get('transfer-encoding') == 'chunked':
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    return status, headers.get('connection', '').lower() != 'close'
+
+def build_request(note_ids, write_share, rng, vocabulary):
+    if rng.random() < write_share:
+        content = ' '.join(rng.choice(vocabulary) for _ in range(30))
+        body = json.dumps({"title": "Load test", "content": content}).encode('utf-8')
+        return (b"POST /notes?wait=true HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body)
+    return f"GET /notes/{rng.choice(note_ids)} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode('ascii')
+
+async def connection_loop(port, deadline, note_ids, write_share, vocabulary, timeout, seed_value, latencies, errors):
+    rng = random.Random(seed_value)
+    reader = writer = None
+    while time.monotonic() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.wait_for(asyncio.open_connection('127.0.0.1', port), timeout)
+            started = time.perf_counter()
+            writer.write(build_request(note_ids, write_share, rng, vocabulary))
+            status, keep_alive = await asyncio.wait_for(read_response(reader), timeout)
+            if status >= 400:
+                errors[f"http_{status}"] = errors.get(f"http_{status}", 0) + 1
+            else:
+                latencies.append(time.perf_counter() - started)
+            if not keep_alive:
+                writer.close()
+                writer = None
+        except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError) as e:
+            errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+            if writer is not None:
+                writer.close()
+            writer = None
+            await asyncio.sleep(0.05)
+    if writer is not None:
+        writer.close()
+
+async def run_load(port, connections, duration, note_ids, write_share, timeout):
+    vocabulary = load_vocabulary()
+    latencies, errors = [], {}
+    deadline = time.monotonic() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*(connection_loop(port, deadline, note_ids, write_share, vocabulary, timeout, number, latencies, errors)
+                           for number in range(connections)))
+    elapsed = time.perf_counter() - started
+    result = {"requests": len(latencies), "throughput": len(latencies) / elapsed, "errors": errors}
+    if latencies:
+        result.update({name: percentile(latencies, fraction) * 1000.0
+                       for name, fraction in (("p50_ms", 0.50), ("p95_ms", 0.95), ("p99_ms", 0.99))})
+    return result
+
+def raise_file_limit(connections):
+    # Every connection needs a descriptor on both ends
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = min(hard, max(soft, connections * 2 + 256))
+    if wanted > soft:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (wanted, hard))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--servers', nargs='+', choices=sorted(SERVERS), default=['sync', 'async'])
+    parser.add_argument('--connections', type=int, nargs='+', default=[16, 64, 256, 1024])
+    parser.add_argument('--duration', type=float, default=10.0, help="seconds of load per connection count")
+    parser.add_argument('--scenario', choices=sorted(WRITE_SHARE), default='read')
+    parser.add_argument('--notes', type=int, default=2000, help="notes seeded before the load starts")
+    parser.add_argument('--workers', type=int, default=1, help="server worker processes")
+    parser.add_argument('--threads', type=int, default=4, help="threads per worker of the synchronous server")
+    parser.add_argument('--timeout', type=float, default=30.0, help="seconds before a request counts as timed out")
+    parser.add_argument('--mongo-uri', help="benchmark against this MongoDB server instead of the memory backend")
+    parser.add_argument('--mongo-db', default='notes_db_benchmark', help="database used with --mongo-uri; it is not cleaned up")
+    parser.add_argument('--port', type=int, default=5090)
+    parser.add_argument('--output', help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    if not args.mongo_uri and args.workers != 1:
+        print("The memory backend is per process, so every server runs a single worker without --mongo-uri.")
+        args.workers = 1
+    raise_file_limit(max(args.connections))
+
+    results = {}
+    for offset, name in enumerate(args.servers):
+        port = args.port + offset
+        process = start_server(name, port, args)
+        try:
+            note_ids = seed(port, args.notes)
+            results[name] = {}
+            for connections in args.connections:
+                result = asyncio.run(run_load(port, connections, args.duration, note_ids, WRITE_SHARE[args.scenario], args.timeout))
+                results[name][connections] = result
+                latency = (f"p50 {result['p50_ms']:8.2f} ms  p95 {result['p95_ms']:8.2f} ms  p99 {result['p99_ms']:8.2f} ms"
+                           if result["requests"] else "no successful requests")
+                errors = sum(result["errors"].values())
+                print(f"{name:5s} {connections:5d} connections  {result['throughput']:9.1f} req/s  {latency}  errors {errors}")
+        finally:
+            stop_server(process)
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump({"scenario": args.scenario, "workers": args.workers, "threads": args.threads,
+                       "backend": "mongo" if args.mongo_uri else "memory", "results": results}, output, indent=2)
+        print(f"Results written to {args.output}")
@@ -0,0 +1,134 @@
+"""
+Measure per-worker memory and load time of the categorizer in the pickle format versus the compact, memory-mapped format.
+
+For each format the script starts `--workers` fresh processes, like web workers started without preloading. Each worker
+loads the model through `utils.categorisation.load_model`, runs one batch of predictions, and reports how much its
+memory grew and how long the load took. All workers of a format are measured while they are all alive, so the
+proportional set size (PSS), which splits shared pages between the processes mapping them, shows the effect of sharing.
+RSS counts shared pages in full in every process, so it overstates the memory of mapped models.
+
+The bundled model is tiny, so `--synthetic-docs` can train a TF-IDF + Naive Bayes model on a synthetic corpus of that
+many notes first, giving a vocabulary and coefficient arrays of production size.
+
+Usage:
+    python benchmarks/bench_model_memory.py --synthetic-docs 200000 --workers 4
+    python benchmarks/bench_model_memory.py --model app/ml/note_categorizer.pkl --output memory.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app')
+sys.path.insert(0, APP_DIR)
+
+from corpus import load_vocabulary, generate_corpus
+
+SAMPLE_NOTES = [
+    "Discuss project milestones and deadlines.",
+    "Family vacation planning.",
+    "Buy milk, eggs and bread.",
+    "Idea for a new budgeting app.",
+    "Schedule a dentist appointment."
+]
+
+def memory_usage():
+    """Return RSS, PSS and USS in bytes; PSS and USS need /proc/self/smaps_rollup (Linux) and are None elsewhere."""
+    usage = {"rss": None, "pss": None, "uss": None}
+    try:
+        with open('/proc/self/smaps_rollup') as rollup:
+            fields = {line.split(':')[0]: int(line.split()[1]) * 1024 for line in rollup if line.endswith('kB\n')}
+        usage["rss"] = fields.get('Rss')
+        usage["pss"] = fields.get('Pss')
+        usage["uss"] = fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)
+    except FileNotFoundError:
+        usage["rss"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return usage
+
+def worker(path, barrier, results):
+    sys.path.insert(0, APP_DIR)
+    # Import the libraries up front, so the measured growth is the model alone
+    import numpy  # noqa: F401
+    import sklearn.pipeline  # noqa: F401
+    from utils.categorisation import load_model
+
+    before = memory_usage()
+    started = time.perf_counter()
+    model = load_model(path)
+    load_ms = (time.perf_counter() - started) * 1000.0
+    model.predict(SAMPLE_NOTES)
+    barrier.wait()
+    after = memory_usage()
+    results.put({
+        "load_ms": load_ms,
+        **{f"{name}_growth": after[name] - before[name] for name in after if after[name] is not None and before[name] is not None},
+        **{f"{name}_total": after[name] for name in after if after[name] is not None}
+    })
+    barrier.wait()
+
+def measure(path, workers):
+    context = multiprocessing.get_context('spawn')
+    barrier = context.Barrier(workers)
+    results = context.Queue()
+    processes = [context.Process(target=worker, args=(path, barrier, results)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    samples = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return {name: sum(sample[name] for sample in samples) / len(samples) for name in samples[0]}
+
+def train_synthetic(size, path):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.naive_bayes import MultinomialNB
+    from sklearn.pipeline import make_pipeline
+    import joblib
+
+    rng = random.Random(1)
+    categories = ['Work', 'Personal', 'Ideas', 'Shopping', 'Health']
+    contents = [f"{title} {content}" for _, title, content in generate_corpus(size, load_vocabulary())]
+    labels = [rng.choice(categories) for _ in contents]
+    model = make_pipeline(TfidfVectorizer(), MultinomialNB()).fit(contents, labels)
+    joblib.dump(model, path)
+    print(f"Trained a synthetic model on {size:,} notes with {len(model[0].vocabulary_):,} terms")
+
+def megabytes(value):
+    return f"{value / (1024 * 1024):9.1f} MB" if value is not None else "      n/a"
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default=os.path.join(APP_DIR, 'ml', 'note_categorizer.pkl'))
+    parser.add_argument('--synthetic-docs', type=int, default=0, help="train a synthetic model of this many notes instead")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--output', help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    from ml.compact_model import export_compact
+    import joblib
+
+    with tempfile.TemporaryDirectory() as directory:
+        pickle_path = args.model
+        if args.synthetic_docs:
+            pickle_path = os.path.join(directory, 'synthetic.pkl')
+            train_synthetic(args.synthetic_docs, pickle_path)
+        compact_path = os.path.join(directory, 'model.mmap')
+        export_compact(joblib.load(pickle_path), compact_path)
+
+        results = {}
+        for name, path in (("pickle", pickle_path), ("mmap", compact_path)):
+            results[name] = measure(path, args.workers)
+            result = results[name]
+            print(f"{name:7s} load {result['load_ms']:8.1f} ms  RSS growth {megabytes(result.get('rss_growth'))}  "
+                  f"PSS growth {megabytes(result.get('pss_growth'))}  USS growth {megabytes(result.get('uss_growth'))}  "
+                  f"(per worker, {args.workers} workers)")
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump({"workers": args.workers, "results": results}, output, indent=2)
+        print(f"Results written to {args.output}")
@@ -0,0 +1,76 @@
+"""
+Benchmark of the in-process BM25 search index at increasing corpus sizes.
+
+A synthetic corpus is generated from the vocabulary of `app/data/notes.csv` with a Zipf-like word distribution.
+For each corpus size the script reports the index build time, and the query latency percentiles for single-term,
+multi-term and prefix queries. With `--baseline`, it also times a linear scan over the same corpus for comparison.
+
+Usage:
+    python benchmarks/bench_search_index.py --sizes 10000 100000 1000000 --queries 200
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from corpus import load_vocabulary, generate_corpus, percentile
+from utils.search_index import InvertedIndex, tokenize
+
+def time_queries(search, queries):
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        search(query)
+        latencies.append((time.perf_counter() - started) * 1000.0)
+    return {
+        "p50_ms": percentile(latencies, 0.50),
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99)
+    }
+
+def linear_scan(corpus, query, k=10):
+    terms = set(tokenize(query))
+    matches = [(doc_id, sum(1 for term in tokenize(title + ' ' + content) if term in terms))
+               for doc_id, title, content in corpus]
+    return sorted((match for match in matches if match[1]), key=lambda match: -match[1])[:k]
+
+def run(size, query_count, baseline):
+    vocabulary = load_vocabulary()
+    index = InvertedIndex()
+    corpus = list(generate_corpus(size, vocabulary)) if baseline else None
+
+    started = time.perf_counter()
+    for doc_id, title, content in (corpus or generate_corpus(size, vocabulary)):
+        index.add(doc_id, title, content)
+    build_seconds = time.perf_counter() - started
+
+    rng = random.Random(7)
+    common = vocabulary[:200]
+    single = [rng.choice(common) for _ in range(query_count)]
+    multi = [' '.join(rng.sample(common, 3)) for _ in range(query_count)]
+    prefix = [rng.choice(common)[:3] for _ in range(query_count)]
+
+    print(f"\n{size:,} notes: build {build_seconds:.2f}s ({size / build_seconds:,.0f} notes/s)")
+    results = {
+        "single-term": time_queries(lambda q: index.search(q, k=10), single),
+        "multi-term": time_queries(lambda q: index.search(q, k=10), multi),
+        "prefix": time_queries(lambda q: index.search(q, k=10, prefix=True), prefix)
+    }
+    if baseline:
+        scan_queries = multi[:max(1, query_count // 20)]
+        results["linear-scan"] = time_queries(lambda q: linear_scan(corpus, q), scan_queries)
+    for name, latency in results.items():
+        print(f"  {name:12s} p50 {latency['p50_ms']:8.2f} ms  p95 {latency['p95_ms']:8.2f} ms  p99 {latency['p99_ms']:8.2f} ms")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--baseline', action='store_true', help="also time a linear scan over the corpus")
+    args = parser.parse_args()
+    for size in args.sizes:
+        run(size, args.queries, args.baseline)
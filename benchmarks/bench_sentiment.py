@@ -0,0 +1,111 @@
+"""
+Benchmark of the `lexicon` sentiment engine against the `textblob` engine, in agreement and in throughput.
+
+The script scores the notes of `app/data/notes.csv` and `--notes` synthetic notes built from TextBlob's sentiment lexicon,
+with modifiers ("very"), negations ("not"), contractions, punctuation (ellipses, runs of "?!", quotes, abbreviations),
+exclamation marks and, in `--emoticon-percent` of the notes, an emoticon. It reports:
+- `agreement`: the mean and largest absolute difference between the two polarities, the share of notes within
+  `POLARITY_TOLERANCE`, and the share with the same sign, separately for notes with and without emoticons.
+- `throughput`: notes per second for `TextBlob(content).sentiment.polarity` per note, for the lexicon engine per note,
+  and for the lexicon engine scoring all notes in one `polarity_batch` call. No result cache is involved.
+
+Usage:
+    python benchmarks/bench_sentiment.py --notes 20000
+"""
+
+import argparse
+import csv
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from corpus import DATASET_PATH, load_vocabulary
+from utils.lexicon_sentiment import LexiconSentiment, POLARITY_TOLERANCE, read_lexicon, textblob_lexicon_path
+
+MODIFIERS = ['very', 'really', 'extremely', 'quite', 'so', 'too', 'incredibly']
+NEGATIONS = ['not', 'no', 'never', "don't", "isn't"]
+EMOTICONS = [':)', ':(', ':D', ';)', ':/']
+# Trailing punctuation; no parentheses or hyphens, which could form an emoticon with a neighbour
+PUNCTUATION = [',', '.', '!', '!!', '?', '...', '....', '?!', ';', ':', '..']
+ABBREVIATIONS = ['e.g.', 'etc.', 'Mr.', 'U.S.']
+
+def dataset_notes(path=DATASET_PATH):
+    with open(path, newline='', encoding='utf-8-sig') as dataset:
+        return [row['content'] for row in csv.DictReader(dataset)]
+
+def synthetic_notes(size, emoticon_percent, seed=7):
+    """Return (content, has_emoticon) pairs mixing lexicon words with filler words."""
+    rng = random.Random(seed)
+    lexicon = sorted(word for word in read_lexicon(textblob_lexicon_path()) if word.isalpha())
+    filler = load_vocabulary()[:2000] + ['the', 'a', 'is', 'it', 'we', 'to', 'and', 'of', 'this', 'meeting', 'was']
+    notes = []
+    for _ in range(size):
+        words = []
+        for _ in range(rng.randint(5, 30)):
+            roll = rng.random()
+            if roll < 0.55:
+                words.append(rng.choice(filler))
+            elif roll < 0.75:
+                words.append(rng.choice(lexicon))
+            elif roll < 0.85:
+                words.append(rng.choice(MODIFIERS))
+            elif roll < 0.92:
+                words.append(rng.choice(NEGATIONS))
+            elif roll < 0.94:
+                words.append(rng.choice(ABBREVIATIONS))
+            elif roll < 0.96 and words:
+                words[-1] = f'"{words[-1]}"'
+            else:
+                words[-1:] = [(words[-1] if words else '') + rng.choice(PUNCTUATION)]
+        has_emoticon = rng.random() * 100 < emoticon_percent
+        if has_emoticon:
+            words.append(rng.choice(EMOTICONS))
+        notes.append((' '.join(words).capitalize(), has_emoticon))
+    return notes
+
+def textblob_polarities(contents):
+    from textblob import TextBlob
+    return [TextBlob(content).sentiment.polarity for content in contents]
+
+def agreement(reference, scored):
+    differences = [abs(a - b) for a, b in zip(reference, scored)]
+    same_sign = sum((a > 0) == (b > 0) and (a < 0) == (b < 0) for a, b in zip(reference, scored))
+    return {
+        "notes": len(differences),
+        "mean_abs": sum(differences) / max(len(differences), 1),
+        "max_abs": max(differences, default=0.0),
+        "within": sum(difference <= POLARITY_TOLERANCE for difference in differences) / max(len(differences), 1),
+        "same_sign": same_sign / max(len(differences), 1)
+    }
+
+def throughput(function, contents):
+    started = time.perf_counter()
+    function(contents)
+    return len(contents) / (time.perf_counter() - started)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--notes', type=int, default=20000)
+    parser.add_argument('--emoticon-percent', type=float, default=5.0)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    engine = LexiconSentiment()
+    print(f"Compiled {len(engine):,} lexicon words in {(time.perf_counter() - started) * 1000.0:.1f} ms")
+
+    notes = [(content, False) for content in dataset_notes()] + synthetic_notes(args.notes, args.emoticon_percent)
+    contents = [content for content, _ in notes]
+    reference = textblob_polarities(contents)
+    scored = engine.polarity_batch(contents)
+    for name, selected in (("without emoticons", False), ("with emoticons", True)):
+        pairs = [(a, b) for (a, b), (_, has_emoticon) in zip(zip(reference, scored), notes) if has_emoticon == selected]
+        result = agreement([a for a, _ in pairs], [b for _, b in pairs])
+        print(f"agreement {name:18s} notes {result['notes']:7,}  mean |diff| {result['mean_abs']:.5f}  max |diff| {result['max_abs']:.4f}  "
+              f"within {POLARITY_TOLERANCE} {result['within'] * 100:6.2f}%  same sign {result['same_sign'] * 100:6.2f}%")
+
+    print(f"throughput textblob.per_note  {throughput(textblob_polarities, contents):12,.0f} notes/s")
+    print(f"throughput lexicon.per_note   {throughput(lambda batch: [engine.polarity(content) for content in batch], contents):12,.0f} notes/s")
+    print(f"throughput lexicon.batch      {throughput(engine.polarity_batch, contents):12,.0f} notes/s")
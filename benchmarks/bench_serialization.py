@@ -0,0 +1,117 @@
+"""
+Benchmark of list-endpoint serialization: the previous path, which copied every note to turn its `_id` into a string and
+then encoded it with Flask's default JSON provider, against `FastJSONProvider`, which encodes the documents as they are.
+
+The script seeds the embedded `memory` storage backend with `--notes` synthetic notes and reports the median and p95 of:
+- `encode.*`: building the response for the full list, without routing, for both paths.
+- `http.fast`: `GET /notes/all` end to end through the Flask test client. The controller no longer converts IDs, so the
+  previous path is only measured at the encoding step; both bodies are checked to be the same size.
+
+It also compares building `--notes` `Note` objects and their documents with the slotted `Note` against an equivalent
+class that keeps a per-instance `__dict__`, in time and in memory allocated.
+
+Usage:
+    python benchmarks/bench_serialization.py --notes 10000 --repeat 20
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+os.environ['STORAGE_BACKEND'] = 'memory'
+os.environ.setdefault('MODEL_FILE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app', 'ml', 'note_categorizer.pkl'))
+
+from flask.json.provider import DefaultJSONProvider
+from corpus import load_vocabulary, generate_corpus, percentile
+from app import app
+from model.note import Note
+from repository.backends.memory import MemoryNoteStore
+from repository.note_repository import add_notes, get_all_notes, set_store
+from utils.cache import content_hash
+from utils.json_provider import FastJSONProvider
+
+CATEGORIES = ['Work', 'Personal', 'Ideas', 'Shopping', 'Health']
+
+class DictNote:
+    """The note model as it was before it was slotted, for comparison."""
+
+    def __init__(self, title, content, category, sentiment=None, model_version=None):
+        self.title = title
+        self.content = content
+        self.category = category
+        self.sentiment = sentiment
+        self.content_hash = content_hash(content)
+        self.version = 1
+        self.model_version = model_version
+
+def seed(size):
+    corpus = list(generate_corpus(size, load_vocabulary()))
+    set_store(MemoryNoteStore())
+    add_notes([Note(title, content, CATEGORIES[number % len(CATEGORIES)], 0.1) for number, title, content in corpus])
+    return corpus
+
+def legacy_response(notes):
+    for note in notes:
+        note['_id'] = str(note['_id'])
+    return app.json.response(notes)
+
+def measure(function, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - started)
+    return {"p50_ms": percentile(samples, 0.50) * 1000.0, "p95_ms": percentile(samples, 0.95) * 1000.0}
+
+def measure_model(note_class, corpus):
+    # Warm up, so the first class measured does not pay for one-time allocations
+    [note_class(title, content, 'Work', 0.1) for _, title, content in corpus]
+    tracemalloc.start()
+    started = time.perf_counter()
+    notes = [note_class(title, content, 'Work', 0.1) for _, title, content in corpus]
+    elapsed = time.perf_counter() - started
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    to_document = (lambda note: note.to_bson()) if note_class is Note else (lambda note: dict(note.__dict__))
+    started = time.perf_counter()
+    for note in notes:
+        to_document(note)
+    return {"build_ms": elapsed * 1000.0, "document_ms": (time.perf_counter() - started) * 1000.0, "allocated_bytes": allocated}
+
+def report(name, result):
+    print(f"{name:22s} p50 {result['p50_ms']:9.2f} ms  p95 {result['p95_ms']:9.2f} ms")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--notes', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    corpus = seed(args.notes)
+    client = app.test_client()
+    fast_provider = FastJSONProvider(app)
+    default_provider = DefaultJSONProvider(app)
+    print(f"Serializing {args.notes:,} notes, {args.repeat} runs each")
+
+    with app.app_context():
+        app.json = default_provider
+        report("encode.legacy", measure(lambda: legacy_response(get_all_notes()), args.repeat))
+        app.json = fast_provider
+        report("encode.fast", measure(lambda: app.json.response(get_all_notes()), args.repeat))
+        report("fetch.only", measure(get_all_notes, args.repeat))
+
+    app.json = default_provider
+    with app.app_context():
+        legacy_body = legacy_response(get_all_notes()).get_data()
+    app.json = fast_provider
+    fast_body = client.get('/notes/all').get_data()
+    report("http.fast", measure(lambda: client.get('/notes/all'), args.repeat))
+    print(f"Response size: legacy {len(legacy_body):,} bytes, fast {len(fast_body):,} bytes")
+
+    for name, note_class in (("Note (slotted)", Note), ("Note (__dict__)", DictNote)):
+        result = measure_model(note_class, corpus)
+        print(f"{name:22s} build {result['build_ms']:8.2f} ms  to document {result['document_ms']:8.2f} ms  "
+              f"allocated {result['allocated_bytes'] / (1024 * 1024):7.2f} MB")
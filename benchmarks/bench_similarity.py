@@ -0,0 +1,99 @@
+"""
+Benchmark of the similar-notes index (`utils/similarity_index.py`) against the straightforward exact search, which multiplies
+the query with the full row-major matrix of note vectors.
+
+The script vectorizes `--notes` synthetic notes and reports:
+- `build`: adding every vector to a new index in batches, as `similarity_service` does on first use.
+- `query.index` / `query.bruteforce`: the median and p95 latency of a top-`--k` query with a random stored note, for the index
+  and for `matrix @ query.T` followed by the same top-k selection. Both must return the same notes.
+- `add`: the latency of adding one note, including the merges of the buffer into the term-major matrix.
+- `remove`: the latency of removing one note, including compactions.
+
+By default notes are vectorized with the shipped categorizer's vectorizer, whose vocabulary is that of the training set.
+`--vectorizer fitted` fits a TF-IDF vectorizer on the corpus instead, as a categorizer retrained on real notes would have,
+which gives much larger vocabularies and sparser vectors.
+
+Usage:
+    python benchmarks/bench_similarity.py --notes 100000 300000 --queries 200
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import numpy as np
+from scipy.sparse import csr_matrix
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+os.environ.setdefault('MODEL_FILE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app', 'ml', 'note_categorizer.pkl'))
+os.environ.setdefault('MODEL_WATCH_INTERVAL_SECONDS', '0')
+
+from corpus import load_vocabulary, generate_corpus, percentile
+from utils.categorisation import vectorize
+from utils.similarity_index import SimilarityIndex
+
+BUILD_BATCH_SIZE = 2000
+
+def bruteforce(matrix, vector, k):
+    scores = (matrix @ vector.T).toarray().ravel()
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top], kind='stable')]
+
+def measure(function, arguments):
+    samples = []
+    for argument in arguments:
+        started = time.perf_counter()
+        function(argument)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+def report(name, samples):
+    print(f"  {name:18s} p50 {percentile(samples, 0.50) * 1000.0:9.3f} ms  p95 {percentile(samples, 0.95) * 1000.0:9.3f} ms")
+
+def run(size, args, texts_by_size):
+    texts = texts_by_size[size]
+    if args.vectorizer == 'fitted':
+        matrix = TfidfVectorizer().fit_transform(texts).astype(np.float32)
+    else:
+        matrix, _ = vectorize(texts)
+        matrix = csr_matrix(matrix, dtype=np.float32)
+    print(f"{size:,} notes, {matrix.shape[1]:,} features, {matrix.nnz / size:.1f} terms per note")
+
+    index = SimilarityIndex(matrix.shape[1])
+    started = time.perf_counter()
+    for start in range(0, size, BUILD_BATCH_SIZE):
+        index.add_many(list(range(start, min(start + BUILD_BATCH_SIZE, size))), matrix[start:start + BUILD_BATCH_SIZE])
+    print(f"  {'build':18s} {time.perf_counter() - started:9.2f} s")
+
+    rng = random.Random(0)
+    queries = [rng.randrange(size) for _ in range(args.queries)]
+    for row in queries[:20]:
+        expected = [int(column) for column in bruteforce(matrix, matrix[row], args.k)]
+        found = [key for key, _ in index.query(matrix[row], args.k)]
+        # Ties may be ordered differently, so only the scores of both results are compared
+        expected_scores = sorted((matrix[expected] @ matrix[row].T).toarray().ravel(), reverse=True)[:len(found)]
+        found_scores = [score for _, score in index.query(matrix[row], args.k)]
+        assert np.allclose(expected_scores, found_scores, atol=1e-4), "the index and the exact search disagree"
+    report("query.index", measure(lambda row: index.query(matrix[row], args.k, exclude=row), queries))
+    report("query.bruteforce", measure(lambda row: bruteforce(matrix, matrix[row], args.k), queries))
+
+    # New notes reuse stored vectors under fresh keys; enough of them to go through at least one merge
+    additions = [(size + number, rng.randrange(size)) for number in range(max(args.queries, index.merge_threshold))]
+    report("add", measure(lambda entry: index.add(entry[0], matrix[entry[1]]), additions))
+    removals = rng.sample(range(size), min(size, args.queries))
+    report("remove", measure(index.remove, removals))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--notes', type=int, nargs='+', default=[100000])
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--vectorizer', choices=['model', 'fitted'], default='model')
+    args = parser.parse_args()
+
+    vocabulary = load_vocabulary()
+    texts_by_size = {size: [f"{title}\n{content}" for _, title, content in generate_corpus(size, vocabulary)] for size in args.notes}
+    for size in args.notes:
+        run(size, args, texts_by_size)
@@ -0,0 +1,36 @@
+"""
+Synthetic note corpora and latency statistics shared by the benchmarks.
+
+The vocabulary comes from `app/data/notes.csv`, padded with pseudo-words, and word frequencies follow a Zipf-like distribution,
+so large corpora have a realistic mix of common and rare terms.
+"""
+
+import csv
+import os
+import random
+import re
+
+DATASET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app', 'data', 'notes.csv')
+
+def load_vocabulary(path=DATASET_PATH):
+    with open(path, newline='', encoding='utf-8-sig') as dataset:
+        words = {word for row in csv.DictReader(dataset) for word in re.findall(r"[a-z]+", row['content'].lower())}
+    # Pad the small training vocabulary with pseudo-words so large corpora have a realistic vocabulary size
+    rng = random.Random(0)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    synthetic = {''.join(rng.choices(letters, k=rng.randint(4, 9))) for _ in range(20000)}
+    return sorted(words) + sorted(synthetic - words)
+
+def generate_corpus(size, vocabulary, seed=42):
+    rng = random.Random(seed)
+    cumulative, total = [], 0.0
+    for rank in range(len(vocabulary)):
+        total += 1.0 / (rank + 1)
+        cumulative.append(total)
+    for doc_id in range(size):
+        words = rng.choices(vocabulary, cum_weights=cumulative, k=rng.randint(8, 40))
+        yield doc_id, ' '.join(words[:4]), ' '.join(words[4:])
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.pipeline import make_pipeline
+from ml.compact_model import export_compact, load_compact, is_compact_model
+
+CONTENTS = ["Discuss project milestones and deadlines", "Family vacation planning", "Buy milk and eggs",
+            "Quarterly budget review meeting", "Weekend trip with the family", "Groceries: bread, milk"]
+CATEGORIES = ["Work", "Personal", "Shopping", "Work", "Personal", "Shopping"]
+QUERIES = ["project deadlines", "milk", "", "entirely unknown words", "family budget trip"]
+
+
+@pytest.mark.parametrize("vectorizer", [
+    TfidfVectorizer(),
+    TfidfVectorizer(sublinear_tf=True, ngram_range=(1, 2)),
+    HashingVectorizer(n_features=2 ** 12, alternate_sign=False)
+])
+def test_compact_model_matches_pipeline(tmp_path, vectorizer):
+    model = make_pipeline(vectorizer, MultinomialNB()).fit(CONTENTS, CATEGORIES)
+    path = str(tmp_path / 'model.mmap')
+    export_compact(model, path)
+    assert is_compact_model(path)
+
+    compact = load_compact(path)
+    assert isinstance(compact.feature_log_prob, np.memmap)
+    assert list(compact.classes_) == list(model.classes_)
+    assert list(compact.predict(QUERIES)) == list(model.predict(QUERIES))
+    assert np.allclose(compact.predict_proba(QUERIES), model.predict_proba(QUERIES))
+
+def test_export_rejects_unsupported_pipelines(tmp_path):
+    model = make_pipeline(TfidfVectorizer(), LogisticRegression()).fit(CONTENTS, CATEGORIES)
+    with pytest.raises(ValueError):
+        export_compact(model, str(tmp_path / 'model.mmap'))
@@ -0,0 +1,24 @@
+import joblib
+import pytest
+from ml.model_registry import register_model, activate_model, active_version, get_metadata, list_models, model_path
+
+
+def test_register_and_activate_model(tmp_path):
+    registry_dir = str(tmp_path / 'registry')
+    artifact = tmp_path / 'model.pkl'
+    joblib.dump({'weights': [1, 2, 3]}, artifact)
+
+    metadata = register_model(str(artifact), accuracy=0.9, training_size=100, registry_dir=registry_dir)
+    assert len(metadata['version']) == 12
+    assert active_version(registry_dir) is None
+    assert joblib.load(model_path(metadata['version'], registry_dir)) == {'weights': [1, 2, 3]}
+
+    activate_model(metadata['version'], registry_dir)
+    assert active_version(registry_dir) == metadata['version']
+    assert get_metadata(metadata['version'], registry_dir)['accuracy'] == 0.9
+    assert [entry['version'] for entry in list_models(registry_dir)] == [metadata['version']]
+
+def test_activate_unknown_version_fails(tmp_path):
+    with pytest.raises(ValueError):
+        activate_model('missing', str(tmp_path))
+    assert list_models(str(tmp_path / 'none')) == []
@@ -0,0 +1,35 @@
+import os
+import joblib
+from ml.train_incremental import train_incremental, is_holdout
+
+DATASET_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'app', 'data', 'notes.csv')
+
+
+def test_holdout_split_is_stable():
+    assert is_holdout("Discuss project milestones.", 10) == is_holdout("Discuss project milestones.", 10)
+    assert not is_holdout("anything", 0)
+    assert is_holdout("anything", 100)
+
+def test_train_incremental_saves_loadable_model(tmp_path):
+    output_path = str(tmp_path / 'model.pkl')
+    checkpoint_path = str(tmp_path / 'model.ckpt')
+    accuracy = train_incremental(csv_path=DATASET_PATH, output_path=output_path, checkpoint_path=checkpoint_path,
+                                 batch_size=10, holdout_percent=20, checkpoint_every=1)
+    assert accuracy is not None
+    model = joblib.load(output_path)
+    assert len(model.predict(["Family vacation planning."])) == 1
+
+    checkpoint = joblib.load(checkpoint_path)
+    assert checkpoint["batches"] > 1
+    assert checkpoint["holdout"]
+
+def test_train_incremental_resumes_from_checkpoint(tmp_path):
+    checkpoint_path = str(tmp_path / 'model.ckpt')
+    options = dict(csv_path=DATASET_PATH, output_path=str(tmp_path / 'model.pkl'), checkpoint_path=checkpoint_path,
+                   batch_size=10, checkpoint_every=1)
+    train_incremental(**options)
+    rows = joblib.load(checkpoint_path)["rows"]
+
+    # Everything was consumed already, so resuming reads nothing new
+    train_incremental(resume=True, **options)
+    assert joblib.load(checkpoint_path)["rows"] == rows
@@ -0,0 +1,44 @@
+import pytest
+from bson import ObjectId
+from model.note import Note
+from utils.cache import content_hash
+
+
+def test_note_is_slotted():
+    note = Note("Title", "Content", "Work")
+    assert not hasattr(note, '__dict__')
+    with pytest.raises(AttributeError):
+        note.unknown = 1
+
+def test_note_rejects_wrong_types():
+    with pytest.raises(ValueError):
+        Note("Title", 42, "Work")
+    with pytest.raises(ValueError):
+        Note("Title", "Content", ["Work"])
+    with pytest.raises(ValueError):
+        Note("Title", "Content", "Work", sentiment="positive")
+
+def test_to_bson_omits_unset_optional_fields():
+    document = Note("Title", "Content", "Work", 0.5, model_version="abc123").to_bson()
+    assert document == {
+        "title": "Title",
+        "content": "Content",
+        "category": "Work",
+        "sentiment": 0.5,
+        "content_hash": content_hash("Content"),
+        "version": 1,
+        "model_version": "abc123"
+    }
+
+def test_bson_round_trip():
+    note = Note("Title", "Content", None)
+    note.id = ObjectId()
+    note.enrichment_status = 'pending'
+    restored = Note.from_bson(note.to_bson())
+    assert restored.to_bson() == note.to_bson()
+
+def test_from_bson_defaults_legacy_documents():
+    note = Note.from_bson({"_id": ObjectId(), "title": "Old", "content": "Written before versioning", "category": "Work"})
+    assert note.version == 0
+    assert note.model_version is None
+    assert note.content_hash == content_hash("Written before versioning")
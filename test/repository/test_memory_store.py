@@ -0,0 +1,122 @@
+import pytest
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+from repository.backends.memory import MemoryNoteStore
+
+
+@pytest.fixture
+def store():
+    return MemoryNoteStore()
+
+def _note(title, content, category="Work", sentiment=0.0):
+    return {"title": title, "content": content, "category": category, "sentiment": sentiment, "content_hash": content}
+
+def test_insert_one_assigns_id_and_rejects_duplicates(store):
+    document = _note("Title", "Content")
+    result = store.insert_one(document)
+    assert isinstance(result.inserted_id, ObjectId)
+    assert document['_id'] == result.inserted_id
+    with pytest.raises(DuplicateKeyError):
+        store.insert_one(document)
+
+def test_insert_many_reports_failed_positions(store):
+    existing = store.insert_one(_note("A", "a")).inserted_id
+    errors = store.insert_many([_note("B", "b"), dict(_note("C", "c"), _id=existing), _note("D", "d")])
+    assert list(errors) == [1]
+    assert len(store) == 3
+
+def test_find_page_is_keyset_paginated_in_id_order(store):
+    ids = [store.insert_one(_note(f"T{i}", f"c{i}")).inserted_id for i in range(5)]
+    first = store.find_page(limit=2, fields=['title'])
+    assert [note['_id'] for note in first] == ids[:2]
+    assert set(first[0]) == {'_id', 'title'}
+    rest = store.find_page(after=first[-1]['_id'])
+    assert [note['_id'] for note in rest] == ids[2:]
+    assert [note['_id'] for note in store.iter_documents(batch_size=2)] == ids
+
+def test_update_one_checks_content_hash_and_increments_version(store):
+    note_id = store.insert_one(dict(_note("Title", "old"), version=1)).inserted_id
+    assert store.update_one(note_id, {"sentiment": 0.5}, expected_content_hash="other").matched_count == 0
+    assert store.update_one(note_id, {"sentiment": 0.5}, expected_content_hash="old").matched_count == 1
+    note = store.find_one(note_id)
+    assert note['sentiment'] == 0.5
+    assert note['version'] == 2
+    assert store.update_one(ObjectId(), {"sentiment": 0.1}).matched_count == 0
+
+def test_returned_documents_do_not_share_state(store):
+    note_id = store.insert_one(_note("Title", "Content")).inserted_id
+    store.find_one(note_id)['title'] = "Changed"
+    assert store.find_one(note_id)['title'] == "Title"
+
+def test_search_ranks_filters_and_reindexes(store):
+    first = store.insert_one(_note("Budget", "quarterly budget review", sentiment=0.4)).inserted_id
+    second = store.insert_one(_note("Trip", "budget for the trip", category="Personal", sentiment=-0.2)).inserted_id
+    assert [note['_id'] for note in store.search("budget")] == [first, second]
+    assert [note['_id'] for note in store.search("budget", filters={"category": "Personal"})] == [second]
+    assert [note['_id'] for note in store.search("budget", filters={"min_sentiment": 0})] == [first]
+    assert [note['_id'] for note in store.search("budget", limit=1, offset=1)] == [second]
+    snippet = store.search("trip", snippet_length=6)[0]
+    assert snippet['snippet'] == "budget"
+    assert 'content' not in snippet and snippet['score'] > 0
+
+    store.update_one(second, {"content": "nothing here"})
+    assert [note['_id'] for note in store.search("budget")] == [first]
+    assert store.delete_one(first).deleted_count == 1
+    assert store.delete_one(first).deleted_count == 0
+    assert store.search("budget") == []
+
+def test_find_one_and_update_returns_previous_document(store):
+    note_id = store.insert_one(_note("A", "a", category="Work", sentiment=0.5)).inserted_id
+    previous = store.find_one_and_update(note_id, {"category": "Home"}, fields=['category', 'sentiment'])
+    assert previous == {"_id": note_id, "category": "Work", "sentiment": 0.5}
+    assert store.find_one(note_id)['category'] == "Home"
+    assert store.find_one_and_update(ObjectId(), {"category": "Home"}) is None
+    assert store.find_one_and_delete(note_id, fields=['category']) == {"_id": note_id, "category": "Home"}
+    assert store.find_one(note_id) is None
+
+def test_rebuild_stats_matches_increments(store):
+    store.insert_many([_note("A", "a", "Work", 0.5), _note("B", "b", "Work", None), _note("C", "c", "Home", -1.0)])
+    store.increment_stats({("category", "Work"): {"count": 7, "sentiment_sum": 0.0, "sentiment_count": 0}})
+    assert store.rebuild_stats() == 3
+    buckets = {(bucket["kind"], bucket["key"]): bucket for bucket in store.find_stats()}
+    assert buckets[("category", "Work")]["count"] == 2
+    assert buckets[("category", "Work")]["sentiment_count"] == 1
+    assert [bucket["count"] for key, bucket in buckets.items() if key[0] == "day"] == [3]
+    assert [bucket["kind"] for bucket in store.find_stats(since="9999-01-01")] == ["category", "category"]
+
+def test_find_changes_follows_sequence_order(store):
+    first = store.insert_one(dict(_note("A", "a"), seq=store.next_sequence())).inserted_id
+    second = store.insert_one(dict(_note("B", "b"), seq=store.next_sequence())).inserted_id
+    store.find_one_and_update(first, {"title": "A2", "seq": store.next_sequence()})
+    store.find_one_and_delete(second)
+    store.insert_tombstone({"_id": second, "seq": store.next_sequence(), "deleted_at": None})
+
+    changes = store.find_changes(0, 10, fields=['title'])
+    assert [(change['_id'], change['seq']) for change in changes] == [(first, 3), (second, 4)]
+    assert changes[0] == {"_id": first, "title": "A2", "seq": 3}
+    assert changes[1]['deleted'] is True
+    assert store.find_changes(3, 10) == [changes[1]]
+    assert store.find_changes(0, 1, fields=["title"]) == [changes[0]]
+
+def test_bulk_update_skips_notes_failing_their_guard(store):
+    first = store.insert_one(dict(_note("A", "a"), seq=1)).inserted_id
+    second = store.insert_one(dict(_note("B", "b"), seq=2)).inserted_id
+    updated = store.bulk_update([(first, {"seq": 1}, {"category": "Ideas", "seq": 3}),
+                                 (second, {"seq": 1}, {"category": "Ideas", "seq": 4})])
+    assert updated == [first]
+    assert store.find_one(first)['version'] == 1
+    assert store.find_one(second)['category'] == 'Work'
+    assert [change['_id'] for change in store.find_changes(0, 10)] == [second, first]
+
+def test_find_sorted_filters_sorts_and_continues_after_a_keyset_position(store):
+    ids = [store.insert_one(_note(f"T{i}", f"c{i}", category=category, sentiment=sentiment)).inserted_id
+           for i, (category, sentiment) in enumerate([("Work", 0.5), ("Work", -0.2), ("Personal", 0.1), ("Work", 0.5), ("Work", None)])]
+    assert [note['_id'] for note in store.find_sorted({"category": "Work"}, descending=True, limit=2)] == [ids[4], ids[3]]
+    assert [note['_id'] for note in store.find_sorted({"category": "Work"}, descending=True, after=ids[3])] == [ids[1], ids[0]]
+    # Ties on sentiment are broken by `_id`, and notes without a sentiment are not listed
+    by_sentiment = store.find_sorted({"category": "Work"}, sort='sentiment', descending=True, limit=2, fields=['title'])
+    assert [note['_id'] for note in by_sentiment] == [ids[3], ids[0]]
+    assert set(by_sentiment[0]) == {'_id', 'title', 'sentiment'}
+    after = (by_sentiment[-1]['sentiment'], by_sentiment[-1]['_id'])
+    assert [note['_id'] for note in store.find_sorted({"category": "Work"}, sort='sentiment', descending=True, after=after)] == [ids[1]]
+    assert [note['_id'] for note in store.find_sorted({"min_sentiment": 0, "max_sentiment": 0.4}, sort='sentiment')] == [ids[2]]
@@ -0,0 +1,80 @@
+import pytest
+from bson import ObjectId
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+from unittest.mock import patch
+from repository.backends import mongo
+from repository.backends.mongo import MongoNoteStore, collection_scans, _sorted_query
+from repository.backends.mongo_migrations import INDEX_MIGRATIONS, migrate_indexes, migration_status
+
+LISTING_FILTERS = [
+    {},
+    {"category": "Work"},
+    {"min_sentiment": -0.5, "max_sentiment": 0.5},
+    {"category": "Work", "min_sentiment": 0.0},
+]
+
+def test_collection_scans_finds_nested_and_sharded_stages():
+    indexed = {"stage": "LIMIT", "inputStage": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "_id_"}}}
+    assert collection_scans(indexed) == []
+    assert collection_scans({"stage": "SORT", "inputStage": {"stage": "COLLSCAN"}}) == [{"stage": "COLLSCAN"}]
+    sharded = {"stage": "SHARD_MERGE", "shards": [{"winningPlan": indexed}, {"winningPlan": {"stage": "COLLSCAN"}}]}
+    assert len(collection_scans(sharded)) == 1
+
+def test_sorted_query_keeps_sentiment_pages_on_the_index_bounds():
+    note_id = ObjectId()
+    query, sort = _sorted_query({"category": "Work", "max_sentiment": 0.8}, 'sentiment', True, (0.5, note_id))
+    assert sort == [('sentiment', -1), ('_id', -1)]
+    assert query["category"] == "Work"
+    assert query["sentiment"] == {"$lte": 0.5}
+    assert query["$or"] == [{"sentiment": {"$lt": 0.5}}, {"_id": {"$lt": note_id}}]
+    query, sort = _sorted_query(None, 'sentiment', False, None)
+    assert query == {"sentiment": {"$gte": float('-inf')}}
+    assert _sorted_query({"category": "Work"}, '_id', True, note_id) == ({"category": "Work", "_id": {"$lt": note_id}}, [('_id', -1)])
+
+def test_migration_versions_are_increasing_and_index_names_unique():
+    versions = [version for version, _, _ in INDEX_MIGRATIONS]
+    assert versions == sorted(set(versions))
+    # Every index is named, and names are unique within a collection
+    names = [(collection, options['name']) for _, _, indexes in INDEX_MIGRATIONS for collection, _, options in indexes]
+    assert len(names) == len(set(names))
+
+@pytest.fixture
+def database():
+    client = MongoClient('mongodb://localhost:27017/', serverSelectionTimeoutMS=500)
+    try:
+        client.admin.command('ping')
+    except PyMongoError:
+        pytest.skip("No MongoDB server on localhost:27017")
+    database = client.test_note_indexes
+    with patch.object(mongo, 'get_database', return_value=database), patch.object(mongo, 'MONGO_ASSERT_INDEXED', True):
+        yield database
+    client.drop_database(database)
+    client.close()
+
+def test_migrations_are_recorded_and_applied_once(database):
+    assert migrate_indexes(database) == [version for version, _, _ in INDEX_MIGRATIONS]
+    assert migrate_indexes(database) == []
+    assert all(migration['applied'] for migration in migration_status(database))
+    assert 'category_sentiment_created' in database.notes.index_information()
+
+def test_store_queries_never_scan_the_collection(database):
+    store = MongoNoteStore()
+    store.ensure_indexes()
+    store.insert_many([{"_id": ObjectId(), "title": f"Note {i}", "content": f"budget item {i}", "category": ["Work", "Personal"][i % 2],
+                        "sentiment": (i % 5) / 5 - 0.4, "seq": i + 1} for i in range(40)])
+    for filters in LISTING_FILTERS:
+        for sort in ('_id', 'sentiment'):
+            for descending in (False, True):
+                page = store.find_sorted(filters, sort, descending, limit=5)
+                after = page[-1]['_id'] if sort == '_id' else (page[-1]['sentiment'], page[-1]['_id'])
+                store.find_sorted(filters, sort, descending, limit=5, after=after)
+    store.find_page(limit=5)
+    list(store.iter_documents(batch_size=10))
+    store.find_by_ids([ObjectId()], filters={"category": "Work"})
+    store.find_changes(0, 10)
+    store.find_stats()
+    store.search("budget", limit=5, filters={"category": "Work"})
+    # A query without a usable index fails in this mode
+    with pytest.raises(AssertionError):
+        list(mongo._indexed(database.notes.find({"title": "Note 1"})))
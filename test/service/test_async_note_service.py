@@ -0,0 +1,76 @@
+import asyncio
+from unittest.mock import patch, AsyncMock, MagicMock
+from bson import ObjectId
+from service.async_note_service import create_note, create_notes_bulk, modify_note, find_notes, run_blocking
+from repository.async_note_repository import get_note_by_id, set_async_store
+from repository.backends.async_adapter import AsyncStoreAdapter
+from repository.backends.memory import MemoryNoteStore
+from utils.cache import content_hash
+
+
+def test_create_note_offloads_enrichment():
+    with patch('service.async_note_service.add_note', new_callable=AsyncMock) as mock_add_note, \
+         patch('service.async_note_service.analyze_sentiment', return_value=0.5) as mock_sentiment, \
+         patch('service.async_note_service.suggest_category', return_value="Ideas"), \
+         patch('service.async_note_service.model_version', return_value="abc123"), \
+         patch('service.async_note_service.memory_search_enabled', return_value=False):
+        mock_add_note.return_value = MagicMock(inserted_id='12345')
+        result = asyncio.run(create_note("Test Title", "Test Content", wait=True))
+        assert result.inserted_id == '12345'
+        mock_sentiment.assert_called_once_with("Test Content")
+        note = mock_add_note.call_args[0][0]
+        assert (note.sentiment, note.category, note.model_version) == (0.5, "Ideas", "abc123")
+
+def test_create_notes_bulk_reports_every_item():
+    note_ids = [ObjectId(), ObjectId()]
+    with patch('service.async_note_service.add_notes', new_callable=AsyncMock, return_value=(note_ids, {1: "duplicate"})), \
+         patch('service.async_note_service.analyze_sentiment_batch', return_value=[0.1, 0.2]), \
+         patch('service.async_note_service.suggest_categories', return_value=["Work"]), \
+         patch('service.async_note_service.memory_search_enabled', return_value=False):
+        results = asyncio.run(create_notes_bulk([
+            {"title": "A", "content": "first"},
+            {"title": "B", "content": "second", "category": "Personal"},
+            {"title": ""}
+        ]))
+    assert results[0] == {"index": 0, "inserted_id": note_ids[0]}
+    assert results[1] == {"index": 1, "error": "duplicate"}
+    assert results[2]["error"] == "Title and content are required"
+
+def test_modify_note_skips_sentiment_for_unchanged_content():
+    with patch('service.async_note_service.update_note', new_callable=AsyncMock) as mock_update_note, \
+         patch('service.async_note_service.get_note_by_id', new_callable=AsyncMock,
+               return_value={'content_hash': content_hash("Same Content")}), \
+         patch('service.async_note_service.analyze_sentiment') as mock_sentiment, \
+         patch('service.async_note_service.memory_search_enabled', return_value=False):
+        mock_update_note.return_value = MagicMock(matched_count=1, modified_count=1)
+        result = asyncio.run(modify_note('12345', "New Title", "Same Content", "Work", wait=True))
+        assert result.modified_count == 1
+        mock_sentiment.assert_not_called()
+        assert "sentiment" not in mock_update_note.call_args[0][1]
+
+def test_find_notes_returns_next_offset_when_more_results_exist():
+    notes = [{"_id": index} for index in range(3)]
+    with patch('service.async_note_service.search_notes', new_callable=AsyncMock, return_value=notes), \
+         patch('service.async_note_service.memory_search_enabled', return_value=False):
+        page, next_offset = asyncio.run(find_notes("keyword", limit=2))
+    assert page == notes[:2]
+    assert next_offset == 2
+
+def test_run_blocking_runs_in_pool_thread():
+    import threading
+
+    async def main():
+        return await run_blocking(threading.current_thread)
+
+    assert asyncio.run(main()) is not threading.current_thread()
+
+def test_memory_store_reads_through_adapter():
+    store = MemoryNoteStore()
+    note_id = ObjectId()
+    store.insert_one({"_id": note_id, "title": "Title", "content": "Content", "version": 1})
+    previous = set_async_store(AsyncStoreAdapter(store, offload=False))
+    try:
+        note = asyncio.run(get_note_by_id(note_id, fields=['title']))
+        assert note == {"_id": note_id, "title": "Title"}
+    finally:
+        set_async_store(previous)
@@ -0,0 +1,56 @@
+import pytest
+from unittest.mock import patch, MagicMock
+from service.enrichment_service import EnrichmentPool, enrich_note, schedule_enrichment, ENRICHMENT_DONE, ENRICHMENT_FAILED
+from service.note_service import create_note
+
+
+def test_enrich_note_applies_sentiment_and_category():
+    with patch('service.enrichment_service.apply_enrichment') as mock_apply, \
+         patch('service.enrichment_service.analyze_sentiment', return_value=0.3), \
+         patch('service.enrichment_service.suggest_category', return_value='Ideas'), \
+         patch('service.enrichment_service.model_version', return_value='abc123'):
+        enrich_note('12345', 'Content', 'hash', needs_category=True)
+        mock_apply.assert_called_once_with('12345', 'hash', {
+            'sentiment': 0.3,
+            'enrichment_status': ENRICHMENT_DONE,
+            'model_version': 'abc123',
+            'category': 'Ideas'
+        })
+
+def test_pool_retries_then_marks_note_failed():
+    with patch('service.enrichment_service.enrich_note', side_effect=RuntimeError('down')) as mock_enrich, \
+         patch('service.enrichment_service.apply_enrichment') as mock_apply:
+        pool = EnrichmentPool(workers=1, max_retries=2, retry_backoff=0)
+        assert pool.submit('12345', 'Content', 'hash', False)
+        pool.shutdown(wait=True)
+        assert mock_enrich.call_count == 3
+        status = mock_apply.call_args[0][2]
+        assert status['enrichment_status'] == ENRICHMENT_FAILED
+        assert pool.stats()['failed'] == 1
+        assert pool.stats()['retried'] == 2
+
+def test_pool_refuses_jobs_when_full():
+    pool = EnrichmentPool(workers=0, queue_size=1)
+    assert pool.submit('1', 'a', 'h', False)
+    assert not pool.submit('2', 'b', 'h', False)
+    assert pool.stats()['rejected'] == 1
+
+def test_schedule_enrichment_runs_inline_when_pool_is_full():
+    pool = MagicMock()
+    pool.submit.return_value = False
+    with patch('service.enrichment_service.get_enrichment_pool', return_value=pool), \
+         patch('service.enrichment_service.enrich_note') as mock_enrich:
+        assert schedule_enrichment('12345', 'Content', 'hash', True) is False
+        mock_enrich.assert_called_once_with('12345', 'Content', 'hash', True)
+
+def test_create_note_in_background_stores_pending_note():
+    with patch('service.note_service.add_note') as mock_add_note, \
+         patch('service.note_service.schedule_enrichment') as mock_schedule, \
+         patch('service.note_service.analyze_sentiment') as mock_analyze_sentiment:
+        mock_add_note.return_value = MagicMock(inserted_id='12345')
+        create_note("Title", "Content", wait=False)
+        note = mock_add_note.call_args[0][0]
+        assert note.enrichment_status == 'pending'
+        assert note.sentiment is None
+        mock_analyze_sentiment.assert_not_called()
+        mock_schedule.assert_called_once_with('12345', "Content", note.content_hash, needs_category=True)
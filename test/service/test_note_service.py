@@ -1,7 +1,8 @@
 import pytest
 from unittest.mock import patch, MagicMock
-from service.note_service import create_note, modify_note, remove_note
+from service.note_service import create_note, create_notes_bulk, modify_note, remove_note, list_notes_page, find_notes
 from model.note import Note
+from utils.cache import content_hash
 
 
 def test_create_note_with_valid_data():
@@ -34,14 +35,16 @@ def test_create_note_with_invalid_data():
         assert result is None
 
 def test_modify_note_with_valid_data():
-    with patch('service.note_service.update_note') as mock_update_note:
+    with patch('service.note_service.update_note') as mock_update_note, \
+         patch('service.note_service.get_note_by_id', return_value=None):
         mock_update_note.return_value = MagicMock(modified_count=1)
         result = modify_note('12345', "Updated Title", "Updated Content", "Personal")
         mock_update_note.assert_called_once()
         assert result.modified_count == 1        
 
 def test_modify_note_with_nonexistent_id():
-    with patch('service.note_service.update_note') as mock_update_note:
+    with patch('service.note_service.update_note') as mock_update_note, \
+         patch('service.note_service.get_note_by_id', return_value=None):
         mock_update_note.return_value = MagicMock(modified_count=0)
         result = modify_note('nonexistent_id', "Title", "Content", "Category")
         mock_update_note.assert_called_once()
@@ -60,3 +63,177 @@ def test_remove_note_with_nonexistent_id():
         result = remove_note('nonexistent_id')
         mock_delete_note.assert_called_once()
         assert result.deleted_count == 0
+
+def test_list_notes_page_returns_next_cursor():
+    with patch('service.note_service.get_all_notes') as mock_get_all_notes:
+        mock_get_all_notes.return_value = [{'_id': 'a'}, {'_id': 'b'}, {'_id': 'c'}]
+        notes, next_cursor = list_notes_page(2, fields=['title'])
+        mock_get_all_notes.assert_called_once_with(limit=3, after=None, fields=['title'])
+        assert notes == [{'_id': 'a'}, {'_id': 'b'}]
+        assert next_cursor == 'b'
+
+def test_list_notes_page_last_page():
+    with patch('service.note_service.get_all_notes') as mock_get_all_notes:
+        mock_get_all_notes.return_value = [{'_id': 'a'}]
+        notes, next_cursor = list_notes_page(2, after='z')
+        assert notes == [{'_id': 'a'}]
+        assert next_cursor is None
+
+def test_create_notes_bulk_batches_enrichment_and_reports_per_item():
+    with patch('service.note_service.add_notes') as mock_add_notes, \
+         patch('service.note_service.analyze_sentiment_batch', return_value=[0.1, 0.2]) as mock_sentiment, \
+         patch('service.note_service.suggest_categories', return_value=['Ideas']) as mock_categories:
+        mock_add_notes.return_value = (['id-0', 'id-2'], {1: 'duplicate key'})
+        results = create_notes_bulk([
+            {'title': 'A', 'content': 'First'},
+            {'title': 'B'},
+            {'title': 'C', 'content': 'Third', 'category': 'Work'}
+        ])
+        mock_sentiment.assert_called_once_with(['First', 'Third'])
+        mock_categories.assert_called_once_with(['First'])
+        notes = mock_add_notes.call_args[0][0]
+        assert [note.category for note in notes] == ['Ideas', 'Work']
+        assert results == [
+            {'index': 0, 'inserted_id': 'id-0'},
+            {'index': 1, 'error': 'Title and content are required'},
+            {'index': 2, 'error': 'duplicate key'}
+        ]
+
+def test_modify_note_skips_sentiment_when_content_unchanged():
+    with patch('service.note_service.update_note') as mock_update_note, \
+         patch('service.note_service.get_note_by_id', return_value={'content_hash': content_hash("Same Content")}), \
+         patch('service.note_service.analyze_sentiment') as mock_analyze_sentiment:
+        modify_note('12345', "New Title", "Same Content", "Work")
+        mock_analyze_sentiment.assert_not_called()
+        updated_note = mock_update_note.call_args[0][1]
+        assert 'sentiment' not in updated_note
+        assert updated_note['title'] == "New Title"
+
+def test_modify_note_recomputes_sentiment_when_content_changed():
+    with patch('service.note_service.update_note') as mock_update_note, \
+         patch('service.note_service.get_note_by_id', return_value={'content_hash': content_hash("Old Content")}), \
+         patch('service.note_service.analyze_sentiment', return_value=0.5) as mock_analyze_sentiment:
+        modify_note('12345', "Title", "New Content", "Work")
+        mock_analyze_sentiment.assert_called_once_with("New Content")
+        updated_note = mock_update_note.call_args[0][1]
+        assert updated_note['sentiment'] == 0.5
+        assert updated_note['content_hash'] == content_hash("New Content")
+
+def test_modify_note_inline_clears_failed_enrichment():
+    with patch('service.note_service.update_note') as mock_update_note, \
+         patch('service.note_service.get_note_by_id', return_value={'content_hash': content_hash("Old Content"), 'enrichment_status': 'failed', 'enrichment_error': 'boom'}), \
+         patch('service.note_service.analyze_sentiment', return_value=0.5):
+        modify_note('12345', "Title", "New Content", "Work", wait=True)
+        updated_note = mock_update_note.call_args[0][1]
+        assert updated_note['enrichment_status'] == 'done'
+        assert updated_note['enrichment_error'] is None
+
+def test_modify_note_keeps_model_version_when_category_is_resent():
+    stored = {'content_hash': content_hash("Old Content"), 'category': "Work"}
+    with patch('service.note_service.update_note') as mock_update_note, \
+         patch('service.note_service.get_note_by_id', return_value=stored), \
+         patch('service.note_service.analyze_sentiment', return_value=0.5):
+        modify_note('12345', "Title", "New Content", "Work", wait=True)
+        assert 'model_version' not in mock_update_note.call_args[0][1]
+        modify_note('12345', "Title", "New Content", "Personal", wait=True)
+        assert mock_update_note.call_args[0][1]['model_version'] is None
+
+def test_find_notes_passes_ranking_filters_and_pagination_to_repository():
+    with patch('service.note_service.memory_search_enabled', return_value=False), \
+         patch('service.note_service.search_notes') as mock_search_notes:
+        mock_search_notes.return_value = [{'_id': i} for i in range(3)]
+        notes, next_offset = find_notes('plan', limit=2, offset=4, category='Work', min_sentiment=0.1, snippet=True)
+        args, kwargs = mock_search_notes.call_args
+        assert args == ('plan',)
+        assert kwargs['limit'] == 3
+        assert kwargs['offset'] == 4
+        assert kwargs['category'] == 'Work'
+        assert kwargs['min_sentiment'] == 0.1
+        assert kwargs['max_sentiment'] is None
+        assert kwargs['snippet_length'] > 0
+        assert notes == [{'_id': 0}, {'_id': 1}]
+        assert next_offset == 6
+
+def test_find_notes_last_page_has_no_next_offset():
+    with patch('service.note_service.memory_search_enabled', return_value=False), \
+         patch('service.note_service.search_notes', return_value=[{'_id': 1}]):
+        notes, next_offset = find_notes('plan', limit=2)
+        assert notes == [{'_id': 1}]
+        assert next_offset is None
+
+def test_changes_page_continues_from_the_last_change():
+    from service.note_service import changes_page
+
+    changes = [{"seq": 4}, {"seq": 5, "deleted": True}, {"seq": 6}]
+    assert changes_page(changes, 3, 5) == (changes, "6", False)
+    assert changes_page(changes, 3, 2) == (changes[:2], "5", True)
+    assert changes_page([], 6, 2) == ([], "6", False)
+
+def test_a_write_committing_after_a_later_seq_was_served_is_still_delivered():
+    from repository.backends.memory import MemoryNoteStore
+    from repository.note_repository import set_store, add_note, update_note
+    from service.note_service import changes_since
+
+    store = MemoryNoteStore()
+    previous = set_store(store)
+    try:
+        first = add_note(Note("First", "a", "Work", 0.1)).inserted_id
+        _, token, _ = changes_since(0, 10)
+        commit = store.find_one_and_update
+        served = {}
+
+        def commit_late(note_id, values, **kwargs):
+            # The update has reserved its seq; another note is written and served before it commits
+            second = add_note(Note("Second", "b", "Work", 0.1)).inserted_id
+            served['changes'], served['token'], _ = changes_since(int(token), 10)
+            served['second'] = second
+            return commit(note_id, values, **kwargs)
+
+        with patch.object(store, 'find_one_and_update', side_effect=commit_late):
+            update_note(first, {"title": "First, edited"})
+        assert [change['_id'] for change in served['changes']] == [served['second']]
+        changes, _, _ = changes_since(int(served['token']), 10)
+        assert [(change['_id'], change['title']) for change in changes] == [(first, "First, edited")]
+    finally:
+        set_store(previous)
+
+def test_add_notes_stamps_each_chunk_right_before_writing_it():
+    from datetime import datetime, timedelta, timezone
+    from repository.backends.memory import MemoryNoteStore
+    from repository.note_repository import set_store, add_notes
+
+    store = MemoryNoteStore()
+    previous = set_store(store)
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    clock = iter(start + timedelta(seconds=second) for second in range(10))
+    try:
+        with patch('repository.note_repository.utc_now', side_effect=lambda: next(clock)):
+            ids, errors = add_notes([Note(f"T{i}", f"c{i}", "Work", 0.1) for i in range(5)], chunk_size=2)
+        assert errors == {}
+        stored = [store.find_one(note_id) for note_id in ids]
+        assert [note['seq'] for note in stored] == [1, 2, 3, 4, 5]
+        assert [(note['updated_at'] - start).seconds for note in stored] == [0, 0, 1, 1, 2]
+    finally:
+        set_store(previous)
+
+def test_a_cache_miss_racing_an_update_does_not_cache_the_old_note():
+    from repository.backends.memory import MemoryNoteStore
+    from repository.note_repository import set_store, add_note, update_note, get_note_by_id
+
+    store = MemoryNoteStore()
+    previous = set_store(store)
+    try:
+        note_id = add_note(Note("Old", "a", "Work", 0.1)).inserted_id
+        read = store.find_one
+
+        def read_then_update(*args, **kwargs):
+            # The miss has read the old note when another request updates it and invalidates the cache
+            note = read(*args, **kwargs)
+            update_note(note_id, {"title": "New"})
+            return note
+
+        with patch.object(store, 'find_one', side_effect=read_then_update):
+            assert get_note_by_id(note_id)['title'] == "Old"
+        assert get_note_by_id(note_id)['title'] == "New"
+    finally:
+        set_store(previous)
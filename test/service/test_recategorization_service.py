@@ -0,0 +1,77 @@
+import joblib
+import pytest
+from unittest.mock import patch
+from bson import ObjectId
+from repository.backends.memory import MemoryNoteStore
+from repository.note_repository import set_store
+from service import recategorization_service
+
+class KeywordModel:
+    """Categorizes a note as 'Shopping' when it mentions buying, and as 'Work' otherwise."""
+
+    def predict(self, contents):
+        return ['Shopping' if 'buy' in content.lower() else 'Work' for content in contents]
+
+@pytest.fixture
+def store():
+    store = MemoryNoteStore()
+    previous = set_store(store)
+    with patch('service.recategorization_service.current_model', return_value=(KeywordModel(), 'v2')), \
+         patch('service.recategorization_service.model_version', return_value='v2'):
+        yield store
+    set_store(previous)
+
+def _insert(store, content, category, sentiment=0.5, **fields):
+    document = dict({"_id": ObjectId(), "title": "T", "content": content, "category": category, "sentiment": sentiment}, **fields)
+    store.insert_one(document)
+    return document['_id']
+
+def test_user_assigned_categories_are_kept():
+    assert recategorization_service.is_user_assigned({"category": "Ideas", "model_version": None})
+    # Categories stored before model versions were recorded were sent by the client
+    assert recategorization_service.is_user_assigned({"category": "Ideas"})
+    assert not recategorization_service.is_user_assigned({"category": "Ideas"}, include_legacy=True)
+    assert not recategorization_service.is_user_assigned({"category": ""})
+    assert not recategorization_service.is_user_assigned({"category": None, "model_version": None})
+    assert not recategorization_service.needs_category({"category": "Work", "model_version": "v2"}, "v2")
+
+def test_recategorize_notes_updates_model_categories_only(store, tmp_path):
+    model_note = _insert(store, "Buy milk", "Work", model_version="v1")
+    legacy_note = _insert(store, "Buy eggs", "Personal")
+    user_note = _insert(store, "Buy bread", "Personal", model_version=None)
+    current_note = _insert(store, "Buy rice", "Work", model_version="v2")
+    unchanged_note = _insert(store, "Plan the sprint", "Work", model_version="v1", seq=store.next_sequence())
+    checkpoint_path = str(tmp_path / 'recategorize.ckpt')
+
+    counts = recategorization_service.recategorize_notes(batch_size=2, workers=0, max_rate=0, checkpoint_path=checkpoint_path)
+
+    assert counts == {"model_version": "v2", "scanned": 5, "skipped": 3, "unchanged": 1, "updated": 1, "conflicts": 0}
+    assert store.find_one(model_note)['category'] == 'Shopping'
+    assert store.find_one(legacy_note)['category'] == 'Personal'
+    assert 'model_version' not in store.find_one(legacy_note)
+    assert store.find_one(user_note)['category'] == 'Personal'
+    assert store.find_one(current_note)['category'] == 'Work'
+    assert store.find_one(unchanged_note)['model_version'] == 'v1'
+    assert store.find_one(model_note)['seq'] is not None
+    categories = {bucket['key']: bucket['count'] for bucket in store.find_stats() if bucket['kind'] == 'category'}
+    assert categories == {"Shopping": 1, "Work": -1}
+    assert joblib.load(checkpoint_path)["after"] == unchanged_note
+
+    counts = recategorization_service.recategorize_notes(workers=0, max_rate=0, checkpoint_path=None, include_legacy=True)
+    assert counts["updated"] == 1
+    assert store.find_one(legacy_note)['category'] == 'Shopping'
+    assert store.find_one(user_note)['category'] == 'Personal'
+
+def test_recategorize_notes_resumes_after_checkpoint(store, tmp_path):
+    first = _insert(store, "Buy milk", "Work", model_version="v1")
+    second = _insert(store, "Buy eggs", "Work", model_version="v1")
+    checkpoint_path = str(tmp_path / 'recategorize.ckpt')
+    recategorization_service.save_checkpoint(checkpoint_path, {
+        "format": recategorization_service.CHECKPOINT_FORMAT, "model_version": "v2", "after": first,
+        "scanned": 1, "skipped": 0, "unchanged": 0, "updated": 1, "conflicts": 0})
+
+    counts = recategorization_service.recategorize_notes(workers=0, max_rate=0, checkpoint_path=checkpoint_path, resume=True)
+
+    assert counts["scanned"] == 2 and counts["updated"] == 2
+    assert store.find_one(first)['category'] == 'Work'
+    assert store.find_one(second)['category'] == 'Shopping'
@@ -0,0 +1,37 @@
+import pytest
+from unittest.mock import patch
+from model.note import Note
+from repository.backends.memory import MemoryNoteStore
+from repository.note_repository import set_store, add_note, update_note, delete_note
+from service import search_service
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    previous = set_store(MemoryNoteStore())
+    with patch('service.search_service.SEARCH_INDEX_PATH', str(tmp_path / 'index.pkl')), \
+         patch('service.search_service.atexit'):
+        yield str(tmp_path / 'index.pkl')
+    search_service._index = None
+    set_store(previous)
+
+def _search(keyword):
+    return [note_id for note_id, _ in search_service.get_search_index().search(keyword)]
+
+def test_snapshot_load_replays_edits_and_deletions_made_after_it(snapshot_path):
+    kept = add_note(Note("Groceries", "Buy milk", "Personal", 0.0)).inserted_id
+    edited = add_note(Note("Meeting", "Discuss the budget", "Work", 0.0)).inserted_id
+    deleted = add_note(Note("Trip", "Book the train", "Personal", 0.0)).inserted_id
+    assert _search('budget') == [edited]
+    search_service.save_search_index()
+
+    # Written while no process kept the index current, e.g. after a crash
+    update_note(edited, {"title": "Meeting", "content": "Discuss the roadmap"})
+    delete_note(deleted)
+    added = add_note(Note("Reading", "Finish the roadmap book", "Personal", 0.0)).inserted_id
+    search_service._index = None
+
+    assert _search('budget') == []
+    assert set(_search('roadmap')) == {edited, added}
+    assert _search('train') == []
+    assert _search('milk') == [kept]
@@ -0,0 +1,74 @@
+import pytest
+from unittest.mock import patch
+from bson import ObjectId
+from sklearn.feature_extraction.text import TfidfVectorizer
+from repository.backends.memory import MemoryNoteStore
+from repository.note_repository import set_store
+from service import similarity_service
+
+NOTES = [
+    ('Project meeting', 'Discuss project milestones and deadlines'),
+    ('Groceries', 'Buy milk, eggs and bread'),
+    ('Release plan', 'Project milestones for the next release'),
+]
+
+@pytest.fixture
+def notes():
+    store = MemoryNoteStore()
+    ids = [ObjectId() for _ in NOTES]
+    for note_id, (title, content) in zip(ids, NOTES):
+        store.insert_one({"_id": note_id, "title": title, "content": content, "category": "Work", "sentiment": 0.0})
+    previous = set_store(store)
+    vectorizer = TfidfVectorizer(stop_words='english').fit(f"{title}\n{content}" for title, content in NOTES)
+    with patch('service.similarity_service.vectorize', side_effect=lambda contents: (vectorizer.transform(contents), 'v1')), \
+         patch('service.similarity_service.model_version', return_value='v1'):
+        similarity_service.build_similarity_index()
+        yield store, ids
+    similarity_service._index = None
+    similarity_service._index_version = None
+    similarity_service._synced_seq = 0
+    set_store(previous)
+
+def test_similar_notes_builds_index_and_ranks(notes):
+    _, ids = notes
+    results = similarity_service.similar_notes(ids[0], 5)
+    assert [note['_id'] for note in results] == [ids[2]]
+    assert set(results[0]) == {'_id', 'title', 'category', 'sentiment', 'similarity'}
+    assert 0 < results[0]['similarity'] < 1
+
+def test_writes_reach_a_built_index(notes):
+    store, ids = notes
+    new_id = ObjectId()
+    store.insert_one({"_id": new_id, "title": "Groceries", "content": "Buy milk, eggs and bread"})
+    similarity_service.index_note_vector(new_id, "Groceries", "Buy milk, eggs and bread")
+    duplicates = similarity_service.find_duplicates("Groceries", "Buy milk, eggs and bread")
+    assert {note['_id'] for note in duplicates} == {ids[1], new_id}
+
+    similarity_service.unindex_note_vector(ids[1])
+    assert [note['_id'] for note in similarity_service.find_duplicates("Groceries", "Buy milk, eggs and bread")] == [new_id]
+
+def test_no_model_means_no_index(notes):
+    _, ids = notes
+    with patch('service.similarity_service.model_version', return_value=None):
+        assert similarity_service.similar_notes(ids[0], 5) is None
+        assert similarity_service.find_duplicates("Groceries", "Buy milk") == []
+
+def test_writes_of_other_processes_are_caught_up_from_the_change_feed(notes):
+    from repository.note_repository import utc_now
+    store, ids = notes
+    # Written by another worker: only the change feed tells this process about it
+    other_id = ObjectId()
+    store.insert_one({"_id": other_id, "title": "Groceries", "content": "Buy milk, eggs and bread",
+                      "seq": store.next_sequence(), "updated_at": utc_now()})
+    store.find_one_and_delete(ids[1])
+    store.insert_tombstone({"_id": ids[1], "seq": store.next_sequence(), "deleted_at": utc_now()})
+    assert [note['_id'] for note in similarity_service.find_duplicates("Groceries", "Buy milk, eggs and bread")] == [other_id]
+    assert similarity_service._synced_seq == 2
+
+def test_queries_before_the_index_is_built_start_a_background_build(notes):
+    _, ids = notes
+    similarity_service._index = None
+    with patch('service.similarity_service.start_similarity_index') as start:
+        assert similarity_service.similar_notes(ids[0], 5) is None
+        assert similarity_service.find_duplicates("Groceries", "Buy milk") == []
+    assert start.call_count == 2
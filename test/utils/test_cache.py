@@ -0,0 +1,49 @@
+from unittest.mock import patch
+import pytest
+from utils.cache import LRUCache, NullCache, content_hash, create_cache
+
+
+def test_content_hash_is_stable_and_content_sensitive():
+    assert content_hash("note") == content_hash("note")
+    assert content_hash("note") != content_hash("note!")
+    assert content_hash(None) == content_hash("")
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    stats = cache.stats()
+    assert stats['evictions'] == 1
+    assert stats['hits'] == 3
+    assert stats['misses'] == 1
+
+def test_lru_cache_expires_entries_after_ttl():
+    cache = LRUCache(maxsize=2, ttl=10)
+    with patch('utils.cache.time.monotonic', return_value=100.0):
+        cache.set('a', 1)
+    with patch('utils.cache.time.monotonic', return_value=105.0):
+        assert cache.get('a') == 1
+    with patch('utils.cache.time.monotonic', return_value=111.0):
+        assert cache.get('a') is None
+    assert cache.stats()['expirations'] == 1
+
+def test_lru_cache_delete_removes_entry():
+    cache = LRUCache(maxsize=2)
+    cache.set('a', 1)
+    cache.delete('a')
+    cache.delete('missing')
+    assert cache.get('a') is None
+
+def test_create_cache_selects_backend():
+    assert isinstance(create_cache('memory', 10, ttl=5), LRUCache)
+    disabled = create_cache('none', 10)
+    assert isinstance(disabled, NullCache)
+    disabled.set('a', 1)
+    assert disabled.get('a') is None
+    with pytest.raises(ValueError):
+        create_cache('unknown', 10)
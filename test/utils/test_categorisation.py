@@ -0,0 +1,54 @@
+import joblib
+import pytest
+from unittest.mock import patch
+from ml import model_registry
+from ml.model_registry import register_model, active_version, model_path
+from utils import categorisation
+
+
+class FixedModel:
+    def __init__(self, category):
+        self.category = category
+
+    def predict(self, contents):
+        return FixedModelPredictions([self.category] * len(contents))
+
+class FixedModelPredictions(list):
+    def tolist(self):
+        return list(self)
+
+
+def test_reload_model_swaps_versions_without_stale_predictions(tmp_path):
+    registry_dir = str(tmp_path)
+    paths = []
+    for category in ('Work', 'Personal'):
+        artifact = tmp_path / f'{category}.pkl'
+        joblib.dump(FixedModel(category), artifact)
+        paths.append(register_model(str(artifact), registry_dir=registry_dir)['version'])
+
+    with patch.object(categorisation, 'active_version', lambda: active_version(registry_dir)), \
+         patch.object(categorisation, 'registry_model_path', lambda version: model_path(version, registry_dir)), \
+         patch.object(categorisation, 'activate_model', lambda version: model_registry.activate_model(version, registry_dir)), \
+         patch.object(categorisation, '_active', (None, None)), \
+         patch.object(categorisation, '_model_loaded', False):
+        assert categorisation.reload_model(paths[0]) == paths[0]
+        assert categorisation.suggest_category("budget review") == 'Work'
+        assert categorisation.reload_model(paths[1]) == paths[1]
+        assert categorisation.model_version() == paths[1]
+        # The cache is keyed by model version, so the new model's answer is not masked by the old one
+        assert categorisation.suggest_category("budget review") == 'Personal'
+
+        with pytest.raises(ValueError):
+            categorisation.reload_model('unknown')
+        assert categorisation.model_version() == paths[1]
+
+def test_predictions_do_not_start_the_registry_watcher():
+    with patch.object(categorisation, 'MODEL_WATCH_INTERVAL_SECONDS', 60), \
+         patch.object(categorisation, '_active', (FixedModel('Work'), 'v1')), \
+         patch.object(categorisation, '_model_loaded', True), \
+         patch.object(categorisation, '_watcher', None), \
+         patch.object(categorisation.threading, 'Thread') as mock_thread:
+        assert categorisation.suggest_category("budget review") == 'Work'
+        mock_thread.assert_not_called()
+        categorisation.start_model_watcher()
+        mock_thread.return_value.start.assert_called_once()
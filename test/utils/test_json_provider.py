@@ -0,0 +1,32 @@
+import json
+from datetime import datetime
+from bson import ObjectId
+from flask import Flask
+from utils.json_provider import FastJSONProvider, dumps_bytes
+
+
+def test_dumps_encodes_object_ids_and_datetimes():
+    note_id = ObjectId()
+    encoded = dumps_bytes({"_id": note_id, "created_at": datetime(2024, 1, 2, 3, 4, 5)})
+    # Naive datetimes are UTC, like the ones MongoDB returns
+    assert json.loads(encoded) == {"_id": str(note_id), "created_at": "2024-01-02T03:04:05+00:00"}
+
+def test_output_matches_flask_default_provider():
+    app = Flask(__name__)
+    document = {"title": "Note", "sentiment": 0.25, "category": None, "tags": [1, 2], "version": 3}
+    with app.app_context():
+        expected = app.json.response(document).get_data()
+        app.json = FastJSONProvider(app)
+        response = app.json.response(document)
+    assert response.get_data() == expected
+    assert response.mimetype == 'application/json'
+
+def test_jsonify_serializes_documents_without_conversion():
+    from flask import jsonify
+
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    note_id = ObjectId()
+    with app.app_context():
+        response = jsonify([{"_id": note_id, "title": "Note"}])
+    assert response.get_json() == [{"_id": str(note_id), "title": "Note"}]
@@ -0,0 +1,45 @@
+import pytest
+from unittest.mock import patch
+from textblob import TextBlob
+from utils import sentiment_analysis
+from utils.lexicon_sentiment import LexiconSentiment, POLARITY_TOLERANCE
+
+TEXTS = [
+    "Great job!!!",
+    "It's not a good idea, really.",
+    "not very good",
+    "really not good",
+    "I don't like it, the meeting was terribly bad",
+    "The movie was not bad at all, quite enjoyable.",
+    "Warmly not anything incredibly",
+    "Shopping list for groceries.",
+    "That was f*cking great, but so *bad* and f**king awful!",
+    "f*cking",
+    "not... good",
+    "Really... terrible.",
+    "very... good, but never.... bad?! Mr. Smith said it's great, e.g. a well-done (nice) job",
+    "not\n\ngood",
+    "",
+]
+
+@pytest.fixture(scope='module')
+def engine():
+    return LexiconSentiment()
+
+def test_polarity_matches_textblob(engine):
+    for text in TEXTS:
+        assert engine.polarity(text) == pytest.approx(TextBlob(text).sentiment.polarity, abs=POLARITY_TOLERANCE), text
+
+def test_polarity_batch_scores_each_text_on_its_own(engine):
+    assert engine.polarity_batch(TEXTS) == pytest.approx([engine.polarity(text) for text in TEXTS])
+    # Negations and modifiers never reach across texts
+    assert engine.polarity_batch(["very", "good", "not", "good"]) == pytest.approx([0.2, 0.7, 0.0, 0.7])
+    assert engine.polarity_batch([None, "bad"]) == pytest.approx([0.0, -0.7])
+
+def test_analyze_sentiment_batch_uses_the_configured_engine():
+    with patch('utils.sentiment_analysis.SENTIMENT_ENGINE', 'lexicon'), \
+         patch('utils.sentiment_analysis.SENTIMENT_VERSION', 'lexicon-test'), \
+         patch('utils.sentiment_analysis._get_textblob') as mock_textblob:
+        assert sentiment_analysis.analyze_sentiment_batch(["good", "bad", "good"]) == pytest.approx([0.7, -0.7, 0.7])
+        assert sentiment_analysis.analyze_sentiment("bad") == pytest.approx(-0.7)
+        mock_textblob.assert_not_called()
@@ -0,0 +1,57 @@
+from utils.metrics import (Histogram, timed, observe, start_request_timing, finish_request_timing,
+                           format_server_timing, render_prometheus, OPERATION_METRIC)
+
+
+def test_histogram_counts_cumulatively():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+    snapshot = histogram.snapshot()
+    assert snapshot["buckets"] == [2, 3, 4]
+    assert snapshot["count"] == 4
+    assert abs(snapshot["sum"] - 2.65) < 1e-9
+
+def test_timed_records_request_breakdown():
+    @timed('test.decorated')
+    def work():
+        return 42
+
+    token = start_request_timing()
+    assert work() == 42
+    with timed('test.block'):
+        pass
+    observe('test.block', 0.5)
+    timings = finish_request_timing(token)
+    assert set(timings) == {'test.decorated', 'test.block'}
+    assert timings['test.block'] >= 0.5
+
+    # Outside a request only the histograms are updated
+    observe('test.block', 0.1)
+    assert finish_request_timing(start_request_timing()) == {}
+
+def test_server_timing_header_is_in_milliseconds():
+    assert format_server_timing({'sentiment': 0.0015}, total=0.01) == "sentiment;dur=1.500, total;dur=10.000"
+
+def test_render_prometheus_exposes_histograms():
+    observe('test.render', 0.002)
+    page = render_prometheus()
+    assert f"# TYPE {OPERATION_METRIC} histogram" in page
+    assert f'{OPERATION_METRIC}_bucket{{operation="test.render",le="+Inf"}} 1' in page
+    assert f'{OPERATION_METRIC}_count{{operation="test.render"}} 1' in page
+
+def test_timed_awaits_coroutine_functions():
+    import asyncio
+
+    @timed('test.async')
+    async def work():
+        await asyncio.sleep(0.01)
+        return 42
+
+    async def request():
+        token = start_request_timing()
+        result = await work()
+        return result, finish_request_timing(token)
+
+    result, timings = asyncio.run(request())
+    assert result == 42
+    assert timings['test.async'] >= 0.01
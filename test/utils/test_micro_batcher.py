@@ -0,0 +1,55 @@
+import threading
+import pytest
+from utils.micro_batcher import MicroBatcher
+
+
+def test_concurrent_items_share_a_batch():
+    batches = []
+    def handler(items):
+        batches.append(list(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(handler, max_batch_size=8, max_wait_ms=200)
+    results = {}
+    def call(value):
+        results[value] = batcher.process(value, timeout=5)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    batcher.shutdown()
+
+    assert results == {i: i * 2 for i in range(8)}
+    assert len(batches) < 8
+    stats = batcher.stats()
+    assert stats['items'] == 8
+    assert stats['batches'] == len(batches)
+
+def test_batch_never_exceeds_max_size():
+    sizes = []
+    def handler(items):
+        sizes.append(len(items))
+        return items
+
+    batcher = MicroBatcher(handler, max_batch_size=4, max_wait_ms=50)
+    futures = [batcher.submit(i) for i in range(10)]
+    assert [future.result(timeout=5) for future in futures] == list(range(10))
+    batcher.shutdown()
+    assert max(sizes) <= 4
+
+def test_handler_error_is_raised_to_every_caller():
+    def handler(items):
+        raise ValueError("boom")
+
+    batcher = MicroBatcher(handler, max_wait_ms=1)
+    with pytest.raises(ValueError):
+        batcher.process("x", timeout=5)
+    batcher.shutdown()
+
+def test_submit_after_shutdown_fails():
+    batcher = MicroBatcher(lambda items: items)
+    batcher.shutdown()
+    with pytest.raises(RuntimeError):
+        batcher.submit(1)
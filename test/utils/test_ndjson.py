@@ -0,0 +1,24 @@
+import gzip
+import json
+from bson import ObjectId
+from utils.ndjson import iter_ndjson, gzip_stream
+
+
+def test_iter_ndjson_encodes_one_document_per_line():
+    note_id = ObjectId()
+    chunks = list(iter_ndjson([{'_id': note_id, 'title': 'A'}, {'_id': 'b', 'title': 'B'}]))
+    lines = b''.join(chunks).decode('utf-8').splitlines()
+    assert json.loads(lines[0]) == {'_id': str(note_id), 'title': 'A'}
+    assert json.loads(lines[1]) == {'_id': 'b', 'title': 'B'}
+
+def test_iter_ndjson_flushes_first_document_immediately():
+    chunks = iter_ndjson(({'n': i} for i in range(100)), chunk_bytes=1024 * 1024)
+    assert next(chunks) == b'{"n": 0}\n'
+
+def test_iter_ndjson_empty_input():
+    assert list(iter_ndjson([])) == []
+
+def test_gzip_stream_round_trip():
+    chunks = iter_ndjson({'n': i} for i in range(1000))
+    data = gzip.decompress(b''.join(gzip_stream(chunks)))
+    assert len(data.splitlines()) == 1000
@@ -0,0 +1,34 @@
+from bson import ObjectId
+from utils.note_stats import stats_deltas, merge_deltas, summarize_stats, note_day
+
+
+def test_insert_counts_in_category_and_day():
+    note_id = ObjectId()
+    deltas = stats_deltas(after={"_id": note_id, "category": "Work", "sentiment": 0.5})
+    expected = {"count": 1, "sentiment_sum": 0.5, "sentiment_count": 1}
+    assert deltas == {("category", "Work"): expected, ("day", note_day(note_id)): expected}
+
+def test_update_moves_note_between_categories():
+    note_id = ObjectId()
+    deltas = stats_deltas({"_id": note_id, "category": "Work", "sentiment": 0.5}, {"_id": note_id, "category": "Home", "sentiment": 0.5})
+    assert deltas[("category", "Work")] == {"count": -1, "sentiment_sum": -0.5, "sentiment_count": -1}
+    assert deltas[("category", "Home")] == {"count": 1, "sentiment_sum": 0.5, "sentiment_count": 1}
+    # The day of a note never changes and its sentiment did not either
+    assert ("day", note_day(note_id)) not in deltas
+
+def test_pending_sentiment_counts_the_note_only():
+    deltas = stats_deltas(after={"_id": ObjectId(), "category": None, "sentiment": None})
+    assert deltas[("category", None)] == {"count": 1, "sentiment_sum": 0.0, "sentiment_count": 0}
+
+def test_merge_and_summarize():
+    notes = [{"_id": ObjectId(), "category": category, "sentiment": sentiment}
+             for category, sentiment in (("Work", 0.5), ("Work", -0.1), ("Home", None))]
+    merged = merge_deltas(stats_deltas(after=note) for note in notes)
+    buckets = [dict(delta, kind=kind, key=key) for (kind, key), delta in merged.items()]
+    summary = summarize_stats(buckets)
+    assert summary["total"] == {"count": 3, "average_sentiment": 0.2}
+    assert summary["categories"] == [
+        {"category": "Work", "count": 2, "average_sentiment": 0.2},
+        {"category": "Home", "count": 1, "average_sentiment": None}
+    ]
+    assert [day["count"] for day in summary["daily"]] == [3]
@@ -0,0 +1,72 @@
+import pickle
+import threading
+from unittest.mock import patch
+from utils.search_index import InvertedIndex, parse_query
+
+
+def build_index():
+    index = InvertedIndex()
+    index.add(1, 'Project meeting', 'Discuss project milestones and deadlines')
+    index.add(2, 'Groceries', 'Buy milk, eggs and bread')
+    index.add(3, 'Ideas', 'Ideas for the new project')
+    return index
+
+def test_search_ranks_title_matches_first():
+    results = build_index().search('project')
+    assert [doc_id for doc_id, _ in results] == [1, 3]
+
+def test_search_returns_top_k_only():
+    assert len(build_index().search('project', k=1)) == 1
+
+def test_prefix_search():
+    index = build_index()
+    assert {doc_id for doc_id, _ in index.search('mil*')} == {1, 2}
+    assert {doc_id for doc_id, _ in index.search('mil', prefix=True)} == {1, 2}
+    assert index.search('mil') == []
+
+def test_incremental_update_and_remove():
+    index = build_index()
+    index.add(1, 'Renamed', 'Nothing relevant')
+    assert [doc_id for doc_id, _ in index.search('project')] == [3]
+    index.remove(3)
+    assert index.search('project') == []
+    assert len(index) == 2
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / 'index.pkl')
+    index = build_index()
+    index.sequence = 42
+    index.save(path)
+    loaded = InvertedIndex.load(path)
+    assert len(loaded) == 3
+    assert loaded.sequence == 42
+    assert loaded.max_doc_id() == 3
+    assert [doc_id for doc_id, _ in loaded.search('project')] == [1, 3]
+
+def test_load_missing_snapshot_returns_none(tmp_path):
+    assert InvertedIndex.load(str(tmp_path / 'missing.pkl')) is None
+
+def test_parse_query_splits_punctuated_words():
+    assert parse_query('follow-up pro*') == [('follow', False), ('up', False), ('pro', True)]
+
+def test_snapshot_is_pickled_without_holding_the_lock(tmp_path):
+    index = build_index()
+    available = []
+    dump = pickle.dump
+
+    def probe():
+        acquired = index._lock.acquire(timeout=1)
+        if acquired:
+            index._lock.release()
+        available.append(acquired)
+
+    def checked_dump(*args, **kwargs):
+        # Another thread can search or write while the snapshot is serialized
+        thread = threading.Thread(target=probe)
+        thread.start()
+        thread.join()
+        dump(*args, **kwargs)
+
+    with patch('utils.search_index.pickle.dump', side_effect=checked_dump):
+        index.save(str(tmp_path / 'index.pkl'))
+    assert available == [True]
@@ -0,0 +1,54 @@
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from utils.similarity_index import SimilarityIndex
+
+TEXTS = {
+    1: 'project meeting about milestones and deadlines',
+    2: 'buy milk eggs and bread',
+    3: 'project milestones for the new release',
+    4: 'bread and milk for breakfast',
+}
+
+@pytest.fixture
+def vectorizer():
+    return TfidfVectorizer(stop_words='english').fit(TEXTS.values())
+
+def build_index(vectorizer, merge_threshold=4096):
+    index = SimilarityIndex(len(vectorizer.vocabulary_), merge_threshold=merge_threshold)
+    index.add_many(list(TEXTS), vectorizer.transform(list(TEXTS.values())))
+    return index
+
+@pytest.mark.parametrize('merge_threshold', [1, 4096])
+def test_query_ranks_by_cosine_similarity(vectorizer, merge_threshold):
+    # With a threshold of 1 every vector is merged into the term-major matrix, otherwise they stay buffered
+    index = build_index(vectorizer, merge_threshold)
+    results = index.query(vectorizer.transform([TEXTS[1]]), k=3, exclude=1)
+    assert [key for key, _ in results] == [3]
+    assert 0 < results[0][1] < 1
+
+def test_identical_vector_scores_one(vectorizer):
+    results = build_index(vectorizer).query(vectorizer.transform([TEXTS[2]]), k=1)
+    assert results[0][0] == 2
+    assert results[0][1] == pytest.approx(1.0, abs=1e-5)
+
+def test_replace_and_remove(vectorizer):
+    index = build_index(vectorizer, merge_threshold=2)
+    index.add(3, vectorizer.transform(['milk and eggs']))
+    assert [key for key, _ in index.query(vectorizer.transform([TEXTS[1]]), k=3, exclude=1)] == []
+    index.remove(2)
+    assert 2 not in index
+    assert len(index) == 3
+    assert [key for key, _ in index.query(vectorizer.transform(['milk eggs']), k=4)] == [3, 4]
+
+def test_compaction_keeps_results(vectorizer):
+    index = build_index(vectorizer, merge_threshold=1)
+    index.remove(1)
+    index.remove(4)
+    # Half the columns were tombstoned, so the second removal compacted the index
+    assert index._dead == 0
+    assert [key for key, _ in index.query(vectorizer.transform(['project milestones']), k=4)] == [3]
+
+def test_rejects_vectors_of_another_width(vectorizer):
+    index = build_index(vectorizer)
+    with pytest.raises(ValueError):
+        index.add(5, TfidfVectorizer().fit_transform(['unrelated text']))
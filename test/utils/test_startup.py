@@ -0,0 +1,14 @@
+from unittest.mock import patch
+from utils import startup
+
+
+def test_startup_report_leaves_nested_phases_out_of_the_total():
+    with patch.object(startup, '_phases', {}), patch.object(startup, '_nested', set()):
+        startup.record_phase('import', 0.1)
+        with patch.object(startup.time, 'perf_counter', side_effect=[0.0, 0.1, 0.3, 0.5]):
+            with startup.timed_phase('db_connect'):
+                with startup.timed_phase('db_client'):
+                    pass
+        report = startup.startup_report()
+        assert report['phases_ms'] == {'import': 100.0, 'db_client': 200.0, 'db_connect': 500.0}
+        assert report['total_ms'] == 600.0